@@ -13,28 +13,29 @@ class EnemyDetection(Scene):
         
         # Add all objects to scene
         ctx.add_to(self)
-        self.wait(0.8)
+        timeline = enemy_sight.DetectionTimeline(ctx)
+        timeline.wait(0.8)
         
         # 2. Player in zone
-        self.play(ctx.player.obj.animate.move_to(UP * 2), run_time=2)
-        self.wait(0.8)
+        timeline.move_player(UP * 2, run_time=2)
+        timeline.wait(0.8)
         
         # 3. Player not in zone behind
-        self.play(ctx.player.obj.animate.move_to(DOWN * 2.5), run_time=2.5)
-        self.wait(0.8)
+        timeline.move_player(DOWN * 2.5, run_time=2.5)
+        timeline.wait(0.8)
         
         # 4. Enemy rotates to face the player
-        self.play(ctx.enemy.angle.animate.set_value(270 * DEGREES), run_time=3, rate_func=smooth)
-        self.wait(0.8)
+        timeline.turn_enemy(270 * DEGREES, run_time=3, rate_func=smooth)
+        timeline.wait(0.8)
         
         # 5. Player moves away (to the right)
-        self.play(ctx.player.obj.animate.move_to(RIGHT * 3 + DOWN * 1), run_time=2)
-        self.wait(0.8)
+        timeline.move_player(RIGHT * 3 + DOWN * 1, run_time=2)
+        timeline.wait(0.8)
         
         # 6. Enemy faces the other way that the player went and misses it
-        self.play(ctx.enemy.angle.animate.set_value(180 * DEGREES), run_time=3, rate_func=smooth)
-        self.wait(1)
+        timeline.turn_enemy(180 * DEGREES, run_time=3, rate_func=smooth)
+        timeline.wait(1)
         
+        # Detection changes are solved here, before anything is played
+        timeline.play(self)
         self.wait(1)
-
-
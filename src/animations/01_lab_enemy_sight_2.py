@@ -234,24 +234,19 @@ class DotProductDetection(Scene):
         self.wait(1.5)
         
         # Demonstrate: move player inside detection zone
+        timeline = enemy_sight.DetectionTimeline(ctx)
         new_pos_inside = UP * 1.8 + RIGHT * 0.3
-        self.play(
-            ctx.player.obj.animate.move_to(new_pos_inside),
-            run_time=2.5)
-        self.wait(2)
+        timeline.move_player(new_pos_inside, run_time=2.5)
+        timeline.wait(2)
         
         # Move player outside detection zone
         new_pos_outside = LEFT * 2 + UP * 1
-        self.play(
-            ctx.player.obj.animate.move_to(new_pos_outside),
-            run_time=2.5)
-        self.wait(2)
+        timeline.move_player(new_pos_outside, run_time=2.5)
+        timeline.wait(2)
         
         # Rotate enemy to show dynamic detection
-        self.play(
-            ctx.enemy.angle.animate.set_value(np.radians(180)),
-            run_time=4,
-            rate_func=smooth)
-        self.wait(2)
+        timeline.turn_enemy(np.radians(180), run_time=4, rate_func=smooth)
+        timeline.wait(2)
+        timeline.play(self)
         
         self.wait(1)
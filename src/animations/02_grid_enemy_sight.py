@@ -0,0 +1,62 @@
+from manim import *
+import helper
+import enemy_sight
+from grid_sight import GridSight
+
+CELL_SIZE = 1.0
+GRID_ROWS = 7
+GRID_COLS = 7
+WALL_CELLS = [(1, 2), (1, 3)]
+
+
+class EnemySightWalls(Scene):
+    def __init__(self, **kwargs):
+        helper.set_default_output("02_grid_enemy_sight")
+        super().__init__(**kwargs)
+
+    def construct(self):
+        # TOP-LEFT corner of the grid, centered on screen (enemy in the middle cell)
+        grid_origin = np.array([-GRID_COLS * CELL_SIZE / 2, GRID_ROWS * CELL_SIZE / 2, 0])
+        blocked = np.zeros((GRID_ROWS, GRID_COLS), dtype=bool)
+        for r, c in WALL_CELLS:
+            blocked[r, c] = True
+        sight = GridSight(blocked, origin=grid_origin, cell_size=CELL_SIZE)
+        ctx = enemy_sight.Context(angle_deg=70, sight=sight)
+
+        grid_lines = VGroup()
+        for r in range(GRID_ROWS + 1):
+            y = grid_origin[1] - r * CELL_SIZE
+            grid_lines.add(Line(
+                np.array([grid_origin[0], y, 0]),
+                np.array([grid_origin[0] + GRID_COLS * CELL_SIZE, y, 0]),
+                stroke_color=TEAL, stroke_width=2, stroke_opacity=0.5))
+        for c in range(GRID_COLS + 1):
+            x = grid_origin[0] + c * CELL_SIZE
+            grid_lines.add(Line(
+                np.array([x, grid_origin[1], 0]),
+                np.array([x, grid_origin[1] - GRID_ROWS * CELL_SIZE, 0]),
+                stroke_color=TEAL, stroke_width=2, stroke_opacity=0.5))
+        walls = VGroup(*[
+            Square(side_length=CELL_SIZE, color=GREY, fill_color=GREY, fill_opacity=0.9)
+                .move_to(grid_origin + np.array([(c + 0.5) * CELL_SIZE, -(r + 0.5) * CELL_SIZE, 0]))
+            for r, c in WALL_CELLS])
+        self.add(grid_lines)
+        ctx.add_to(self)
+        self.add(walls)
+
+        timeline = enemy_sight.DetectionTimeline(ctx)
+        timeline.wait(0.8)
+
+        # 1. Player walks into the cone, but behind the wall
+        timeline.move_player(LEFT * 2 + UP * 3, run_time=2.5)
+        timeline.wait(0.8)
+
+        # 2. Player steps out from behind the wall
+        timeline.move_player(RIGHT * 1.5 + UP * 3, run_time=2.5)
+        timeline.wait(0.8)
+
+        # 3. Enemy looks the other way
+        timeline.turn_enemy(180 * DEGREES, run_time=3, rate_func=smooth)
+        timeline.wait(1)
+        timeline.play(self)
+        self.wait(1)
@@ -1,6 +1,6 @@
 # Generated using Claude (claude.ai)
 from manim import *
-from helper import set_default_output
+from helper import set_default_output, Timeline
 import numpy as np
 
 CELL_SIZE = 1.0
@@ -97,10 +97,13 @@ class RaycastDiagonal(Scene):
             ((+1, +1), DOWN + RIGHT, r"(1,\ 1)"),    # DOWN+RIGHT: col+1, row+1
         ]
 
+        # All the small steps of the raycasts are recorded and played at once,
+        # so every highlight, tick and arrow is a mobject of its own.
+        timeline = Timeline(self)
         for (dr, dc), arrow_dir, label_str in directions:
             dir_label = MathTex(label_str, color=WHITE).scale(0.9)
             dir_label.to_corner(UL).shift(RIGHT * 0.3 + DOWN * 0.3)
-            self.play(FadeIn(dir_label))
+            timeline.play(FadeIn(dir_label))
 
             arrow_unit = arrow_dir / np.linalg.norm(arrow_dir)
             arrow = Arrow(
@@ -108,7 +111,7 @@ class RaycastDiagonal(Scene):
                 end=player_center + arrow_unit * 0.8,
                 buff=0, color=GREEN, stroke_width=6
             )
-            self.play(GrowArrow(arrow))
+            timeline.play(GrowArrow(arrow))
 
             highlights = []
             ticks = []
@@ -118,23 +121,24 @@ class RaycastDiagonal(Scene):
                 h = Square(side_length=CELL_SIZE, color=GREEN, fill_color=GREEN, fill_opacity=0.3)
                 h.move_to(pos)
                 highlights.append(h)
-                self.play(FadeIn(h), run_time=0.3)
+                timeline.play(FadeIn(h), run_time=0.3)
 
                 if (r, c) in object_cells:
                     tick = make_tick(pos)
                     ticks.append(tick)
-                    self.play(Create(tick), run_time=0.35)
+                    timeline.play(Create(tick), run_time=0.35)
                     break
 
                 r += dr
                 c += dc
 
-            self.wait(0.6)
-            self.play(
+            timeline.wait(0.6)
+            timeline.play(
                 *[FadeOut(h) for h in highlights],
                 *[FadeOut(t) for t in ticks],
                 FadeOut(arrow),
                 FadeOut(dir_label),
             )
+        timeline.flush()
 
         self.wait(1)
@@ -0,0 +1,63 @@
+from manim import *
+import helper
+from ball_world import BallWorld
+from ball_keyframes import decimate, segments
+
+DURATION = 8
+SUBSTEPS = 8       # simulation steps per rendered frame
+TOLERANCE = 0.005  # largest keyframe error, in scene units
+COUNT = 12
+
+
+def make_bouncing_world() -> BallWorld:
+    """A few balls bouncing around a box, without gravity."""
+    return BallWorld.random(COUNT, bounds_min=(-3.5, -3.5), bounds_max=(3.5, 3.5),
+        radius_range=(0.15, 0.35), max_speed=3.0, seed=3)
+
+
+def record(world: BallWorld, duration: float, fps: float, substeps: int):
+    """Positions of all balls at every rendered frame, shape (frames, n, 2)."""
+    frame_count = int(round(duration * fps)) + 1
+    dt = 1 / (fps * substeps)
+    ret = np.zeros((frame_count, world.count, 2))
+    ret[0] = world.positions
+    for frame in range(1, frame_count):
+        for _ in range(substeps):
+            world.step(dt)
+        ret[frame] = world.positions
+    return ret
+
+
+def keyframe_animations(balls: VGroup, frames, fps: float, tolerance: float) -> list[Animation]:
+    """
+    A few long straight moves per ball instead of a position every frame:
+    the recording is cut at the bounces and simplified within `tolerance`.
+    """
+    ret = []
+    for k, keyframes in enumerate(decimate(frames, tolerance)):
+        moves = [balls[k].animate(rate_func=linear, run_time=run_time).move_to([p[0], p[1], 0])
+            for p, run_time in segments(frames[:, k], keyframes, 1 / fps)]
+        ret.append(Succession(*moves))
+    return ret
+
+
+class Bouncing(Scene):
+    def __init__(self, **kwargs):
+        helper.set_default_output("03_balls_bouncing")
+        super().__init__(**kwargs)
+
+    def construct(self):
+        world = make_bouncing_world()
+        fps = config.frame_rate
+        frames = record(world, DURATION, fps, SUBSTEPS)
+
+        box = Square(side_length=7, color=WHITE)
+        colors = [BLUE, GREEN, RED, YELLOW, PURPLE, ORANGE]
+        balls = VGroup(*[
+            Circle(radius=world.radii[k], color=colors[k % len(colors)], fill_opacity=1)
+                .move_to([frames[0, k, 0], frames[0, k, 1], 0])
+            for k in range(world.count)])
+        self.add(box, balls)
+
+        self.play(*keyframe_animations(balls, frames, fps, TOLERANCE))
+        self.wait(0.5)
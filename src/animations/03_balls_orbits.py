@@ -0,0 +1,81 @@
+from manim import *
+import helper
+from ball_world import BallWorld
+from ball_gravity import NBodyGravity
+from ball_integrators import VelocityVerlet
+from ball_trajectory import TrajectoryReader, TrajectoryWriter
+from pathlib import Path
+
+DURATION = 10
+SUBSTEPS = 20      # simulation steps per rendered frame
+G = 1.0
+SUN_MASS = 20.0
+
+
+def make_orbit_world() -> BallWorld:
+    """A heavy sun with planets on circular orbits around it."""
+    orbit_radii = np.array([1.2, 2.0, 3.0])
+    angles = np.array([0.0, 2.1, 4.2])
+    masses = np.array([SUN_MASS, 0.05, 0.1, 0.08])
+    radii = np.array([0.3, 0.08, 0.12, 0.1])
+
+    directions = np.stack([np.cos(angles), np.sin(angles)], axis=1)
+    # Circular orbit speed, perpendicular to the direction to the sun.
+    speeds = np.sqrt(G * SUN_MASS / orbit_radii)
+    tangents = np.stack([-directions[:, 1], directions[:, 0]], axis=1)
+
+    positions = np.vstack([[0, 0], directions * orbit_radii[:, None]])
+    velocities = np.vstack([[0, 0], tangents * speeds[:, None]])
+    # Let the sun move so that the total momentum is zero.
+    velocities[0] = -(masses[1:, None] * velocities[1:]).sum(axis=0) / masses[0]
+
+    world = BallWorld(positions, velocities, radii, masses,
+        bounds_min=(-50, -50), bounds_max=(50, 50), integrator=VelocityVerlet())
+    world.accelerations.append(NBodyGravity(g=G, softening=0.05))
+    return world
+
+
+def record(world: BallWorld, path, duration: float, dt: float) -> TrajectoryReader:
+    """Simulate into a trajectory file, without keeping the history in memory."""
+    with TrajectoryWriter(path, world.count, dt) as writer:
+        writer.append(world.positions)
+        for _ in range(int(round(duration / dt))):
+            world.step(dt)
+            writer.append(world.positions)
+    return TrajectoryReader(path)
+
+
+class Orbits(Scene):
+    def __init__(self, **kwargs):
+        helper.set_default_output("03_balls_orbits")
+        super().__init__(**kwargs)
+
+    def construct(self):
+        world = make_orbit_world()
+        fps = config.frame_rate
+        path = Path(config.media_dir) / "trajectories" / "03_balls_orbits.traj"
+        trajectory = record(world, path, DURATION, 1 / (fps * SUBSTEPS))
+
+        colors = [YELLOW, BLUE, GREEN, RED]
+        balls = VGroup(*[Circle(radius=world.radii[k], color=colors[k], fill_opacity=1)
+            for k in range(world.count)])
+        elapsed = 0.0
+
+        def advance(group, dt):
+            # The recorded positions at the scene time, read on demand; they
+            # stay at the last ones once the recording is over.
+            nonlocal elapsed
+            elapsed += dt
+            for ball, p in zip(group, trajectory.at_time(elapsed)):
+                ball.move_to([p[0], p[1], 0])
+        advance(balls, 0)
+
+        for k, ball in enumerate(balls):
+            trail = TracedPath(ball.get_center,
+                stroke_color=colors[k], stroke_width=2, dissipating_time=1.5)
+            self.add(trail)
+        self.add(balls)
+        balls.add_updater(advance)
+        self.wait(DURATION)
+        balls.remove_updater(advance)
+        self.wait(0.5)
@@ -0,0 +1,224 @@
+import numpy as np
+from numpy.typing import NDArray
+
+
+def gravity_exact(
+    positions: NDArray,
+    masses: NDArray,
+    g: float = 1.0,
+    softening: float = 1e-3,
+    targets: NDArray | None = None,
+    chunk: int = 1024
+) -> NDArray:
+    """
+    Accelerations from mutual attraction, summing over every pair: O(n^2).
+
+    The softening length keeps the force finite when two bodies overlap:
+    a = g * m * d / (|d|^2 + softening^2)^(3/2).
+
+    Args:
+        positions: Body positions, shape (n, 2)
+        masses: Body masses, shape (n,)
+        g: Gravitational constant
+        softening: Softening length
+        targets: Indices of the bodies to compute the acceleration of, all if None
+        chunk: Targets processed at once, bounds the memory to chunk * n
+
+    Returns:
+        Accelerations of the targets, shape (len(targets), 2)
+    """
+    positions = np.asarray(positions, dtype=np.float64)[:, :2]
+    masses = np.asarray(masses, dtype=np.float64)
+    if targets is None:
+        targets = np.arange(len(masses))
+    ret = np.zeros((len(targets), 2))
+    eps2 = softening * softening
+    for start in range(0, len(targets), chunk):
+        t = targets[start:start + chunk]
+        d = positions[None, :, :] - positions[t, None, :]
+        r2 = (d * d).sum(axis=2) + eps2
+        w = masses[None, :] / (r2 * np.sqrt(r2))
+        # A body does not attract itself (d is zero there anyway).
+        w[np.arange(len(t)), t] = 0
+        ret[start:start + chunk] = (d * w[:, :, None]).sum(axis=1)
+    return ret * g
+
+
+class BarnesHutTree:
+    """
+    Barnes-Hut approximation of the mutual attraction.
+
+    The bodies are binned into a complete quadtree of fixed depth, stored
+    level by level in flat arrays (`mass[level]`, `center[level]`), where
+    node (x, y) of level L has index `y * 2^L + x`. Masses and centers of
+    mass are summed bottom-up with reshapes, without any per-node object.
+
+    A node of side `s` at distance `d` from a body is used as a single
+    point mass if `s / d < theta`, otherwise its children are visited.
+    `theta = 0` gives the exact sum (slowly), 0.5 is the usual compromise.
+    """
+
+    def __init__(self, positions: NDArray, masses: NDArray, depth: int | None = None):
+        self.positions = np.asarray(positions, dtype=np.float64)[:, :2]
+        self.masses = np.asarray(masses, dtype=np.float64)
+        n = len(self.masses)
+        if depth is None:
+            # About one body per leaf.
+            depth = int(np.clip(np.ceil(np.log(max(n, 1)) / np.log(4)) + 1, 1, 12))
+        self.depth = depth
+
+        lo = self.positions.min(axis=0) if n > 0 else np.zeros(2)
+        hi = self.positions.max(axis=0) if n > 0 else np.ones(2)
+        self.side = float(max(np.max(hi - lo), 1e-9)) * (1 + 1e-9)
+        self.origin = lo
+
+        cells = 1 << depth
+        rel = (self.positions - self.origin) / self.side * cells
+        leaf_xy = np.clip(np.floor(rel).astype(np.int64), 0, cells - 1)
+
+        # Node of every body on every level.
+        self.body_node = [((leaf_xy[:, 1] >> (depth - level)) << level) + (leaf_xy[:, 0] >> (depth - level))
+            for level in range(depth + 1)]
+
+        leaf = self.body_node[depth]
+        # Bodies grouped by leaf, for the direct sums near a body.
+        self.leaf_bodies = np.argsort(leaf, kind="stable")
+        self.leaf_start = np.zeros(cells * cells + 1, dtype=np.int64)
+        np.cumsum(np.bincount(leaf, minlength=cells * cells), out=self.leaf_start[1:])
+
+        mass = np.bincount(leaf, weights=self.masses, minlength=cells * cells)
+        moment = np.stack([
+            np.bincount(leaf, weights=self.masses * self.positions[:, k], minlength=cells * cells)
+            for k in range(2)], axis=1)
+
+        self.mass = [np.zeros(0)] * (depth + 1)
+        self.moment = [np.zeros((0, 2))] * (depth + 1)
+        self.mass[depth] = mass
+        self.moment[depth] = moment
+        for level in range(depth - 1, -1, -1):
+            c = 1 << level
+            self.mass[level] = mass.reshape(c, 2, c, 2).sum(axis=(1, 3)).ravel()
+            moment = moment.reshape(c, 2, c, 2, 2).sum(axis=(1, 3)).reshape(-1, 2)
+            self.moment[level] = moment
+            mass = self.mass[level]
+
+        self.center = []
+        for level in range(depth + 1):
+            with np.errstate(invalid="ignore", divide="ignore"):
+                self.center.append(self.moment[level] / self.mass[level][:, None])
+
+    def accelerations(
+        self,
+        theta: float = 0.5,
+        g: float = 1.0,
+        softening: float = 1e-3,
+        chunk: int = 4096
+    ) -> NDArray:
+        """Approximate acceleration of every body, shape (n, 2)."""
+        n = len(self.masses)
+        ret = np.zeros((n, 2))
+        for start in range(0, n, chunk):
+            bodies = np.arange(start, min(start + chunk, n))
+            ret[bodies] = self._accelerate(bodies, theta, softening)
+        return ret * g
+
+    def _accelerate(self, bodies, theta, softening):
+        eps2 = softening * softening
+        acc = np.zeros((len(bodies), 2))
+        p = self.positions[bodies]
+
+        # Frontier of (body, node) pairs on the current level.
+        owner = np.arange(len(bodies))
+        node = np.zeros(len(bodies), dtype=np.int64)
+        for level in range(self.depth + 1):
+            mass = self.mass[level][node]
+            nonempty = mass > 0
+            owner, node, mass = owner[nonempty], node[nonempty], mass[nonempty]
+            center = self.center[level][node]
+
+            # Take the body itself out of the node containing it.
+            own = self.body_node[level][bodies[owner]] == node
+            if np.any(own):
+                m = self.masses[bodies[owner[own]]]
+                rest = mass[own] - m
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    center[own] = (center[own] * mass[own, None] - p[owner[own]] * m[:, None]) / rest[:, None]
+                mass[own] = rest
+                keep = np.ones(len(owner), dtype=bool)
+                keep[own] = rest > 0
+                owner, node, mass, center, own = owner[keep], node[keep], mass[keep], center[keep], own[keep]
+
+            d = center - p[owner]
+            r2 = (d * d).sum(axis=1)
+            size = self.side / (1 << level)
+            far = size * size < theta * theta * r2
+            r2s = r2[far] + eps2
+            w = mass[far] / (r2s * np.sqrt(r2s))
+            np.add.at(acc, owner[far], d[far] * w[:, None])
+
+            if level == self.depth:
+                # Leaves too close to be approximated are summed body by body.
+                self._accelerate_direct(acc, bodies, owner[~far], node[~far], eps2)
+                break
+            opened = ~far
+            owner = np.repeat(owner[opened], 4)
+            parent = node[opened]
+            c = 1 << level
+            px = parent % c
+            py = parent // c
+            child_x = (2 * px)[:, None] + np.array([0, 1, 0, 1])
+            child_y = (2 * py)[:, None] + np.array([0, 0, 1, 1])
+            node = (child_y * (2 * c) + child_x).ravel()
+        return acc
+
+    def _accelerate_direct(self, acc, bodies, owner, leaf, eps2):
+        start = self.leaf_start[leaf]
+        counts = self.leaf_start[leaf + 1] - start
+        owner = np.repeat(owner, counts)
+        first = np.repeat(np.cumsum(counts) - counts, counts)
+        other = self.leaf_bodies[np.repeat(start, counts) + np.arange(len(owner)) - first]
+        not_self = other != bodies[owner]
+        owner, other = owner[not_self], other[not_self]
+        d = self.positions[other] - self.positions[bodies[owner]]
+        r2 = (d * d).sum(axis=1) + eps2
+        w = self.masses[other] / (r2 * np.sqrt(r2))
+        np.add.at(acc, owner, d * w[:, None])
+
+
+class NBodyGravity:
+    """
+    Mutual attraction between the balls of a `BallWorld`,
+    to be added to `world.accelerations`.
+
+    Uses the exact sum for up to `exact_limit` balls and Barnes-Hut above.
+    """
+
+    def __init__(
+        self,
+        g: float = 1.0,
+        softening: float = 1e-2,
+        theta: float = 0.5,
+        exact_limit: int = 2000
+    ):
+        self.g = g
+        self.softening = softening
+        self.theta = theta
+        self.exact_limit = exact_limit
+
+    def compute(self, positions: NDArray, masses: NDArray) -> NDArray:
+        if len(masses) <= self.exact_limit:
+            return gravity_exact(positions, masses, self.g, self.softening)
+        tree = BarnesHutTree(positions, masses)
+        return tree.accelerations(self.theta, self.g, self.softening)
+
+    def __call__(self, world, positions: NDArray, velocities: NDArray) -> NDArray:
+        masses = world.masses if world.active is None else world.masses[world.active]
+        return self.compute(positions, masses)
+
+    def potential_energy(self, positions: NDArray, masses: NDArray) -> float:
+        """Total (softened) potential energy, exact O(n^2)."""
+        positions = np.asarray(positions, dtype=np.float64)[:, :2]
+        i, j = np.triu_indices(len(masses), k=1)
+        d = positions[i] - positions[j]
+        r = np.sqrt((d * d).sum(axis=1) + self.softening ** 2)
+        return float(-self.g * (masses[i] * masses[j] / r).sum())
@@ -0,0 +1,212 @@
+import numpy as np
+from numpy.typing import NDArray
+
+
+class UniformGrid:
+    """
+    Uniform grid broad phase for circles, stored as flat arrays.
+
+    Every circle is put into all of the cells its bounding box overlaps.
+    The items of cell `i` are `cell_items[cell_start[i] : cell_start[i + 1]]`
+    (compressed sparse row layout), so no Python object is made per cell.
+
+    Positions are in world space (x to the right, y up), like in manim.
+    Circles outside of the bounds are clamped to the border cells.
+    """
+
+    def __init__(self, bounds_min, bounds_max, cell_size: float):
+        if cell_size <= 0:
+            raise ValueError("cell_size must be positive")
+        self.bounds_min = np.asarray(bounds_min, dtype=np.float64)[:2]
+        self.bounds_max = np.asarray(bounds_max, dtype=np.float64)[:2]
+        self.cell_size = float(cell_size)
+        extent = self.bounds_max - self.bounds_min
+        self.cols = max(1, int(np.ceil(extent[0] / cell_size)))
+        self.rows = max(1, int(np.ceil(extent[1] / cell_size)))
+
+        self.positions = np.zeros((0, 2))
+        self.radii = np.zeros(0)
+        self.cell_start = np.zeros(self.rows * self.cols + 1, dtype=np.int64)
+        self.cell_items = np.zeros(0, dtype=np.int64)
+
+    @staticmethod
+    def fit(positions: NDArray, radii: NDArray, cell_size: float | None = None) -> 'UniformGrid':
+        """
+        Make a grid covering all circles and build it.
+        The default cell size is twice the mean radius.
+        """
+        positions = np.asarray(positions, dtype=np.float64)[:, :2]
+        radii = np.asarray(radii, dtype=np.float64)
+        if cell_size is None:
+            cell_size = 2 * float(radii.mean()) if len(radii) > 0 else 1.0
+        lo = (positions - radii[:, None]).min(axis=0) if len(radii) > 0 else np.zeros(2)
+        hi = (positions + radii[:, None]).max(axis=0) if len(radii) > 0 else np.ones(2)
+        ret = UniformGrid(lo, hi, cell_size)
+        ret.build(positions, radii)
+        return ret
+
+    @property
+    def cell_count(self) -> int:
+        return self.rows * self.cols
+
+    def cell_coords(self, points: NDArray) -> tuple[NDArray, NDArray]:
+        """(col, row) of the cells containing the points, clamped to the grid."""
+        rel = (np.asarray(points)[..., :2] - self.bounds_min) / self.cell_size
+        col = np.clip(np.floor(rel[..., 0]).astype(np.int64), 0, self.cols - 1)
+        row = np.clip(np.floor(rel[..., 1]).astype(np.int64), 0, self.rows - 1)
+        return col, row
+
+    def cell_ranges(self, lo: NDArray, hi: NDArray):
+        """Inclusive (col, row) cell ranges covered by the boxes [lo, hi]."""
+        c0, r0 = self.cell_coords(lo)
+        c1, r1 = self.cell_coords(hi)
+        return c0, r0, c1, r1
+
+    def covered_cells(self, lo: NDArray, hi: NDArray) -> tuple[NDArray, NDArray]:
+        """
+        All cells covered by many boxes [lo, hi] at once.
+
+        Returns:
+            (box, cell): one entry per (box, covered cell)
+        """
+        c0, r0, c1, r1 = self.cell_ranges(lo, hi)
+        width = c1 - c0 + 1
+        height = r1 - r0 + 1
+        per_box = width * height
+
+        box = np.repeat(np.arange(len(per_box), dtype=np.int64), per_box)
+        first = np.repeat(np.cumsum(per_box) - per_box, per_box)
+        local = np.arange(len(box), dtype=np.int64) - first
+        w = width[box]
+        col = c0[box] + local % w
+        row = r0[box] + local // w
+        return box, row * self.cols + col
+
+    def build(self, positions: NDArray, radii: NDArray):
+        """Rebuild the grid from scratch. Cheap enough to do every step."""
+        self.positions = np.asarray(positions, dtype=np.float64)[:, :2]
+        self.radii = np.asarray(radii, dtype=np.float64)
+        item, cell = self.covered_cells(
+            self.positions - self.radii[:, None],
+            self.positions + self.radii[:, None])
+
+        order = np.argsort(cell, kind="stable")
+        self.cell_items = item[order]
+        counts = np.bincount(cell, minlength=self.cell_count)
+        self.cell_start = np.zeros(self.cell_count + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.cell_start[1:])
+
+    def items_in_cells(self, cells: NDArray) -> tuple[NDArray, NDArray]:
+        """
+        Items of many cells at once.
+
+        Returns:
+            (owner, items), where owner[k] is the position in `cells`
+            that the item items[k] came from
+        """
+        cells = np.asarray(cells, dtype=np.int64)
+        start = self.cell_start[cells]
+        counts = self.cell_start[cells + 1] - start
+        owner = np.repeat(np.arange(len(cells), dtype=np.int64), counts)
+        first = np.repeat(np.cumsum(counts) - counts, counts)
+        local = np.arange(len(owner), dtype=np.int64) - first
+        return owner, self.cell_items[start[owner] + local]
+
+    def query_aabb(self, lo, hi) -> NDArray:
+        """Indices of the circles overlapping the box [lo, hi]."""
+        lo = np.asarray(lo, dtype=np.float64)[:2]
+        hi = np.asarray(hi, dtype=np.float64)[:2]
+        c0, r0, c1, r1 = self.cell_ranges(lo, hi)
+        cols, rows = np.meshgrid(np.arange(c0, c1 + 1), np.arange(r0, r1 + 1))
+        _, items = self.items_in_cells((rows * self.cols + cols).ravel())
+        items = np.unique(items)
+        p = self.positions[items]
+        r = self.radii[items]
+        closest = np.clip(p, lo, hi)
+        d2 = ((p - closest) ** 2).sum(axis=1)
+        return items[d2 <= r * r]
+
+    def query_radius(self, center, radius: float) -> NDArray:
+        """Indices of the circles overlapping the circle at `center`."""
+        center = np.asarray(center, dtype=np.float64)[:2]
+        items = self.query_aabb(center - radius, center + radius)
+        d2 = ((self.positions[items] - center) ** 2).sum(axis=1)
+        reach = self.radii[items] + radius
+        return items[d2 <= reach * reach]
+
+    def query_circles(self, centers: NDArray, radii: NDArray) -> tuple[NDArray, NDArray]:
+        """
+        Circles of the grid overlapping each of many query circles,
+        which don't have to be in the grid themselves.
+
+        Returns:
+            (owner, items), unique pairs where the query circle owner[k]
+            overlaps the grid circle items[k]
+        """
+        centers = np.asarray(centers, dtype=np.float64)[:, :2]
+        radii = np.asarray(radii, dtype=np.float64)
+        box, cell = self.covered_cells(centers - radii[:, None], centers + radii[:, None])
+        entry, items = self.items_in_cells(cell)
+        key = np.unique(box[entry] * max(len(self.radii), 1) + items)
+        owner, items = np.divmod(key, max(len(self.radii), 1))
+        d2 = ((self.positions[items] - centers[owner]) ** 2).sum(axis=1)
+        reach = self.radii[items] + radii[owner]
+        close = d2 <= reach * reach
+        return owner[close], items[close]
+
+    def candidate_pairs(self) -> NDArray:
+        """
+        Unique pairs (i < j) of circles sharing a cell
+        whose bounding boxes overlap, as an (m, 2) array.
+        """
+        counts = np.diff(self.cell_start)
+        cell_of_entry = np.repeat(np.arange(self.cell_count, dtype=np.int64), counts)
+        pos_in_cell = np.arange(len(self.cell_items), dtype=np.int64) - self.cell_start[cell_of_entry]
+
+        # Pair every entry with the entries after it in the same cell.
+        after = counts[cell_of_entry] - pos_in_cell - 1
+        a = np.repeat(np.arange(len(self.cell_items), dtype=np.int64), after)
+        first = np.repeat(np.cumsum(after) - after, after)
+        b = a + 1 + (np.arange(len(a), dtype=np.int64) - first)
+
+        i = self.cell_items[a]
+        j = self.cell_items[b]
+        return _finish_pairs(i, j, self.positions, self.radii)
+
+
+def _finish_pairs(i: NDArray, j: NDArray, positions: NDArray, radii: NDArray) -> NDArray:
+    """Order, filter by bounding box overlap and dedupe candidate pairs."""
+    lo = np.minimum(i, j)
+    hi = np.maximum(i, j)
+    reach = radii[lo] + radii[hi]
+    d = np.abs(positions[lo] - positions[hi])
+    overlap = (d[:, 0] <= reach) & (d[:, 1] <= reach)
+    key = np.unique(lo[overlap] * len(radii) + hi[overlap])
+    return np.stack(np.divmod(key, len(radii)), axis=1)
+
+
+def brute_force_pairs(positions: NDArray, radii: NDArray) -> NDArray:
+    """Reference O(n^2) broad phase with the same output as the grid."""
+    positions = np.asarray(positions, dtype=np.float64)[:, :2]
+    radii = np.asarray(radii, dtype=np.float64)
+    i, j = np.triu_indices(len(radii), k=1)
+    return _finish_pairs(i, j, positions, radii)
+
+
+class GridBroadPhase:
+    """Broad phase rebuilding a uniform grid over the balls every step."""
+
+    def __init__(self, cell_size: float | None = None):
+        self.cell_size = cell_size
+        self.grid: UniformGrid | None = None
+
+    def find_pairs(self, positions: NDArray, radii: NDArray) -> NDArray:
+        self.grid = UniformGrid.fit(positions, radii, self.cell_size)
+        return self.grid.candidate_pairs()
+
+
+class BruteForceBroadPhase:
+    """Every pair of balls is a candidate. Only usable for small counts."""
+
+    def find_pairs(self, positions: NDArray, radii: NDArray) -> NDArray:
+        return brute_force_pairs(positions, radii)
@@ -0,0 +1,228 @@
+import numpy as np
+from numpy.typing import NDArray
+from typing import Callable
+
+# acceleration(positions, velocities, out) writes the accelerations into out.
+AccelerationFunc = Callable[[NDArray, NDArray, NDArray], None]
+
+
+class Integrator:
+    """
+    Advances positions and velocities (arrays of shape (n, 2)) in place.
+
+    Scratch arrays are made once for a given shape and reused,
+    so a step does not allocate anything by itself.
+    """
+
+    # Acceleration evaluations per step
+    evaluations = 1
+
+    def __init__(self):
+        self._shape: tuple | None = None
+
+    def _allocate(self, shape: tuple):
+        """Makes the scratch arrays of this integrator for arrays of `shape`."""
+        pass
+
+    def _ensure(self, positions: NDArray):
+        if self._shape != positions.shape:
+            self._shape = positions.shape
+            self._allocate(positions.shape)
+            self.invalidate()
+
+    def invalidate(self):
+        """Called when the state was changed outside of `step` (collisions)."""
+        pass
+
+    def step(self, positions: NDArray, velocities: NDArray, acceleration: AccelerationFunc, dt: float):
+        raise NotImplementedError
+
+
+class SemiImplicitEuler(Integrator):
+    """v += a dt, then x += v dt. First order, but symplectic."""
+
+    def __init__(self):
+        super().__init__()
+        self._a = np.zeros((0, 2))
+        self._dx = np.zeros((0, 2))
+
+    def _allocate(self, shape):
+        self._a = np.zeros(shape)
+        self._dx = np.zeros(shape)
+
+    def step(self, positions, velocities, acceleration, dt):
+        self._ensure(positions)
+        acceleration(positions, velocities, self._a)
+        self._a *= dt
+        velocities += self._a
+        np.multiply(velocities, dt, out=self._dx)
+        positions += self._dx
+
+
+class VelocityVerlet(Integrator):
+    """
+    Second order and symplectic: good energy behavior for orbits.
+    The acceleration must only depend on the positions.
+    The end-of-step acceleration is reused by the next step.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._a = np.zeros((0, 2))
+        self._a_next = np.zeros((0, 2))
+        self._tmp = np.zeros((0, 2))
+        self._valid = False
+
+    def _allocate(self, shape):
+        self._a = np.zeros(shape)
+        self._a_next = np.zeros(shape)
+        self._tmp = np.zeros(shape)
+
+    def invalidate(self):
+        self._valid = False
+
+    def step(self, positions, velocities, acceleration, dt):
+        self._ensure(positions)
+        if not self._valid:
+            acceleration(positions, velocities, self._a)
+
+        # x += v dt + a dt^2 / 2
+        np.multiply(self._a, 0.5 * dt, out=self._tmp)
+        self._tmp += velocities
+        self._tmp *= dt
+        positions += self._tmp
+
+        # v += (a + a_next) dt / 2
+        acceleration(positions, velocities, self._a_next)
+        np.add(self._a, self._a_next, out=self._tmp)
+        self._tmp *= 0.5 * dt
+        velocities += self._tmp
+
+        self._a, self._a_next = self._a_next, self._a
+        self._valid = True
+
+
+class RungeKutta4(Integrator):
+    """Classic fourth order Runge-Kutta. Accurate, but 4 evaluations per step."""
+
+    evaluations = 4
+
+    def __init__(self):
+        super().__init__()
+        self._a = np.zeros((0, 2))
+        self._xt = np.zeros((0, 2))
+        self._vt = np.zeros((0, 2))
+        self._sum_x = np.zeros((0, 2))
+        self._sum_v = np.zeros((0, 2))
+
+    def _allocate(self, shape):
+        self._a = np.zeros(shape)
+        self._xt = np.zeros(shape)
+        self._vt = np.zeros(shape)
+        self._sum_x = np.zeros(shape)
+        self._sum_v = np.zeros(shape)
+
+    def step(self, positions, velocities, acceleration, dt):
+        self._ensure(positions)
+        a, xt, vt = self._a, self._xt, self._vt
+        sum_x, sum_v = self._sum_x, self._sum_v
+        half = 0.5 * dt
+
+        # k1 = (v, a(x, v))
+        acceleration(positions, velocities, a)
+        np.copyto(sum_x, velocities)
+        np.copyto(sum_v, a)
+
+        # k2 at x + k1 dt/2
+        np.multiply(velocities, half, out=xt)
+        xt += positions
+        np.multiply(a, half, out=vt)
+        vt += velocities
+        acceleration(xt, vt, a)
+        sum_x += vt
+        sum_x += vt
+        sum_v += a
+        sum_v += a
+
+        # k3 at x + k2 dt/2
+        np.multiply(vt, half, out=xt)
+        xt += positions
+        np.multiply(a, half, out=vt)
+        vt += velocities
+        acceleration(xt, vt, a)
+        sum_x += vt
+        sum_x += vt
+        sum_v += a
+        sum_v += a
+
+        # k4 at x + k3 dt
+        np.multiply(vt, dt, out=xt)
+        xt += positions
+        np.multiply(a, dt, out=vt)
+        vt += velocities
+        acceleration(xt, vt, a)
+        sum_x += vt
+        sum_v += a
+
+        sum_x *= dt / 6
+        sum_v *= dt / 6
+        positions += sum_x
+        velocities += sum_v
+
+
+INTEGRATORS = {
+    "euler": SemiImplicitEuler,
+    "verlet": VelocityVerlet,
+    "rk4": RungeKutta4,
+}
+
+
+class FixedTimestep:
+    """
+    Fixed timestep accumulator: render frames of any length are turned into
+    whole simulation steps of exactly `dt`, which keeps the simulation
+    deterministic and stable. The leftover time is used to interpolate
+    between the last two simulated states for drawing.
+
+    Usage:
+        stepper = FixedTimestep(world.step, world.positions, dt=1 / 240)
+        for frame_time in frame_times:
+            render_positions = stepper.advance(frame_time)
+    """
+
+    def __init__(self, step: Callable[[float], None], positions: NDArray, dt: float, max_steps_per_frame: int = 16):
+        self.step = step
+        self.positions = positions
+        self.dt = dt
+        self.max_steps_per_frame = max_steps_per_frame
+        self.accumulator = 0.0
+        self.steps = 0
+        self.dropped_time = 0.0
+        self.previous = positions.copy()
+        self.render = positions.copy()
+        self._tmp = positions.copy()
+
+    def advance(self, frame_time: float) -> NDArray:
+        """
+        Run the steps due for a frame and return the positions to draw.
+        The returned array is reused by the next call.
+        """
+        self.accumulator += frame_time
+        steps = 0
+        while self.accumulator >= self.dt:
+            if steps == self.max_steps_per_frame:
+                # Too far behind, drop the time instead of spiraling.
+                self.dropped_time += self.accumulator
+                self.accumulator = 0.0
+                break
+            np.copyto(self.previous, self.positions)
+            self.step(self.dt)
+            self.accumulator -= self.dt
+            steps += 1
+        self.steps += steps
+
+        alpha = self.accumulator / self.dt
+        np.multiply(self.previous, 1 - alpha, out=self.render)
+        np.multiply(self.positions, alpha, out=self._tmp)
+        self.render += self._tmp
+        return self.render
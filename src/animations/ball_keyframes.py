@@ -0,0 +1,104 @@
+import numpy as np
+from numpy.typing import NDArray
+
+
+def collision_frames(track: NDArray, threshold: float = 1e-6) -> NDArray:
+    """
+    Frames where the velocity of a ball jumps (a bounce or a hit),
+    found from the second difference of its positions.
+
+    Args:
+        track: Positions of one ball at every frame, shape (frames, 2)
+        threshold: Smallest change of the per-frame displacement to count
+
+    Returns:
+        Indices of the frames at which the ball changed course
+    """
+    track = np.asarray(track, dtype=np.float64)
+    if len(track) < 3:
+        return np.zeros(0, dtype=np.int64)
+    change = track[2:] - 2 * track[1:-1] + track[:-2]
+    return np.flatnonzero((change ** 2).sum(axis=1) > threshold * threshold) + 1
+
+
+def simplify(track: NDArray, tolerance: float, splits: NDArray | None = None) -> NDArray:
+    """
+    Ramer-Douglas-Peucker simplification of a timed path.
+
+    The error of a dropped frame is its distance to where linear motion
+    between the kept neighbors puts it at the same time (not the distance
+    to the line), so playing the keyframes back at constant speed stays
+    within `tolerance` of the original.
+
+    Args:
+        track: Positions of one ball at every frame, shape (frames, 2)
+        tolerance: Largest allowed distance from the original positions
+        splits: Frames that must be kept, e.g. from `collision_frames`
+
+    Returns:
+        Sorted indices of the kept frames, always with the first and last
+    """
+    track = np.asarray(track, dtype=np.float64)
+    last = len(track) - 1
+    if last <= 0:
+        return np.arange(len(track))
+    keep = np.zeros(len(track), dtype=bool)
+    keep[[0, last]] = True
+    if splits is not None:
+        keep[splits] = True
+    bounds = np.flatnonzero(keep)
+    stack = list(zip(bounds[:-1], bounds[1:]))
+    while stack:
+        a, b = stack.pop()
+        if b - a < 2:
+            continue
+        alpha = (np.arange(a + 1, b) - a) / (b - a)
+        expected = track[a] + (track[b] - track[a]) * alpha[:, None]
+        error = ((track[a + 1:b] - expected) ** 2).sum(axis=1)
+        k = int(np.argmax(error))
+        if error[k] > tolerance * tolerance:
+            k += a + 1
+            keep[k] = True
+            stack.append((a, k))
+            stack.append((k, b))
+    return np.flatnonzero(keep)
+
+
+def decimate(frames: NDArray, tolerance: float, event_threshold: float | None = 1e-6) -> list[NDArray]:
+    """
+    Keyframes of every ball of a recording.
+
+    Args:
+        frames: Positions at every frame, shape (frames, n, 2). A
+            `TrajectoryReader` gives them as `reader.data.transpose(0, 2, 1)`
+        tolerance: Largest allowed distance from the recorded positions
+        event_threshold: Passed to `collision_frames`, None to only
+            use the simplifier
+
+    Returns:
+        For every ball, the sorted indices of its keyframes
+    """
+    ret = []
+    for ball in range(frames.shape[1]):
+        track = np.asarray(frames[:, ball], dtype=np.float64)
+        splits = collision_frames(track, event_threshold) if event_threshold is not None else None
+        ret.append(simplify(track, tolerance, splits))
+    return ret
+
+
+def reduction_ratio(keyframes: list[NDArray], frame_count: int) -> float:
+    """Recorded ball frames per kept keyframe."""
+    kept = sum(len(k) for k in keyframes)
+    return len(keyframes) * frame_count / max(kept, 1)
+
+
+def segments(track: NDArray, keyframes: NDArray, frame_time: float) -> list[tuple[NDArray, float]]:
+    """
+    Straight moves between the keyframes of a ball, as
+    (target position, run time) pairs, ready for `animate.move_to`.
+    """
+    track = np.asarray(track, dtype=np.float64)
+    ret = []
+    for a, b in zip(keyframes[:-1], keyframes[1:]):
+        ret.append((track[b], (b - a) * frame_time))
+    return ret
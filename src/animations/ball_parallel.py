@@ -0,0 +1,227 @@
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+from numpy.typing import NDArray
+
+from ball_grid import GridBroadPhase
+from ball_world import BallWorld
+
+# Layout of the control block: dt, stop flag, then the strip edges.
+_DT = 0
+_STOP = 1
+_EDGES = 2
+
+
+def _attach(name: str, shape, dtype=np.float64):
+    block = shared_memory.SharedMemory(name=name)
+    return block, np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+def _strip_of(x: NDArray, edges: NDArray) -> NDArray:
+    """Strip of every x, the outer strips reach to infinity."""
+    return np.searchsorted(edges[1:-1], x, side="right")
+
+
+def _worker(rank, workers, names, count, settings, start, inner, done):
+    blocks = []
+    arrays = {}
+    for key, shape in (("positions", (count, 2)), ("velocities", (count, 2)),
+            ("radii", (count,)), ("masses", (count,)), ("control", (_EDGES + workers + 1,))):
+        block, arrays[key] = _attach(names[key], shape)
+        blocks.append(block)
+    positions = arrays["positions"]
+    velocities = arrays["velocities"]
+    radii = arrays["radii"]
+    masses = arrays["masses"]
+    control = arrays["control"]
+    integrator = settings["integrator"]()
+    gravity = settings["gravity"]
+    # Each round of the contact solver reaches one ball further,
+    # and the contact counts one more.
+    layers = settings["solver_iterations"] + 1
+    ghost = 2 * float(radii.max()) * layers if count > 0 else 0.0
+
+    def acceleration(p, v, out):
+        out[:] = gravity
+
+    try:
+        while True:
+            start.wait()
+            if control[_STOP]:
+                break
+            dt = control[_DT]
+            edges = control[_EDGES:]
+
+            # Integrate the balls of this strip. Nobody writes before all
+            # workers know their balls, or a ball could move between strips.
+            own = np.flatnonzero(_strip_of(positions[:, 0], edges) == rank)
+            p = positions[own]
+            v = velocities[own]
+            inner.wait()
+            integrator.invalidate()
+            integrator.step(p, v, acceleration, dt)
+            positions[own] = p
+            velocities[own] = v
+            inner.wait()
+
+            # Copy the strip with its ghost zones, then wait until every
+            # worker has its copy before anything is written back.
+            x = positions[:, 0]
+            lo = edges[rank] - ghost if rank > 0 else -np.inf
+            hi = edges[rank + 1] + ghost if rank < workers - 1 else np.inf
+            local = np.flatnonzero((x >= lo) & (x < hi))
+            owned = _strip_of(x[local], edges) == rank
+            world = BallWorld(positions[local], velocities[local], radii[local], masses[local],
+                settings["bounds_min"], settings["bounds_max"], settings["restitution"],
+                broad_phase=GridBroadPhase(settings["cell_size"]))
+            world.solver_iterations = settings["solver_iterations"]
+            world.resting_speed = settings["resting_speed"]
+            inner.wait()
+
+            # Pairs across a border are solved by both strips,
+            # each one keeping the result for its own ball.
+            world.collide_walls()
+            world.collide_pairs(world.broad_phase.find_pairs(world.positions, world.radii))
+            positions[local[owned]] = world.positions[owned]
+            velocities[local[owned]] = world.velocities[owned]
+            done.wait()
+    except BaseException:
+        # Don't leave the others waiting forever.
+        for barrier in (start, inner, done):
+            barrier.abort()
+        raise
+    finally:
+        del positions, velocities, radii, masses, control, arrays
+        for block in blocks:
+            block.close()
+
+
+class ParallelStepper:
+    """
+    Steps a `BallWorld` on several processes by splitting the arena into
+    vertical strips, one per worker, with the same number of balls each
+    (the edges are moved every `rebalance_every` steps).
+
+    The state lives in shared memory: while the stepper is open,
+    `world.positions` and the other arrays are views of the shared blocks,
+    so nothing is pickled per step. A step is two phases separated by
+    barriers: every worker integrates the balls in its strip, then copies
+    its strip together with the ghost zones and resolves the collisions of
+    its own balls. The ghost zones reach one largest ball diameter further
+    per round of the contact solver, so a ball near a border gets the same
+    result as in `world.step`.
+
+    Only the uniform `gravity` is applied and warm starting is not kept
+    between steps.
+
+    Usage:
+        with ParallelStepper(world, workers=4) as stepper:
+            for _ in range(steps):
+                stepper.step(dt)
+    """
+
+    def __init__(self, world: BallWorld, workers: int | None = None, rebalance_every: int = 30, cell_size: float | None = None):
+        if world.accelerations:
+            raise ValueError("acceleration fields are not supported in parallel")
+        if world.sleep is not None:
+            raise ValueError("sleeping is not supported in parallel")
+        self.world = world
+        self.workers = workers if workers is not None else mp.cpu_count()
+        self.rebalance_every = rebalance_every
+        self.steps = 0
+
+        count = world.count
+        self._blocks: dict[str, shared_memory.SharedMemory] = {}
+        self._positions = self._share("positions", world.positions)
+        self._velocities = self._share("velocities", world.velocities)
+        self._radii = self._share("radii", world.radii)
+        self._masses = self._share("masses", world.masses)
+        self._control = self._share("control", np.zeros(_EDGES + self.workers + 1))
+        world.positions = self._positions
+        world.velocities = self._velocities
+        world.radii = self._radii
+        world.masses = self._masses
+        self._rebalance()
+
+        context = mp.get_context("fork") if "fork" in mp.get_all_start_methods() else mp.get_context("spawn")
+        self._start = context.Barrier(self.workers + 1)
+        self._done = context.Barrier(self.workers + 1)
+        inner = context.Barrier(self.workers)
+        names = {key: block.name for key, block in self._blocks.items()}
+        settings = {
+            "integrator": type(world.integrator),
+            "gravity": world.gravity.copy(),
+            "bounds_min": world.bounds_min,
+            "bounds_max": world.bounds_max,
+            "restitution": world.restitution,
+            "solver_iterations": world.solver_iterations,
+            "resting_speed": world.resting_speed,
+            "cell_size": cell_size,
+        }
+        self._processes = [
+            context.Process(target=_worker, daemon=True,
+                args=(rank, self.workers, names, count, settings, self._start, inner, self._done))
+            for rank in range(self.workers)]
+        for process in self._processes:
+            process.start()
+
+    def _share(self, key: str, source: NDArray) -> NDArray:
+        """A copy of `source` in a new shared block, kept as `key`."""
+        block = shared_memory.SharedMemory(create=True, size=max(source.nbytes, 1))
+        array = np.ndarray(source.shape, dtype=np.float64, buffer=block.buf)
+        array[:] = source
+        self._blocks[key] = block
+        return array
+
+    def _rebalance(self):
+        edges = self._control[_EDGES:]
+        x = self._positions[:, 0]
+        if len(x) == 0:
+            edges[:] = np.linspace(self.world.bounds_min[0], self.world.bounds_max[0], len(edges))
+            return
+        edges[:] = np.quantile(x, np.linspace(0, 1, len(edges)))
+        edges[0] = -np.inf
+        edges[-1] = np.inf
+
+    @property
+    def edges(self) -> NDArray:
+        """Borders between the strips, the outer ones are infinite."""
+        return self._control[_EDGES:].copy()
+
+    def step(self, dt: float):
+        """Advance the simulation by `dt` seconds on all workers."""
+        if self.steps % self.rebalance_every == 0:
+            self._rebalance()
+        self._control[_DT] = dt
+        self._start.wait()
+        self._done.wait()
+        self.steps += 1
+        self.world.time += dt
+
+    def close(self):
+        """Stop the workers and give the world its own arrays back."""
+        if not self._processes:
+            return
+        self._control[_STOP] = 1
+        self._start.wait()
+        for process in self._processes:
+            process.join()
+        self._processes = []
+        world = self.world
+        world.positions = self._positions.copy()
+        world.velocities = self._velocities.copy()
+        world.radii = self._radii.copy()
+        world.masses = self._masses.copy()
+        # The views must be dropped before their blocks are closed.
+        empty = np.zeros(0)
+        self._positions = self._velocities = self._radii = self._masses = self._control = empty
+        for block in self._blocks.values():
+            block.close()
+            block.unlink()
+        self._blocks = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,325 @@
+import numpy as np
+from numpy.typing import NDArray
+
+
+class LooseQuadtree:
+    """
+    Loose quadtree over circles, stored in a flat node pool.
+
+    The tree is complete and addressed implicitly: level `L` has
+    `2^L x 2^L` nodes of side `s_L = side / 2^L`, node (x, y) of level L has
+    index `level_offset[L] + y * 2^L + x` and its children are the nodes
+    (2x + i, 2y + j) of level L + 1. The bounds of a node are loosened by
+    `s_L / 2` on every side, so a circle goes into the deepest level with
+    `r <= s_L / 2`, into the node containing its center. The tree never
+    needs splitting or merging, which keeps it array-only.
+
+    Items are kept per node in doubly linked lists (`head`, `next`, `prev`)
+    so they can be moved between nodes one by one, and `subtree_count`
+    lets queries skip empty branches.
+
+    Centers are expected to stay inside the bounds.
+    Item indices are stable: removed items leave holes.
+    """
+
+    def __init__(self, bounds_min, bounds_max, max_depth: int = 10, capacity: int = 0):
+        bounds_min = np.asarray(bounds_min, dtype=np.float64)[:2]
+        bounds_max = np.asarray(bounds_max, dtype=np.float64)[:2]
+        self.side = float(max(np.max(bounds_max - bounds_min), 1e-9))
+        self.origin = bounds_min
+        self.max_depth = max_depth
+
+        self.level_offset = np.array([(4 ** level - 1) // 3 for level in range(max_depth + 2)], dtype=np.int64)
+        node_total = int(self.level_offset[-1])
+        self.head = np.full(node_total, -1, dtype=np.int64)
+        self.node_count = np.zeros(node_total, dtype=np.int64)
+        self.subtree_count = np.zeros(node_total, dtype=np.int64)
+
+        self.count = 0
+        self.positions = np.zeros((capacity, 2))
+        self.radii = np.zeros(capacity)
+        self.item_node = np.full(capacity, -1, dtype=np.int64)
+        self.item_level = np.zeros(capacity, dtype=np.int64)
+        self.next = np.full(capacity, -1, dtype=np.int64)
+        self.prev = np.full(capacity, -1, dtype=np.int64)
+
+    @staticmethod
+    def build(positions: NDArray, radii: NDArray, bounds_min=None, bounds_max=None, max_depth: int = 10) -> 'LooseQuadtree':
+        """Bulk build from arrays. Bounds default to the extent of the centers."""
+        positions = np.asarray(positions, dtype=np.float64)[:, :2]
+        radii = np.asarray(radii, dtype=np.float64)
+        if bounds_min is None:
+            bounds_min = positions.min(axis=0) if len(positions) > 0 else np.zeros(2)
+        if bounds_max is None:
+            bounds_max = positions.max(axis=0) if len(positions) > 0 else np.ones(2)
+        ret = LooseQuadtree(bounds_min, bounds_max, max_depth, capacity=len(radii))
+        ret.insert(positions, radii)
+        return ret
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (
+            self.head, self.node_count, self.subtree_count, self.positions, self.radii,
+            self.item_node, self.item_level, self.next, self.prev))
+
+    def cell_size(self, level) -> NDArray:
+        return self.side / (1 << np.asarray(level, dtype=np.int64))
+
+    def _placement(self, positions, radii):
+        """Level and node index for circles."""
+        with np.errstate(divide="ignore"):
+            level = np.floor(np.log2(self.side / (2 * radii)))
+        level = np.clip(np.nan_to_num(level, posinf=self.max_depth), 0, self.max_depth).astype(np.int64)
+        cells = np.int64(1) << level
+        rel = (positions - self.origin) / self.cell_size(level)[:, None]
+        xy = np.clip(np.floor(rel).astype(np.int64), 0, (cells - 1)[:, None])
+        node = self.level_offset[level] + xy[:, 1] * cells + xy[:, 0]
+        return level, node
+
+    def _node_xy(self, node, level):
+        local = node - self.level_offset[level]
+        cells = np.int64(1) << level
+        return local % cells, local // cells
+
+    def _add_to_subtrees(self, node, level, amount):
+        x, y = self._node_xy(node, level)
+        for up in range(int(level.max(initial=0)) + 1):
+            ok = level >= up
+            l = level[ok] - up
+            n = self.level_offset[l] + (y[ok] >> up) * (np.int64(1) << l) + (x[ok] >> up)
+            np.add.at(self.subtree_count, n, amount)
+
+    def _grow(self, capacity):
+        if capacity <= len(self.radii):
+            return
+        capacity = max(capacity, 2 * len(self.radii))
+        def grow(array, fill):
+            ret = np.full((capacity,) + array.shape[1:], fill, dtype=array.dtype)
+            ret[:len(array)] = array
+            return ret
+        self.positions = grow(self.positions, 0.0)
+        self.radii = grow(self.radii, 0.0)
+        self.item_node = grow(self.item_node, -1)
+        self.item_level = grow(self.item_level, 0)
+        self.next = grow(self.next, -1)
+        self.prev = grow(self.prev, -1)
+
+    def _link(self, items):
+        """Push items to the front of the lists of their nodes."""
+        if len(items) == 0:
+            return
+        node = self.item_node[items]
+        order = np.argsort(node, kind="stable")
+        items = items[order]
+        node = node[order]
+        first = np.r_[True, node[1:] != node[:-1]]
+        last = np.r_[node[1:] != node[:-1], True]
+
+        # Chain each group, then put the old list after the group.
+        self.next[items[:-1]] = items[1:]
+        self.prev[items[1:]] = items[:-1]
+        group_nodes = node[first]
+        old_head = self.head[group_nodes]
+        self.next[items[last]] = old_head
+        self.prev[items[first]] = -1
+        has_old = old_head >= 0
+        self.prev[old_head[has_old]] = items[last][has_old]
+        self.head[group_nodes] = items[first]
+
+        np.add.at(self.node_count, node, 1)
+        self._add_to_subtrees(node, self.item_level[items], 1)
+
+    def _unlink(self, items):
+        """Remove items from the lists of their nodes."""
+        if len(items) == 0:
+            return
+        self._add_to_subtrees(self.item_node[items], self.item_level[items], -1)
+        np.add.at(self.node_count, self.item_node[items], -1)
+
+        # Neighbors removed at the same time are unlinked in later rounds,
+        # each round only takes items whose predecessor stays.
+        pending = np.zeros(len(self.radii), dtype=bool)
+        pending[items] = True
+        while len(items) > 0:
+            p = self.prev[items]
+            now = (p < 0) | ~pending[np.maximum(p, 0)]
+            take = items[now]
+            p = p[now]
+            n = self.next[take]
+            has_p = p >= 0
+            self.next[p[has_p]] = n[has_p]
+            self.head[self.item_node[take[~has_p]]] = n[~has_p]
+            has_n = n >= 0
+            self.prev[n[has_n]] = p[has_n]
+            pending[take] = False
+            items = items[~now]
+
+    def insert(self, positions: NDArray, radii: NDArray) -> NDArray:
+        """Add circles, returning their item indices."""
+        positions = np.atleast_2d(np.asarray(positions, dtype=np.float64))[:, :2]
+        radii = np.atleast_1d(np.asarray(radii, dtype=np.float64))
+        items = np.arange(self.count, self.count + len(radii), dtype=np.int64)
+        self._grow(self.count + len(radii))
+        self.count += len(radii)
+        self.positions[items] = positions
+        self.radii[items] = radii
+        self.item_level[items], self.item_node[items] = self._placement(positions, radii)
+        self._link(items)
+        return items
+
+    def remove(self, items):
+        items = np.atleast_1d(np.asarray(items, dtype=np.int64))
+        items = items[self.item_node[items] >= 0]
+        self._unlink(items)
+        self.item_node[items] = -1
+
+    def update(self, items, positions: NDArray, radii: NDArray | None = None):
+        """
+        Move circles (and optionally resize them).
+        Only the ones that end up in another node are relinked.
+        """
+        items = np.atleast_1d(np.asarray(items, dtype=np.int64))
+        self.positions[items] = np.atleast_2d(positions)[:, :2]
+        if radii is not None:
+            self.radii[items] = radii
+        level, node = self._placement(self.positions[items], self.radii[items])
+        moved = (node != self.item_node[items]) & (self.item_node[items] >= 0)
+        items = items[moved]
+        self._unlink(items)
+        self.item_level[items] = level[moved]
+        self.item_node[items] = node[moved]
+        self._link(items)
+
+    def alive(self) -> NDArray:
+        return np.nonzero(self.item_node[:self.count] >= 0)[0]
+
+    def node_items(self, nodes: NDArray) -> tuple[NDArray, NDArray]:
+        """
+        Items of many nodes at once, walking all lists in lockstep.
+
+        Returns:
+            (owner, items), owner[k] being the position in `nodes` of items[k]
+        """
+        nodes = np.asarray(nodes, dtype=np.int64)
+        owner = np.nonzero(self.head[nodes] >= 0)[0]
+        cursor = self.head[nodes[owner]]
+        owners = []
+        items = []
+        while len(owner) > 0:
+            owners.append(owner)
+            items.append(cursor)
+            cursor = self.next[cursor]
+            keep = cursor >= 0
+            owner = owner[keep]
+            cursor = cursor[keep]
+        if len(items) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return np.concatenate(owners), np.concatenate(items)
+
+    def query_aabb(self, lo, hi) -> NDArray:
+        """Indices of the circles overlapping the box [lo, hi]."""
+        lo = np.asarray(lo, dtype=np.float64)[:2]
+        hi = np.asarray(hi, dtype=np.float64)[:2]
+        found = []
+        nodes = np.zeros(1, dtype=np.int64)
+        for level in range(self.max_depth + 1):
+            s = self.side / (1 << level)
+            x, y = self._node_xy(nodes, np.full(len(nodes), level))
+            node_lo = self.origin + np.stack([x, y], axis=1) * s - s / 2
+            node_hi = node_lo + 2 * s
+            ok = np.all((node_lo <= hi) & (node_hi >= lo), axis=1) & (self.subtree_count[nodes] > 0)
+            if level == 0:
+                # Circles too big for the root's loose bounds still live there.
+                ok = self.subtree_count[nodes] > 0
+            nodes, x, y = nodes[ok], x[ok], y[ok]
+            if len(nodes) == 0:
+                break
+            found.append(self.node_items(nodes)[1])
+            if level == self.max_depth:
+                break
+            cells = 1 << (level + 1)
+            cx = (2 * x[:, None] + np.array([0, 1, 0, 1])).ravel()
+            cy = (2 * y[:, None] + np.array([0, 0, 1, 1])).ravel()
+            nodes = self.level_offset[level + 1] + cy * cells + cx
+
+        if len(found) == 0:
+            return np.zeros(0, dtype=np.int64)
+        items = np.concatenate(found)
+        closest = np.clip(self.positions[items], lo, hi)
+        d2 = ((self.positions[items] - closest) ** 2).sum(axis=1)
+        r = self.radii[items]
+        return np.sort(items[d2 <= r * r])
+
+    def query_radius(self, center, radius: float) -> NDArray:
+        """Indices of the circles overlapping the circle at `center`."""
+        center = np.asarray(center, dtype=np.float64)[:2]
+        items = self.query_aabb(center - radius, center + radius)
+        d2 = ((self.positions[items] - center) ** 2).sum(axis=1)
+        reach = self.radii[items] + radius
+        return items[d2 <= reach * reach]
+
+    def candidate_pairs(self) -> NDArray:
+        """
+        Unique pairs (i < j) of circles whose bounding boxes overlap,
+        as an (m, 2) array.
+
+        Two circles of the same level can only overlap if their nodes are
+        neighbors, and a circle can only overlap a bigger one stored in one
+        of the 9 nodes around its ancestor at the bigger one's level.
+        """
+        items = self.alive()
+        level = self.item_level[items]
+        x, y = self._node_xy(self.item_node[items], level)
+        used_levels = np.unique(level)
+        offsets = np.array([(dx, dy) for dy in (-1, 0, 1) for dx in (-1, 0, 1)])
+
+        i_parts = []
+        j_parts = []
+        for small in used_levels:
+            mine = level == small
+            small_items = items[mine]
+            for big in used_levels[used_levels <= small]:
+                shift = small - big
+                cells = 1 << big
+                ax = (x[mine] >> shift)[:, None] + offsets[:, 0]
+                ay = (y[mine] >> shift)[:, None] + offsets[:, 1]
+                inside = (ax >= 0) & (ax < cells) & (ay >= 0) & (ay < cells)
+                source = np.broadcast_to(np.arange(len(small_items))[:, None], ax.shape)[inside]
+                nodes = self.level_offset[big] + ay[inside] * cells + ax[inside]
+                owner, other = self.node_items(nodes)
+                i = small_items[source[owner]]
+                if big == small:
+                    keep = i < other
+                    i, other = i[keep], other[keep]
+                i_parts.append(i)
+                j_parts.append(other)
+
+        if len(i_parts) == 0:
+            return np.zeros((0, 2), dtype=np.int64)
+        i = np.concatenate(i_parts)
+        j = np.concatenate(j_parts)
+        reach = self.radii[i] + self.radii[j]
+        d = np.abs(self.positions[i] - self.positions[j])
+        overlap = (d[:, 0] <= reach) & (d[:, 1] <= reach)
+        i, j = i[overlap], j[overlap]
+        return np.stack([np.minimum(i, j), np.maximum(i, j)], axis=1)
+
+
+class QuadtreeBroadPhase:
+    """
+    Broad phase keeping a loose quadtree between steps,
+    relinking only the balls that changed node.
+    """
+
+    def __init__(self, bounds_min, bounds_max, max_depth: int = 10):
+        self.bounds_min = bounds_min
+        self.bounds_max = bounds_max
+        self.max_depth = max_depth
+        self.tree: LooseQuadtree | None = None
+
+    def find_pairs(self, positions: NDArray, radii: NDArray) -> NDArray:
+        if self.tree is None or self.tree.count != len(radii):
+            self.tree = LooseQuadtree.build(positions, radii, self.bounds_min, self.bounds_max, self.max_depth)
+        else:
+            self.tree.update(np.arange(len(radii)), positions, radii)
+        return self.tree.candidate_pairs()
@@ -0,0 +1,175 @@
+import numpy as np
+from numpy.typing import NDArray
+
+from ball_grid import UniformGrid
+
+
+class RayHits:
+    """
+    Results of a batch of ray queries, one entry per ray.
+    Rays that hit nothing have index -1, infinite distance and nan point/normal.
+    """
+    def __init__(self, index: NDArray, distance: NDArray, point: NDArray, normal: NDArray):
+        self.index = index
+        self.distance = distance
+        self.point = point
+        self.normal = normal
+
+    @property
+    def hit(self) -> NDArray:
+        return self.index >= 0
+
+
+def _ray_circle_t(origins, directions, centers, radii):
+    """
+    Distance along the (normalized) rays to where they enter the circles,
+    nan if the ray misses or starts inside the circle.
+    """
+    oc = origins - centers
+    b = (oc * directions).sum(axis=1)
+    c = (oc * oc).sum(axis=1) - radii * radii
+    disc = b * b - c
+    with np.errstate(invalid="ignore"):
+        t = -b - np.sqrt(disc)
+    t[(disc < 0) | (c < 0) | (t < 0)] = np.nan
+    return t
+
+
+def _make_hits(index, distance, origins, directions, positions, radii) -> RayHits:
+    point = np.full(origins.shape, np.nan)
+    normal = np.full(origins.shape, np.nan)
+    hit = index >= 0
+    point[hit] = origins[hit] + directions[hit] * distance[hit, None]
+    normal[hit] = (point[hit] - positions[index[hit]]) / radii[index[hit], None]
+    return RayHits(index, distance, point, normal)
+
+
+def _normalize_rays(origins, directions):
+    origins = np.atleast_2d(np.asarray(origins, dtype=np.float64))[:, :2]
+    directions = np.atleast_2d(np.asarray(directions, dtype=np.float64))[:, :2]
+    length = np.linalg.norm(directions, axis=1)
+    if np.any(length == 0):
+        raise ValueError("Ray directions must not be zero")
+    return origins, directions / length[:, None]
+
+
+def raycast_circles(
+    origins: NDArray,
+    directions: NDArray,
+    positions: NDArray,
+    radii: NDArray,
+    max_distance: float = np.inf,
+    grid: UniformGrid | None = None
+) -> RayHits:
+    """
+    Find the first circle hit by each ray.
+
+    The rays walk the cells of a uniform grid (Amanatides & Woo traversal),
+    all rays advancing one cell per iteration,
+    and only test the circles stored in the cell they are currently in.
+    Rays starting inside a circle ignore it, so a ball can cast its own rays.
+
+    Args:
+        origins: Ray origins, shape (m, 2) (or (m, 3), z is ignored)
+        directions: Ray directions, need not be normalized
+        positions: Circle centers, shape (n, 2)
+        radii: Circle radii, shape (n,)
+        max_distance: Rays stop after this distance
+        grid: A grid already built for these circles, made if not given
+
+    Returns:
+        RayHits with the circle index, distance, hit point and surface normal
+    """
+    origins, directions = _normalize_rays(origins, directions)
+    positions = np.asarray(positions, dtype=np.float64)[:, :2]
+    radii = np.asarray(radii, dtype=np.float64)
+    if grid is None:
+        grid = UniformGrid.fit(positions, radii)
+
+    m = len(origins)
+    index = np.full(m, -1, dtype=np.int64)
+    distance = np.full(m, np.inf)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inv = 1 / directions
+
+        # Clip the rays to the grid bounds (slab test).
+        t0 = (grid.bounds_min - origins) * inv
+        t1 = (grid.bounds_max - origins) * inv
+        t0 = np.where(directions == 0, -np.inf, t0)
+        t1 = np.where(directions == 0, np.inf, t1)
+        t_near = np.maximum(np.minimum(t0, t1).max(axis=1), 0)
+        t_far = np.minimum(np.maximum(t0, t1).min(axis=1), max_distance)
+        # A ray parallel to an axis only meets the grid if its origin is
+        # within the bounds on that axis; the other axis is clipped above.
+        inside = (origins >= grid.bounds_min) & (origins <= grid.bounds_max)
+        enters = np.where(directions == 0, inside, True).all(axis=1)
+        active = np.nonzero(enters & (t_near <= t_far))[0]
+
+        start = origins[active] + directions[active] * t_near[active, None]
+        col, row = grid.cell_coords(start)
+
+        step = np.where(directions[active] >= 0, 1, -1)
+        cell_lo = grid.bounds_min + np.stack([col, row], axis=1) * grid.cell_size
+        next_edge = cell_lo + (step > 0) * grid.cell_size
+        t_max = np.where(directions[active] == 0, np.inf, (next_edge - origins[active]) * inv[active])
+        t_delta = np.where(directions[active] == 0, np.inf, grid.cell_size * np.abs(inv[active]))
+
+    t_end = t_far[active]
+    while len(active) > 0:
+        cells = row * grid.cols + col
+        owner, items = grid.items_in_cells(cells)
+        t_exit = np.minimum(np.minimum(t_max[:, 0], t_max[:, 1]), t_end)
+
+        if len(items) > 0:
+            ray = active[owner]
+            t = _ray_circle_t(origins[ray], directions[ray], positions[items], radii[items])
+            # Hits past the cell exit may be blocked by circles in later cells.
+            ok = t <= t_exit[owner]
+            owner, items, t = owner[ok], items[ok], t[ok]
+            order = np.lexsort((t, owner))
+            owner, first = np.unique(owner[order], return_index=True)
+            index[active[owner]] = items[order][first]
+            distance[active[owner]] = t[order][first]
+
+        # Advance the remaining rays to the next cell.
+        keep = (index[active] < 0) & (t_exit < t_end)
+        along_x = t_max[:, 0] < t_max[:, 1]
+        col = col + np.where(along_x, step[:, 0], 0)
+        row = row + np.where(along_x, 0, step[:, 1])
+        t_max[:, 0] += np.where(along_x, t_delta[:, 0], 0)
+        t_max[:, 1] += np.where(along_x, 0, t_delta[:, 1])
+        keep &= (col >= 0) & (col < grid.cols) & (row >= 0) & (row < grid.rows)
+
+        active = active[keep]
+        col, row = col[keep], row[keep]
+        step, t_max, t_delta, t_end = step[keep], t_max[keep], t_delta[keep], t_end[keep]
+
+    return _make_hits(index, distance, origins, directions, positions, radii)
+
+
+def raycast_circles_brute_force(
+    origins: NDArray,
+    directions: NDArray,
+    positions: NDArray,
+    radii: NDArray,
+    max_distance: float = np.inf
+) -> RayHits:
+    """Reference implementation testing every ray against every circle."""
+    origins, directions = _normalize_rays(origins, directions)
+    positions = np.asarray(positions, dtype=np.float64)[:, :2]
+    radii = np.asarray(radii, dtype=np.float64)
+
+    m = len(origins)
+    index = np.full(m, -1, dtype=np.int64)
+    distance = np.full(m, np.inf)
+    for k in range(m):
+        o = np.broadcast_to(origins[k], positions.shape)
+        d = np.broadcast_to(directions[k], positions.shape)
+        t = _ray_circle_t(o, d, positions, radii)
+        t[t > max_distance] = np.nan
+        if np.all(np.isnan(t)):
+            continue
+        index[k] = np.nanargmin(t)
+        distance[k] = t[index[k]]
+    return _make_hits(index, distance, origins, directions, positions, radii)
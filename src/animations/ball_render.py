@@ -0,0 +1,83 @@
+from manim import *
+from numpy.typing import NDArray
+
+
+def unit_circle_points(components: int = 8) -> NDArray:
+    """
+    Cubic Bezier points of a unit circle around the origin, in the manim
+    layout of 4 points per curve, shape (4 * components, 3).
+    """
+    angles = np.linspace(0, TAU, components + 1)
+    start, end = angles[:-1], angles[1:]
+    # Handle length that makes a cubic curve closest to a circular arc.
+    k = 4 / 3 * np.tan(TAU / components / 4)
+    p0 = np.stack([np.cos(start), np.sin(start)], axis=1)
+    p3 = np.stack([np.cos(end), np.sin(end)], axis=1)
+    p1 = p0 + k * np.stack([-np.sin(start), np.cos(start)], axis=1)
+    p2 = p3 - k * np.stack([-np.sin(end), np.cos(end)], axis=1)
+    ret = np.zeros((components, 4, 3))
+    ret[:, :, :2] = np.stack([p0, p1, p2, p3], axis=1)
+    return ret.reshape(-1, 3)
+
+
+class BallCloud(VGroup):
+    """
+    Many filled circles drawn as a handful of mobjects.
+
+    The balls of one color are the subpaths of a single `VMobject`, so the
+    renderer makes one fill call per color instead of one mobject per ball.
+    The points of all balls are computed from the position and radius
+    arrays at once, and updated in place by `set_positions`, so one
+    updater on the cloud replaces an updater per ball.
+
+    Usage:
+        cloud = BallCloud(world.positions, world.radii, colors=BLUE)
+        cloud.add_updater(lambda m, dt: m.set_positions(next(frames)))
+    """
+
+    def __init__(
+        self,
+        positions: NDArray,
+        radii: NDArray | float,
+        colors=BLUE,
+        fill_opacity: float = 1.0,
+        components: int = 8,
+        **kwargs
+    ):
+        super().__init__(**kwargs)
+        positions = np.asarray(positions, dtype=np.float64)
+        count = len(positions)
+        self.radii = np.broadcast_to(np.asarray(radii, dtype=np.float64), (count,)).copy()
+        self.positions = np.zeros((count, 3))
+        self.template = unit_circle_points(components)
+
+        # One layer per distinct color.
+        if isinstance(colors, (str, ManimColor)):
+            colors = [colors] * count
+        names = [ManimColor(c).to_hex() for c in colors]
+        palette, index = np.unique(names, return_inverse=True)
+        self.members = [np.flatnonzero(index == k) for k in range(len(palette))]
+        for color in palette:
+            self.add(VMobject(fill_color=color, fill_opacity=fill_opacity, stroke_width=0))
+        self.set_positions(positions)
+
+    @property
+    def count(self) -> int:
+        return len(self.radii)
+
+    def set_positions(self, positions: NDArray, radii: NDArray | None = None) -> 'BallCloud':
+        """Move all balls at once (positions of shape (n, 2) or (n, 3))."""
+        positions = np.asarray(positions)
+        self.positions[:, :positions.shape[1]] = positions
+        if radii is not None:
+            self.radii[:] = radii
+        per_ball = len(self.template)
+        for layer, members in zip(self.submobjects, self.members):
+            shape = (len(members), per_ball, 3)
+            if layer.points.shape != (shape[0] * per_ball, 3):
+                layer.set_points(np.zeros((shape[0] * per_ball, 3)))
+            # Written into the existing point array, without a new one per frame.
+            points = layer.points.reshape(shape)
+            np.multiply(self.template[None], self.radii[members, None, None], out=points)
+            points += self.positions[members, None, :]
+        return self
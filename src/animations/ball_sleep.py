@@ -0,0 +1,207 @@
+import numpy as np
+from numpy.typing import NDArray
+
+from ball_grid import UniformGrid
+
+
+def connected_components(count: int, pairs: NDArray) -> NDArray:
+    """
+    Connected components of a graph given by its edges.
+
+    Every node starts with its own index as the label, then each edge
+    lowers both ends to the smaller label and the labels are shortcut
+    (label = label[label]) until nothing changes. All of it is done
+    on the whole edge array at once.
+
+    Args:
+        count: Number of nodes
+        pairs: Edges, shape (m, 2)
+
+    Returns:
+        The component of every node, numbered 0, 1, ... in order
+        of the smallest node of the component, shape (count,)
+    """
+    label = np.arange(count, dtype=np.int64)
+    if len(pairs) == 0:
+        return label
+    i = pairs[:, 0]
+    j = pairs[:, 1]
+    while True:
+        low = np.minimum(label[i], label[j])
+        new = label.copy()
+        np.minimum.at(new, i, low)
+        np.minimum.at(new, j, low)
+        while True:
+            jumped = new[new]
+            if np.array_equal(jumped, new):
+                break
+            new = jumped
+        if np.array_equal(new, label):
+            break
+        label = new
+    return np.unique(label, return_inverse=True)[1]
+
+
+class BallSleep:
+    """
+    Puts resting balls of a `BallWorld` to sleep: sleeping balls are not
+    integrated and not put into the broad phase.
+
+    A ball is still while its average speed over every `steps` steps stays
+    below `speed_threshold`: it must not leave the circle of radius
+    `speed_threshold * steps * dt` around where it was `steps` steps ago.
+    The speed is measured from the actual displacement rather than the
+    velocity, and averaging it lets the small kicks of the contact solver
+    inside a pile pass.
+
+    Balls touching each other (closer than `margin`) form an island.
+    An island falls asleep as a whole once all of its balls have been still
+    for `steps` steps in a row, and wakes up as a whole as soon as an awake
+    ball touches any of its balls. Islands are only looked for every
+    `steps // 4` steps, which delays falling asleep a little but keeps the
+    cost of the step down. Sleeping balls are kept in a static
+    uniform grid, rebuilt only when an island falls asleep or wakes up.
+
+    Usage:
+        world = BallWorld(..., sleep=BallSleep())
+    """
+
+    def __init__(self, speed_threshold: float = 0.2, steps: int = 60, margin: float = 0.01):
+        self.speed_threshold = speed_threshold
+        self.steps = steps
+        self.margin = margin
+        self.still = np.zeros(0, dtype=np.int64)
+        self.anchor = np.zeros((0, 2))
+        self.awake = np.zeros(0, dtype=bool)
+        # Island of every sleeping ball, -1 for the awake ones.
+        self.island = np.zeros(0, dtype=np.int64)
+        self.sleeping_grid: UniformGrid | None = None
+        self._next_island = 0
+        self._since_islands = 0
+        self._sleeping = np.zeros(0, dtype=np.int64)
+
+    @property
+    def active_count(self) -> int:
+        return int(np.count_nonzero(self.awake))
+
+    def _ensure(self, count: int):
+        if len(self.awake) != count:
+            self.still = np.zeros(count, dtype=np.int64)
+            self.anchor = np.full((count, 2), np.inf)
+            self.awake = np.ones(count, dtype=bool)
+            self.island = np.full(count, -1, dtype=np.int64)
+            self.sleeping_grid = None
+
+    def _rebuild_grid(self, world):
+        sleeping = np.flatnonzero(~self.awake)
+        if len(sleeping) == 0:
+            self.sleeping_grid = None
+            return
+        self.sleeping_grid = UniformGrid.fit(world.positions[sleeping], world.radii[sleeping])
+        self._sleeping = sleeping
+
+    def wake(self, world, balls: NDArray):
+        """
+        Wake up the given balls together with their whole islands.
+        Call it after changing a sleeping ball by hand.
+        """
+        self._ensure(world.count)
+        islands = self.island[balls]
+        islands = np.unique(islands[islands >= 0])
+        if len(islands) == 0:
+            return
+        woken = np.isin(self.island, islands)
+        self.awake[woken] = True
+        self.island[woken] = -1
+        self.still[woken] = 0
+        self.anchor[woken] = np.inf
+        world.integrator.invalidate()
+        self._rebuild_grid(world)
+
+    def step(self, world, dt: float):
+        """`BallWorld.step` with the sleeping balls left out."""
+        self._ensure(world.count)
+        awake = np.flatnonzero(self.awake)
+        all_awake = len(awake) == world.count
+        if len(awake) == 0:
+            return
+
+        # Integrate the awake balls only.
+        if all_awake:
+            world.integrator.step(world.positions, world.velocities, world.acceleration_at, dt)
+        else:
+            positions = world.positions[awake]
+            velocities = world.velocities[awake]
+            world.active = awake
+            try:
+                world.integrator.step(positions, velocities, world.acceleration_at, dt)
+            finally:
+                world.active = None
+            world.positions[awake] = positions
+            world.velocities[awake] = velocities
+        changed = world.collide_walls()
+
+        # Broad phase over the awake balls, the margin makes the pairs
+        # usable for the islands as well.
+        radii = world.radii[awake] + 0.5 * self.margin
+        positions = world.positions[awake]
+        pairs = awake[world.broad_phase.find_pairs(positions, radii)]
+
+        # Awake balls touching sleeping ones wake their islands.
+        if self.sleeping_grid is not None:
+            owner, items = self.sleeping_grid.query_circles(positions, radii + 0.5 * self.margin)
+            if len(owner) > 0:
+                pairs = np.concatenate([pairs, np.stack([awake[owner], self._sleeping[items]], axis=1)])
+                self.wake(world, self._sleeping[items])
+                changed = True
+
+        changed |= world.collide_pairs(pairs)
+        if changed:
+            world.integrator.invalidate()
+
+        # A ball that left the circle around its anchor starts over from
+        # there. Still balls move the anchor along every `steps` steps, so
+        # a slow creep doesn't add up.
+        positions = world.positions[awake]
+        moved = ((positions - self.anchor[awake]) ** 2).sum(axis=1)
+        limit = self.speed_threshold * self.steps * dt
+        restart = moved > limit * limit
+        still = np.where(restart, 0, self.still[awake] + 1)
+        self.still[awake] = still
+        renew = restart | (still % self.steps == 0)
+        self.anchor[awake[renew]] = positions[renew]
+
+        self._since_islands += 1
+        if self._since_islands >= max(1, self.steps // 4):
+            self._since_islands = 0
+            self._sleep_islands(world, pairs)
+
+    def _sleep_islands(self, world, pairs: NDArray):
+        awake = np.flatnonzero(self.awake)
+        if len(awake) == 0 or self.still[awake].max() < self.steps:
+            return
+        # Only pairs that really touch (within the margin) link balls.
+        i, j = pairs[:, 0], pairs[:, 1]
+        d2 = ((world.positions[i] - world.positions[j]) ** 2).sum(axis=1)
+        reach = world.radii[i] + world.radii[j] + self.margin
+        pairs = pairs[d2 <= reach * reach]
+
+        # Map to the compact indices of the awake balls.
+        compact = np.full(world.count, -1, dtype=np.int64)
+        compact[awake] = np.arange(len(awake))
+        pairs = compact[pairs]
+        pairs = pairs[(pairs >= 0).all(axis=1)]
+        component = connected_components(len(awake), pairs)
+
+        least_still = np.full(component.max() + 1, np.iinfo(np.int64).max)
+        np.minimum.at(least_still, component, self.still[awake])
+        asleep = least_still[component] >= self.steps
+        if not np.any(asleep):
+            return
+        balls = awake[asleep]
+        self.awake[balls] = False
+        self.island[balls] = self._next_island + component[asleep]
+        self._next_island += int(component.max()) + 1
+        world.velocities[balls] = 0
+        world.integrator.invalidate()
+        self._rebuild_grid(world)
@@ -0,0 +1,137 @@
+import struct
+from pathlib import Path
+from typing import Iterator
+import numpy as np
+from numpy.typing import NDArray
+
+# magic, count, dtype, dt, frames
+_HEADER = struct.Struct("<8sq8sdq")
+_MAGIC = b"BALLTRJ1"
+
+
+class TrajectoryWriter:
+    """
+    Appends the positions of all balls, step after step, to a file mapped
+    into memory with `np.memmap`, so a long simulation never has to keep
+    its history in RAM.
+
+    The file is a small header (ball count, dtype, dt, frame count)
+    followed by the frames. A frame is stored as a structure of arrays:
+    all x coordinates, then all y coordinates. The file grows in chunks
+    of `chunk_frames` frames and is cut to size on `close`.
+
+    Usage:
+        with TrajectoryWriter(path, world.count, dt) as writer:
+            for _ in range(steps):
+                world.step(dt)
+                writer.append(world.positions)
+    """
+
+    def __init__(self, path, count: int, dt: float, dtype=np.float32, chunk_frames: int = 1024):
+        self.path = Path(path)
+        self.count = count
+        self.dt = dt
+        self.dtype = np.dtype(dtype)
+        self.chunk_frames = chunk_frames
+        self.frames = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "wb") as file:
+            file.write(self._header())
+        self._capacity = 0
+        self._data: np.memmap | None = None
+        self._grow()
+
+    def _header(self) -> bytes:
+        return _HEADER.pack(_MAGIC, self.count, self.dtype.str.encode(), self.dt, self.frames)
+
+    @property
+    def frame_nbytes(self) -> int:
+        return 2 * self.count * self.dtype.itemsize
+
+    def _grow(self):
+        if self._data is not None:
+            self._data.flush()
+            self._data = None
+        self._capacity += self.chunk_frames
+        with open(self.path, "r+b") as file:
+            file.truncate(_HEADER.size + self._capacity * self.frame_nbytes)
+        self._data = np.memmap(self.path, dtype=self.dtype, mode="r+",
+            offset=_HEADER.size, shape=(self._capacity, 2, self.count))
+
+    def append(self, positions: NDArray):
+        """Store the positions (shape (count, 2)) of the next step."""
+        if self.frames == self._capacity:
+            self._grow()
+        self._data[self.frames] = positions[:, :2].T
+        self.frames += 1
+
+    def close(self):
+        """Write the frame count into the header and cut the unused chunk."""
+        if self._data is None:
+            return
+        self._data.flush()
+        self._data = None
+        with open(self.path, "r+b") as file:
+            file.write(self._header())
+            file.truncate(_HEADER.size + self.frames * self.frame_nbytes)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class TrajectoryReader:
+    """
+    Reads a file made by `TrajectoryWriter` lazily: only the frames
+    being looked at are paged in by the operating system.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as file:
+            magic, count, dtype, dt, frames = _HEADER.unpack(file.read(_HEADER.size))
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not a trajectory file")
+        self.count = count
+        self.dtype = np.dtype(dtype.rstrip(b"\0").decode())
+        self.dt = dt
+        if frames == 0:
+            # An empty file can't be mapped.
+            self.data = np.zeros((0, 2, count), dtype=self.dtype)
+        else:
+            self.data = np.memmap(self.path, dtype=self.dtype, mode="r",
+                offset=_HEADER.size, shape=(frames, 2, count))
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    @property
+    def duration(self) -> float:
+        return max(len(self) - 1, 0) * self.dt
+
+    def frame(self, index: int) -> NDArray:
+        """Positions of the balls at a stored step, shape (count, 2)."""
+        return np.array(self.data[index], dtype=np.float64).T
+
+    def at_time(self, time: float) -> NDArray:
+        """Positions at any time, interpolated between the two closest steps."""
+        index = np.clip(time / self.dt, 0, len(self) - 1)
+        i = int(min(np.floor(index), len(self) - 2)) if len(self) > 1 else 0
+        alpha = index - i
+        ret = self.frame(i)
+        if alpha > 0:
+            ret += (self.frame(i + 1) - ret) * alpha
+        return ret
+
+    def stream(self, frame_rate: float, start: float = 0.0, stop: float | None = None) -> Iterator[NDArray]:
+        """
+        Positions at every rendered frame from `start` to `stop` (the end
+        of the recording by default), one frame at a time. Memory use does
+        not depend on the length of the recording.
+        """
+        stop = self.duration if stop is None else stop
+        frames = int(round((stop - start) * frame_rate))
+        for k in range(frames + 1):
+            yield self.at_time(start + k / frame_rate)
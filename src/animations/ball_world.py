@@ -0,0 +1,212 @@
+import numpy as np
+from numpy.typing import NDArray
+
+from ball_grid import GridBroadPhase
+from ball_integrators import Integrator, SemiImplicitEuler
+
+
+class BallWorld:
+    """
+    The ball simulation from lab 3, with the state stored as arrays
+    (structure of arrays): one row per ball.
+
+    The broad phase is any object with a
+    `find_pairs(positions, radii) -> (m, 2) array` method
+    (see `ball_grid.GridBroadPhase` and `ball_sap.SweepAndPrune`).
+
+    Forces other than the uniform `gravity` go into `accelerations`,
+    a list of callables `field(world, positions, velocities)` returning an
+    (n, 2) array (see `ball_gravity.NBodyGravity`). The positions and
+    velocities passed in may be an intermediate state of the integrator.
+
+    The integrator (see `ball_integrators`) defaults to semi-implicit Euler.
+
+    With `sleep` (see `ball_sleep.BallSleep`) resting balls are left out of
+    the step. The fields then only get the awake balls, whose indices are in
+    `active` (None while every ball is simulated).
+    """
+
+    def __init__(
+        self,
+        positions: NDArray,
+        velocities: NDArray,
+        radii: NDArray,
+        masses: NDArray | None = None,
+        bounds_min=(-4, -4),
+        bounds_max=(4, 4),
+        restitution: float = 1.0,
+        broad_phase=None,
+        integrator: Integrator | None = None,
+        sleep=None
+    ):
+        self.positions = np.array(positions, dtype=np.float64)[:, :2]
+        self.velocities = np.array(velocities, dtype=np.float64)[:, :2]
+        self.radii = np.array(radii, dtype=np.float64)
+        if masses is None:
+            # Uniform density discs.
+            masses = self.radii ** 2
+        self.masses = np.array(masses, dtype=np.float64)
+        self.bounds_min = np.array(bounds_min, dtype=np.float64)
+        self.bounds_max = np.array(bounds_max, dtype=np.float64)
+        self.restitution = restitution
+        self.gravity = np.zeros(2)
+        self.accelerations: list = []
+        self.broad_phase = broad_phase if broad_phase is not None else GridBroadPhase()
+        self.integrator = integrator if integrator is not None else SemiImplicitEuler()
+        # Rounds of the contact solver, and the approach speed below which
+        # a contact rests instead of bouncing (about 0.5 for piles).
+        self.solver_iterations = 4
+        self.resting_speed = 0.0
+        self._contact_keys = np.zeros(0, dtype=np.int64)
+        self._contact_impulses = np.zeros(0)
+        self.sleep = sleep
+        self.active: NDArray | None = None
+        self.time = 0.0
+
+    @staticmethod
+    def random(
+        count: int,
+        bounds_min=(-4, -4),
+        bounds_max=(4, 4),
+        radius_range=(0.05, 0.15),
+        max_speed: float = 2.0,
+        seed: int | None = None,
+        **kwargs
+    ) -> 'BallWorld':
+        """Balls scattered uniformly over the arena with random velocities."""
+        rng = np.random.default_rng(seed)
+        bounds_min = np.asarray(bounds_min, dtype=np.float64)
+        bounds_max = np.asarray(bounds_max, dtype=np.float64)
+        radii = rng.uniform(*radius_range, count)
+        positions = rng.uniform(bounds_min + radii[:, None], bounds_max - radii[:, None])
+        angles = rng.uniform(0, 2 * np.pi, count)
+        speeds = max_speed * np.sqrt(rng.uniform(0, 1, count))
+        velocities = np.stack([np.cos(angles), np.sin(angles)], axis=1) * speeds[:, None]
+        return BallWorld(positions, velocities, radii,
+            bounds_min=bounds_min, bounds_max=bounds_max, **kwargs)
+
+    @property
+    def count(self) -> int:
+        return len(self.radii)
+
+    def kinetic_energy(self) -> float:
+        return float(0.5 * (self.masses * (self.velocities ** 2).sum(axis=1)).sum())
+
+    def acceleration_at(self, positions: NDArray, velocities: NDArray, out: NDArray):
+        """Total acceleration of every ball for a given state, written into `out`."""
+        out[:] = self.gravity
+        for field in self.accelerations:
+            out += field(self, positions, velocities)
+
+    def acceleration(self) -> NDArray:
+        """Total acceleration of every ball, shape (n, 2)."""
+        ret = np.zeros_like(self.positions)
+        self.acceleration_at(self.positions, self.velocities, ret)
+        return ret
+
+    def step(self, dt: float):
+        """Advance the simulation by `dt` seconds."""
+        if self.sleep is not None:
+            self.sleep.step(self, dt)
+            self.time += dt
+            return
+        self.integrator.step(self.positions, self.velocities, self.acceleration_at, dt)
+        changed = self.collide_walls()
+        pairs = self.broad_phase.find_pairs(self.positions, self.radii)
+        changed |= self.collide_pairs(pairs)
+        if changed:
+            self.integrator.invalidate()
+        self.time += dt
+
+    def collide_walls(self):
+        """
+        Keep the balls inside the bounds, reflecting the velocity
+        only if it points out of the arena (lab 3, 1.3).
+        Returns whether any ball was touched.
+        """
+        lo = self.bounds_min + self.radii[:, None]
+        hi = self.bounds_max - self.radii[:, None]
+        below = self.positions < lo
+        above = self.positions > hi
+        if not np.any(below | above):
+            return False
+        flip = (below & (self.velocities < 0)) | (above & (self.velocities > 0))
+        self.velocities[flip] *= -self.restitution
+        np.clip(self.positions, lo, hi, out=self.positions)
+        return True
+
+    def collide_pairs(self, pairs: NDArray):
+        """
+        Narrow phase and response for candidate pairs (lab 3, 2.1 and 2.2).
+
+        Overlapping balls moving toward each other exchange momentum along
+        the collision normal and are pushed apart until they barely touch.
+        Impulses of all pairs are accumulated at once, over
+        `solver_iterations` rounds. A pair is scaled down by the contact
+        count of its busiest ball, so piles don't explode, while each pair
+        still conserves momentum. Balls resting on a wall can't be pushed
+        into it.
+
+        The impulse of every resting contact is remembered and applied up
+        front on the next step (warm starting), so a pile carries its own
+        weight instead of slowly sinking into itself.
+        Returns whether any pair was touching.
+        """
+        known_keys = self._contact_keys
+        self._contact_keys = np.zeros(0, dtype=np.int64)
+        if len(pairs) == 0:
+            return False
+        i = pairs[:, 0]
+        j = pairs[:, 1]
+        delta = self.positions[j] - self.positions[i]
+        dist = np.sqrt((delta ** 2).sum(axis=1))
+        overlap = self.radii[i] + self.radii[j] - dist
+        touching = (overlap > 0) & (dist > 0)
+        if not np.any(touching):
+            return False
+
+        i, j = i[touching], j[touching]
+        normal = delta[touching] / dist[touching, None]
+        overlap = overlap[touching]
+        inv_i = 1 / self.masses[i]
+        inv_j = 1 / self.masses[j]
+        inv_sum = inv_i + inv_j
+        contacts = np.bincount(i, minlength=self.count) + np.bincount(j, minlength=self.count)
+        share = np.minimum(1, 2 / np.maximum(contacts[i], contacts[j]))
+
+        key = i * self.count + j
+        impulse = np.zeros(len(key))
+        if len(known_keys) > 0:
+            k = np.minimum(np.searchsorted(known_keys, key), len(known_keys) - 1)
+            known = known_keys[k] == key
+            impulse[known] = self._contact_impulses[k[known]]
+
+        relative = ((self.velocities[j] - self.velocities[i]) * normal).sum(axis=1)
+        bouncing = relative < -self.resting_speed
+        target = np.where(bouncing, -self.restitution * relative, 0)
+        at_min = self.positions <= self.bounds_min + self.radii[:, None]
+        at_max = self.positions >= self.bounds_max - self.radii[:, None]
+
+        def apply(amount):
+            np.add.at(self.velocities, i, -(amount * inv_i)[:, None] * normal)
+            np.add.at(self.velocities, j, (amount * inv_j)[:, None] * normal)
+            np.maximum(self.velocities, 0, out=self.velocities, where=at_min)
+            np.minimum(self.velocities, 0, out=self.velocities, where=at_max)
+
+        apply(impulse)
+        for _ in range(self.solver_iterations):
+            relative = ((self.velocities[j] - self.velocities[i]) * normal).sum(axis=1)
+            total = np.maximum(impulse + (target - relative) / inv_sum * share, 0)
+            apply(total - impulse)
+            impulse = total
+
+        # Only the part stopping the balls is carried over, the bounce
+        # would otherwise be applied twice.
+        order = np.argsort(key)
+        self._contact_keys = key[order]
+        self._contact_impulses = np.where(bouncing, impulse / (1 + self.restitution), impulse)[order]
+
+        push = (overlap * share / inv_sum)[:, None] * normal
+        np.add.at(self.positions, i, -push * inv_i[:, None])
+        np.add.at(self.positions, j, push * inv_j[:, None])
+        return True
@@ -0,0 +1,59 @@
+"""
+Accuracy and speed of the Barnes-Hut gravity against the exact sum.
+
+The exact sum over all bodies is only run up to --exact-limit bodies;
+above that it is timed on a sample of targets and extrapolated.
+Errors are always measured on the sampled targets.
+
+Run from src/animations:
+    python -m benchmarks.bench_ball_gravity [--counts 1000 10000 100000]
+"""
+import argparse
+import time
+import numpy as np
+
+from ball_gravity import BarnesHutTree, gravity_exact
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--counts", type=int, nargs="+", default=[1000, 10_000, 100_000])
+    parser.add_argument("--thetas", type=float, nargs="+", default=[0.3, 0.5, 0.8])
+    parser.add_argument("--samples", type=int, default=500)
+    parser.add_argument("--exact-limit", type=int, default=10_000)
+    parser.add_argument("--softening", type=float, default=1e-3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    for n in args.counts:
+        # A disc galaxy-like blob: dense center, sparse outskirts.
+        positions = rng.normal(size=(n, 2)) * rng.uniform(0.2, 1.0, (n, 1))
+        masses = rng.uniform(0.5, 1.5, n)
+        targets = rng.choice(n, size=min(args.samples, n), replace=False)
+
+        start = time.perf_counter()
+        reference = gravity_exact(positions, masses, softening=args.softening, targets=targets)
+        exact_time = (time.perf_counter() - start) * n / len(targets)
+        note = "extrapolated"
+        if n <= args.exact_limit:
+            start = time.perf_counter()
+            gravity_exact(positions, masses, softening=args.softening)
+            exact_time = time.perf_counter() - start
+            note = "measured"
+        print(f"{n} bodies: exact {exact_time:9.3f} s ({note})")
+
+        magnitude = np.linalg.norm(reference, axis=1)
+        for theta in args.thetas:
+            start = time.perf_counter()
+            tree = BarnesHutTree(positions, masses)
+            build = time.perf_counter() - start
+            approx = tree.accelerations(theta, softening=args.softening)
+            total = time.perf_counter() - start
+            error = np.linalg.norm(approx[targets] - reference, axis=1) / magnitude
+            print(f"  theta {theta:.2f}: {total:8.3f} s (build {build * 1e3:6.1f} ms), "
+                f"{exact_time / total:7.1f}x faster, "
+                f"relative error median {np.median(error):.2e}, p99 {np.percentile(error, 99):.2e}")
+
+
+if __name__ == "__main__":
+    main()
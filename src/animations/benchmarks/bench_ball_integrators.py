@@ -0,0 +1,98 @@
+"""
+Steps per second, energy drift and allocations of the ball integrators.
+
+Run from src/animations:
+    python -m benchmarks.bench_ball_integrators [--count 2000] [--bodies 100]
+"""
+import argparse
+import time
+import tracemalloc
+import numpy as np
+
+from ball_gravity import NBodyGravity
+from ball_integrators import INTEGRATORS, FixedTimestep
+from ball_world import BallWorld
+
+
+def orbit_system(count, rng):
+    """A heavy sun with light planets on roughly circular orbits."""
+    sun_mass = 100.0
+    r = rng.uniform(1, 5, count)
+    angle = rng.uniform(0, 2 * np.pi, count)
+    positions = np.stack([np.cos(angle), np.sin(angle)], axis=1) * r[:, None]
+    speed = np.sqrt(sun_mass / r)
+    velocities = np.stack([-np.sin(angle), np.cos(angle)], axis=1) * speed[:, None]
+    masses = rng.uniform(0.001, 0.01, count)
+    return (np.vstack([[0, 0], positions]),
+        np.vstack([[0, 0], velocities]),
+        np.r_[sun_mass, masses])
+
+
+def energy(gravity, positions, velocities, masses):
+    kinetic = 0.5 * (masses * (velocities ** 2).sum(axis=1)).sum()
+    return kinetic + gravity.potential_energy(positions, masses)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=2000, help="Balls in the bouncing world")
+    parser.add_argument("--bodies", type=int, default=100, help="Planets in the orbit system")
+    parser.add_argument("--duration", type=float, default=20.0)
+    args = parser.parse_args()
+
+    print(f"bouncing world, {args.count} balls, uniform gravity, collisions on")
+    for name, make in INTEGRATORS.items():
+        world = BallWorld.random(args.count, radius_range=(0.02, 0.06), seed=0, integrator=make())
+        world.gravity = np.array([0, -9.8])
+        stepper = FixedTimestep(world.step, world.positions, dt=1 / 240)
+        start = time.perf_counter()
+        frames = 60
+        for _ in range(frames):
+            stepper.advance(1 / 60)
+        elapsed = time.perf_counter() - start
+        print(f"  {name:6s} {stepper.steps / elapsed:8.0f} steps/s")
+
+    print(f"\norbits, {args.bodies} planets, exact gravity, {args.duration} time units")
+    rng = np.random.default_rng(0)
+    x0, v0, masses = orbit_system(args.bodies, rng)
+    gravity = NBodyGravity(softening=0.05, exact_limit=10 ** 9)
+
+    def acceleration(positions, velocities, out):
+        out[:] = gravity.compute(positions, masses)
+
+    e0 = energy(gravity, x0, v0, masses)
+    for dt in (0.01, 0.002):
+        for name, make in INTEGRATORS.items():
+            integrator = make()
+            x = x0.copy()
+            v = v0.copy()
+            steps = int(round(args.duration / dt))
+            start = time.perf_counter()
+            for _ in range(steps):
+                integrator.step(x, v, acceleration, dt)
+            elapsed = time.perf_counter() - start
+            drift = abs(energy(gravity, x, v, masses) - e0) / abs(e0)
+            print(f"  dt {dt:<6} {name:6s} {steps / elapsed:8.0f} steps/s, "
+                f"{integrator.evaluations} evals/step, relative energy drift {drift:.2e}")
+
+    # An acceleration that does not allocate, to measure the integrators alone.
+    g = np.array([0.0, -9.8])
+    def uniform(positions, velocities, out):
+        out[:] = g
+
+    print("\nallocations per step (integrator only)")
+    for name, make in INTEGRATORS.items():
+        integrator = make()
+        x = np.zeros((args.count, 2))
+        v = np.zeros((args.count, 2))
+        integrator.step(x, v, uniform, 0.01)
+        tracemalloc.start()
+        for _ in range(100):
+            integrator.step(x, v, uniform, 0.01)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"  {name:6s} peak traced {peak} bytes over 100 steps of {x.nbytes} byte arrays")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Keyframe decimation of recorded ball trajectories: how many frames are
+left, how far the keyframes are from the recording, and (if manim is
+installed) how long a scene takes to play per-frame updates compared
+to long `animate.move_to` segments.
+
+Run from src/animations:
+    python -m benchmarks.bench_ball_keyframes [--count 200] [--duration 20]
+"""
+import argparse
+import importlib
+import time
+import numpy as np
+
+from ball_keyframes import decimate, reduction_ratio
+from ball_world import BallWorld
+
+FPS = 60
+SUBSTEPS = 8
+
+
+def max_error(frames, keyframes):
+    """Largest distance between the recording and linear playback of the keyframes."""
+    worst = 0.0
+    t = np.arange(len(frames))
+    for k, kept in enumerate(keyframes):
+        x = np.interp(t, kept, frames[kept, k, 0])
+        y = np.interp(t, kept, frames[kept, k, 1])
+        d = np.hypot(x - frames[:, k, 0], y - frames[:, k, 1])
+        worst = max(worst, float(d.max()))
+    return worst
+
+
+def time_render(frames, radii, tolerance):
+    """Seconds to play the scene both ways, with manim not writing any file."""
+    from manim import Scene, Circle, VGroup, ValueTracker, linear, tempconfig
+    scene_module = importlib.import_module("03_balls_bouncing")
+    duration = (len(frames) - 1) / FPS
+
+    def make_balls():
+        return VGroup(*[Circle(radius=r).move_to([*frames[0, k], 0]) for k, r in enumerate(radii)])
+
+    class PerFrame(Scene):
+        def construct(self):
+            balls = make_balls()
+            time_tracker = ValueTracker(0)
+            for k, ball in enumerate(balls):
+                ball.add_updater(lambda m, k=k: m.move_to(
+                    [*frames[min(int(round(time_tracker.get_value() * FPS)), len(frames) - 1), k], 0]))
+            self.add(balls)
+            self.play(time_tracker.animate.set_value(duration), run_time=duration, rate_func=linear)
+
+    class Keyframes(Scene):
+        def construct(self):
+            balls = make_balls()
+            self.add(balls)
+            self.play(*scene_module.keyframe_animations(balls, frames, FPS, tolerance))
+
+    ret = []
+    for scene_class in (PerFrame, Keyframes):
+        with tempconfig({"dry_run": True, "frame_rate": FPS, "disable_caching": True}):
+            start = time.perf_counter()
+            scene_class().render()
+            ret.append(time.perf_counter() - start)
+    return ret
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--tolerance", type=float, default=0.005)
+    args = parser.parse_args()
+
+    world = BallWorld.random(args.count, bounds_min=(-10, -10), bounds_max=(10, 10),
+        radius_range=(0.1, 0.3), max_speed=3.0, seed=0)
+    frame_count = int(round(args.duration * FPS)) + 1
+    frames = np.zeros((frame_count, world.count, 2))
+    frames[0] = world.positions
+    for frame in range(1, frame_count):
+        for _ in range(SUBSTEPS):
+            world.step(1 / (FPS * SUBSTEPS))
+        frames[frame] = world.positions
+
+    print(f"{args.count} balls, {frame_count} frames at {FPS} fps, tolerance {args.tolerance}")
+    for name, threshold in (("rdp only", None), ("collisions + rdp", 1e-6)):
+        start = time.perf_counter()
+        keyframes = decimate(frames, args.tolerance, threshold)
+        elapsed = time.perf_counter() - start
+        kept = sum(len(k) for k in keyframes)
+        print(f"  {name:18s} {kept:8d} keyframes  ratio {reduction_ratio(keyframes, frame_count):6.1f}x"
+            f"  max error {max_error(frames, keyframes):.4f}  {elapsed * 1000:7.1f} ms")
+
+    try:
+        importlib.import_module("manim")
+    except ImportError:
+        print("\nmanim is not installed, skipping the render timing")
+        return
+    per_frame, keyframed = time_render(frames, world.radii, args.tolerance)
+    print(f"\nscene play (dry run): per-frame updaters {per_frame:.2f} s, "
+        f"keyframe segments {keyframed:.2f} s ({per_frame / keyframed:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
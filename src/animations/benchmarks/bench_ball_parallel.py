@@ -0,0 +1,82 @@
+"""
+Strong and weak scaling of the parallel ball step.
+
+Strong scaling keeps the ball count fixed while adding workers,
+weak scaling grows the arena with the workers so that every worker
+keeps the same number of balls at the same density.
+
+Run from src/animations:
+    python -m benchmarks.bench_ball_parallel [--count 50000] [--max-workers 8]
+"""
+import argparse
+import os
+import time
+import numpy as np
+
+from ball_parallel import ParallelStepper
+from ball_world import BallWorld
+
+DT = 1 / 240
+DENSITY = 400  # balls per unit of area, about 10% covered with radius 0.01
+
+
+def make_world(count):
+    half = np.sqrt(count / DENSITY) / 2
+    world = BallWorld.random(count, bounds_min=(-half, -half), bounds_max=(half, half),
+        radius_range=(0.005, 0.015), seed=0, restitution=0.8)
+    world.gravity = np.array([0, -9.8])
+    return world
+
+
+def time_serial(count, steps):
+    world = make_world(count)
+    world.step(DT)
+    start = time.perf_counter()
+    for _ in range(steps):
+        world.step(DT)
+    return (time.perf_counter() - start) / steps
+
+
+def time_parallel(count, workers, steps):
+    world = make_world(count)
+    with ParallelStepper(world, workers) as stepper:
+        stepper.step(DT)
+        start = time.perf_counter()
+        for _ in range(steps):
+            stepper.step(DT)
+        return (time.perf_counter() - start) / steps
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=50_000, help="Balls for strong scaling, per worker for weak")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count())
+    parser.add_argument("--steps", type=int, default=20)
+    args = parser.parse_args()
+    workers = [1]
+    while workers[-1] * 2 <= args.max_workers:
+        workers.append(workers[-1] * 2)
+    if workers[-1] != args.max_workers:
+        workers.append(args.max_workers)
+    print(f"{os.cpu_count()} cores available")
+
+    serial = time_serial(args.count, args.steps)
+    print(f"\nstrong scaling, {args.count} balls, serial step {serial * 1000:.1f} ms")
+    print(f"{'workers':>8s} {'ms/step':>9s} {'speedup':>8s} {'efficiency':>10s}")
+    base = None
+    for k in workers:
+        elapsed = time_parallel(args.count, k, args.steps)
+        base = base or elapsed
+        print(f"{k:8d} {elapsed * 1000:9.1f} {base / elapsed:8.2f} {base / elapsed / k:10.0%}")
+
+    print(f"\nweak scaling, {args.count} balls per worker")
+    print(f"{'workers':>8s} {'balls':>8s} {'ms/step':>9s} {'efficiency':>10s}")
+    base = None
+    for k in workers:
+        elapsed = time_parallel(args.count * k, k, args.steps)
+        base = base or elapsed
+        print(f"{k:8d} {args.count * k:8d} {elapsed * 1000:9.1f} {base / elapsed:10.0%}")
+
+
+if __name__ == "__main__":
+    main()
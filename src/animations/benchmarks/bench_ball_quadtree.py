@@ -0,0 +1,74 @@
+"""
+Loose quadtree vs uniform grid on skewed ball sizes:
+a few big "boulders" among many small "pebbles".
+
+Run from src/animations:
+    python -m benchmarks.bench_ball_quadtree [--count 20000] [--ratio 100]
+"""
+import argparse
+import time
+import numpy as np
+
+from ball_grid import UniformGrid
+from ball_quadtree import LooseQuadtree
+
+ARENA = 200.0
+
+
+def timed(function, repeat=3):
+    best = np.inf
+    ret = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ret = function()
+        best = min(best, time.perf_counter() - start)
+    return best, ret
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=20_000)
+    parser.add_argument("--ratio", type=float, default=100.0, help="Boulder to pebble radius ratio")
+    parser.add_argument("--boulders", type=float, default=0.005, help="Fraction of boulders")
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    pebble = rng.uniform(0.05, 0.1, args.count)
+    is_boulder = rng.random(args.count) < args.boulders
+    radii = np.where(is_boulder, pebble * args.ratio, pebble)
+    positions = rng.uniform(0, ARENA, (args.count, 2))
+    centers = rng.uniform(0, ARENA, (args.queries, 2))
+    query_radius = 1.0
+
+    print(f"{args.count} balls, {is_boulder.sum()} boulders {args.ratio:.0f}x bigger")
+
+    def grid_with(cell_size):
+        return lambda: UniformGrid.fit(positions, radii, cell_size)
+
+    candidates = {
+        "grid, cell = 2 mean r": grid_with(2 * radii.mean()),
+        "grid, cell = 2 max r": grid_with(2 * radii.max()),
+        "loose quadtree": lambda: LooseQuadtree.build(positions, radii, (0, 0), (ARENA, ARENA)),
+    }
+
+    reference = None
+    for name, build in candidates.items():
+        build_time, index = timed(build)
+        pairs_time, pairs = timed(index.candidate_pairs)
+        query_time, _ = timed(lambda: [index.query_radius(c, query_radius) for c in centers], repeat=1)
+        if reference is None:
+            reference = len(pairs)
+        entries = len(index.cell_items) if isinstance(index, UniformGrid) else index.count
+        print(f"  {name:22s} build {build_time * 1e3:8.1f} ms, pairs {pairs_time * 1e3:8.1f} ms "
+            f"({len(pairs)}{'' if len(pairs) == reference else ' MISMATCH'}), "
+            f"radius query {query_time / args.queries * 1e6:7.1f} us, {entries} stored entries")
+
+    tree = LooseQuadtree.build(positions, radii, (0, 0), (ARENA, ARENA))
+    moved = np.clip(positions + rng.normal(0, 0.05, positions.shape), 0, ARENA)
+    update_time, _ = timed(lambda: tree.update(np.arange(args.count), moved), repeat=1)
+    print(f"  quadtree incremental update of all balls: {update_time * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Batched ray queries against a large population of circles.
+
+Run from src/animations:
+    python -m benchmarks.bench_ball_raycast [--rays 10000] [--circles 100000]
+"""
+import argparse
+import time
+import numpy as np
+
+from ball_grid import UniformGrid
+from ball_raycast import raycast_circles, raycast_circles_brute_force
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rays", type=int, default=10_000)
+    parser.add_argument("--circles", type=int, default=100_000)
+    parser.add_argument("--coverage", type=float, default=0.1,
+        help="Fraction of the arena covered by circles")
+    parser.add_argument("--max-distance", type=float, default=np.inf)
+    parser.add_argument("--check", type=int, default=200,
+        help="Rays checked against the brute force version")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    radii = rng.uniform(0.5, 1.5, args.circles)
+    side = np.sqrt(np.pi * (radii ** 2).sum() / args.coverage)
+    positions = rng.uniform(0, side, (args.circles, 2))
+    origins = rng.uniform(0, side, (args.rays, 2))
+    angles = rng.uniform(0, 2 * np.pi, args.rays)
+    directions = np.stack([np.cos(angles), np.sin(angles)], axis=1)
+
+    start = time.perf_counter()
+    grid = UniformGrid.fit(positions, radii)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    hits = raycast_circles(origins, directions, positions, radii, args.max_distance, grid=grid)
+    query = time.perf_counter() - start
+
+    k = min(args.check, args.rays)
+    start = time.perf_counter()
+    reference = raycast_circles_brute_force(origins[:k], directions[:k], positions, radii, args.max_distance)
+    brute = (time.perf_counter() - start) / k * args.rays
+
+    mismatches = np.count_nonzero(hits.index[:k] != reference.index)
+
+    # Axis-aligned rays from outside the grid, e.g. straight up from below it.
+    lanes = rng.uniform(0, side, k)
+    outside = np.concatenate([
+        np.stack([lanes, np.full(k, -5.0)], axis=1), np.stack([lanes, np.full(k, side + 5)], axis=1),
+        np.stack([np.full(k, -5.0), lanes], axis=1), np.stack([np.full(k, side + 5), lanes], axis=1)])
+    aligned = np.repeat([[0.0, 1.0], [0.0, -1.0], [1.0, 0.0], [-1.0, 0.0]], k, axis=0)
+    aligned_hits = raycast_circles(outside, aligned, positions, radii, args.max_distance, grid=grid)
+    aligned_reference = raycast_circles_brute_force(outside, aligned, positions, radii, args.max_distance)
+    aligned_mismatches = np.count_nonzero(aligned_hits.index != aligned_reference.index)
+    print(f"{args.rays} rays x {args.circles} circles, arena {side:.0f}x{side:.0f}, "
+        f"grid {grid.cols}x{grid.rows}")
+    print(f"grid build:  {build * 1e3:8.1f} ms")
+    print(f"grid query:  {query * 1e3:8.1f} ms ({query / args.rays * 1e6:.2f} us/ray), "
+        f"{hits.hit.mean() * 100:.1f}% hit, mean distance {hits.distance[hits.hit].mean():.2f}")
+    print(f"brute force: {brute * 1e3:8.1f} ms (extrapolated from {k} rays)")
+    print(f"speedup:     {brute / (build + query):8.1f}x, mismatches in checked rays: {mismatches}")
+    print(f"axis-aligned rays from outside the grid: {len(outside)} checked, {aligned_mismatches} mismatches")
+
+
+if __name__ == "__main__":
+    main()
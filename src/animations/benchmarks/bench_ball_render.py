@@ -0,0 +1,86 @@
+"""
+Time per frame of drawing moving balls: one `Circle` with its own
+updater per ball against a single `BallCloud` updated from arrays.
+A frame is running the updaters and capturing the mobjects with the
+Cairo camera. Needs manim.
+
+Run from src/animations:
+    python -m benchmarks.bench_ball_render [--counts 100 10000 100000] [--frames 10]
+"""
+import argparse
+import time
+import numpy as np
+from manim import BLUE, GREEN, RED, YELLOW, Camera, Circle, VGroup
+
+from ball_render import BallCloud
+
+COLORS = [BLUE, GREEN, RED, YELLOW]
+
+
+def make_frames(count, frames, rng):
+    start = rng.uniform(-3.5, 3.5, (count, 2))
+    velocity = rng.normal(0, 0.05, (count, 2))
+    return [start + velocity * k for k in range(frames)]
+
+
+def bench_circles(count, frames, radii, colors):
+    start = time.perf_counter()
+    group = VGroup(*[Circle(radius=radii[k], color=colors[k], fill_opacity=1, stroke_width=0)
+        .move_to([*frames[0][k], 0]) for k in range(count)])
+    frame = {"index": 0}
+    for k, ball in enumerate(group):
+        ball.add_updater(lambda m, k=k: m.move_to([*frames[frame["index"]][k], 0]))
+    build = time.perf_counter() - start
+
+    camera = Camera()
+    start = time.perf_counter()
+    for index in range(1, len(frames)):
+        frame["index"] = index
+        group.update(1 / 30)
+        camera.reset()
+        camera.capture_mobject(group)
+    return build, (time.perf_counter() - start) / (len(frames) - 1)
+
+
+def bench_cloud(count, frames, radii, colors):
+    start = time.perf_counter()
+    cloud = BallCloud(frames[0], radii, colors=colors)
+    frame = {"index": 0}
+    cloud.add_updater(lambda m: m.set_positions(frames[frame["index"]]))
+    build = time.perf_counter() - start
+
+    camera = Camera()
+    start = time.perf_counter()
+    for index in range(1, len(frames)):
+        frame["index"] = index
+        cloud.update(1 / 30)
+        camera.reset()
+        camera.capture_mobject(cloud)
+    return build, (time.perf_counter() - start) / (len(frames) - 1)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--counts", type=int, nargs="+", default=[100, 10_000, 100_000])
+    parser.add_argument("--frames", type=int, default=10)
+    parser.add_argument("--max-circles", type=int, default=10_000,
+        help="Largest count to try with one Circle per ball")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'balls':>8s} {'mode':>8s} {'build s':>8s} {'ms/frame':>9s}")
+    for count in args.counts:
+        frames = make_frames(count, args.frames + 1, rng)
+        radii = rng.uniform(0.01, 0.05, count)
+        colors = [COLORS[k] for k in rng.integers(0, len(COLORS), count)]
+        if count <= args.max_circles:
+            build, per_frame = bench_circles(count, frames, radii, colors)
+            print(f"{count:8d} {'circles':>8s} {build:8.2f} {per_frame * 1000:9.1f}")
+        else:
+            print(f"{count:8d} {'circles':>8s} {'skipped (--max-circles)':>18s}")
+        build, per_frame = bench_cloud(count, frames, radii, colors)
+        print(f"{count:8d} {'cloud':>8s} {build:8.2f} {per_frame * 1000:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Pile settling: balls fall to the floor of the arena and come to rest,
+simulated with and without sleeping. Near the end one ball is thrown
+into the pile, which wakes it up again.
+
+Run from src/animations:
+    python -m benchmarks.bench_ball_sleep [--count 2000] [--duration 10]
+"""
+import argparse
+import time
+import numpy as np
+
+from ball_sleep import BallSleep
+from ball_world import BallWorld
+
+DT = 1 / 240
+
+
+def simulate(count, duration, kick_time, sleep):
+    world = BallWorld.random(count, radius_range=(0.04, 0.08), seed=0,
+        restitution=0.2, sleep=sleep)
+    world.gravity = np.array([0, -9.8])
+    world.resting_speed = 0.5
+
+    rows = []
+    steps_per_second = int(round(1 / DT))
+    for second in range(int(duration)):
+        if second == kick_time:
+            # Throw the highest ball down into the pile, waking it by hand.
+            ball = int(np.argmax(world.positions[:, 1]))
+            world.positions[ball] = (0, 3.5)
+            world.velocities[ball] = (0, -8)
+            if sleep is not None:
+                sleep.wake(world, np.array([ball]))
+        active = 0
+        start = time.perf_counter()
+        for _ in range(steps_per_second):
+            world.step(DT)
+            active += sleep.active_count if sleep is not None else count
+        elapsed = time.perf_counter() - start
+        rows.append((active / steps_per_second, elapsed / steps_per_second))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=2000)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--kick", type=int, default=8, help="Second at which a ball hits the pile")
+    args = parser.parse_args()
+
+    print(f"{args.count} balls, restitution 0.2, {1 / DT:.0f} steps per second")
+    before = simulate(args.count, args.duration, args.kick, None)
+    after = simulate(args.count, args.duration, args.kick, BallSleep())
+
+    print(f"{'second':>6s} {'active':>8s} {'ms/step':>8s} {'active':>8s} {'ms/step':>8s}")
+    print(f"{'':6s} {'(no sleep)':>17s} {'(sleep)':>17s}")
+    for second, ((a0, t0), (a1, t1)) in enumerate(zip(before, after)):
+        print(f"{second:6d} {a0:8.0f} {t0 * 1000:8.2f} {a1:8.0f} {t1 * 1000:8.2f}")
+    total0 = sum(t for _, t in before)
+    total1 = sum(t for _, t in after)
+    print(f"\nmean step time: {total0 / len(before) * 1000:.2f} ms without sleep, "
+        f"{total1 / len(after) * 1000:.2f} ms with sleep ({total0 / total1:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Broad phase comparison: brute force, uniform grid and sweep and prune
+(sorting from scratch every step vs repairing the previous order).
+
+Balls drift with constant velocities and bounce off the walls,
+so the order changes slowly from step to step like in the ball scenes.
+
+Run from src/animations:
+    python -m benchmarks.bench_broad_phase [--count 5000] [--steps 60]
+"""
+import argparse
+import time
+import numpy as np
+
+from ball_grid import BruteForceBroadPhase, GridBroadPhase
+from ball_sap import SweepAndPrune
+
+ARENA = 100.0
+RADIUS = (0.2, 0.4)
+
+
+def make_regime(name, count, rng):
+    radii = rng.uniform(*RADIUS, count)
+    if name == "sparse":
+        positions = rng.uniform(0, ARENA, (count, 2))
+    elif name == "clustered":
+        centers = rng.uniform(0.1 * ARENA, 0.9 * ARENA, (8, 2))
+        positions = centers[rng.integers(0, len(centers), count)] + rng.normal(0, 2, (count, 2))
+    elif name == "one-cell":
+        # Everything inside a single grid cell.
+        positions = ARENA / 2 + rng.uniform(0, 2 * RADIUS[0], (count, 2))
+    else:
+        raise ValueError(name)
+    velocities = rng.normal(0, 0.5, (count, 2))
+    return positions, velocities, radii
+
+
+def snapshots(positions, velocities, steps, dt=1 / 60):
+    positions = positions.copy()
+    velocities = velocities.copy()
+    for _ in range(steps):
+        positions += velocities * dt
+        out = (positions < 0) | (positions > ARENA)
+        velocities[out] *= -1
+        yield positions
+
+
+def run(broad_phase, frames, radii):
+    pair_counts = []
+    start = time.perf_counter()
+    for positions in frames:
+        pair_counts.append(len(broad_phase.find_pairs(positions, radii)))
+    return (time.perf_counter() - start) / len(frames), pair_counts
+
+
+def order_time(frames, radii, cold: bool):
+    """Time per step spent ordering the endpoints alone, from scratch or repaired."""
+    sap = SweepAndPrune()
+    start = time.perf_counter()
+    for positions in frames:
+        if cold:
+            sap.reset()
+        sap.sorted_endpoints(positions, radii)
+    return (time.perf_counter() - start) / len(frames)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=5000)
+    parser.add_argument("--one-cell-count", type=int, default=1500)
+    parser.add_argument("--steps", type=int, default=60)
+    parser.add_argument("--brute-force-limit", type=int, default=5000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    cell_size = 2 * np.mean(RADIUS) * 2
+
+    for regime in ("sparse", "clustered", "one-cell"):
+        count = args.one_cell_count if regime == "one-cell" else args.count
+        positions, velocities, radii = make_regime(regime, count, rng)
+        frames = [p.copy() for p in snapshots(positions, velocities, args.steps)]
+
+        cold = SweepAndPrune()
+        class ColdSweepAndPrune:
+            def find_pairs(self, positions, radii):
+                cold.reset()
+                return cold.find_pairs(positions, radii)
+
+        warm = SweepAndPrune()
+        methods = {
+            "grid": GridBroadPhase(cell_size),
+            "sap, full sort": ColdSweepAndPrune(),
+            "sap, coherent": warm,
+        }
+        if count <= args.brute_force_limit:
+            methods = {"brute force": BruteForceBroadPhase(), **methods}
+
+        print(f"{regime}: {count} balls, {args.steps} steps")
+        reference = None
+        for name, broad_phase in methods.items():
+            per_step, pair_counts = run(broad_phase, frames, radii)
+            if reference is None:
+                reference = pair_counts
+            agree = "ok" if pair_counts == reference else "MISMATCH"
+            extra = ""
+            if name.startswith("sap"):
+                extra = f", ordering {order_time(frames, radii, broad_phase is not warm) * 1e3:.2f} ms"
+            if broad_phase is warm:
+                extra += f", last repair moved {warm.swaps} endpoints"
+            print(f"  {name:16s} {per_step * 1e3:9.2f} ms/step, "
+                f"{np.mean(pair_counts):10.0f} pairs ({agree}){extra}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Publishing a scene as GIF and MP4: two full renders (one per format)
+against one render into the `frame_cache` and both encodes from it, in
+parallel. The cached outputs go to a temporary directory; the full
+renders write where the scene does (the MP4 is removed afterwards).
+Needs manim.
+
+Run from src/animations:
+    python -m benchmarks.bench_frame_cache [--module 01_lab_velocity_decompose --scene VelocityDecomposition]
+"""
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import frame_cache
+import helper
+import render_server
+
+
+def full_render(module, scene, profile, fmt, preloaded):
+    helper.DEFAULT_FORMAT = fmt
+    try:
+        start = time.perf_counter()
+        result = render_server.run_job({"module": module, "scene": scene, "profile": profile,
+            "config": {"disable_caching": True}}, lambda event: None, preloaded)
+        return time.perf_counter() - start, result["output"]
+    finally:
+        helper.DEFAULT_FORMAT = "gif"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--module", default="01_lab_velocity_decompose")
+    parser.add_argument("--scene", default="VelocityDecomposition")
+    parser.add_argument("--profile", default="low", choices=sorted(render_server.PROFILES))
+    args = parser.parse_args()
+
+    preloaded = render_server.preload()
+    gif_seconds, _ = full_render(args.module, args.scene, args.profile, "gif", preloaded)
+    mp4_seconds, mp4_path = full_render(args.module, args.scene, args.profile, "mp4", preloaded)
+    if mp4_path:
+        os.remove(mp4_path)
+
+    with tempfile.TemporaryDirectory() as root:
+        cache = frame_cache.FrameCache(Path(root) / "cache")
+        start = time.perf_counter()
+        entry = cache.render(args.module, args.scene, args.profile)
+        render_seconds = time.perf_counter() - start
+        encodes = frame_cache.export(entry, ["gif", "mp4"], Path(root) / "out")
+        cached_seconds = time.perf_counter() - start
+
+        print(f"{args.module}.{args.scene}, profile {args.profile}: {entry.frame_count} frames, "
+            f"{len(entry.repeats)} drawn, cache entry {entry.nbytes / (1 << 20):.1f} MiB")
+        print(f"  two full renders  {gif_seconds + mp4_seconds:7.2f} s  (gif {gif_seconds:.2f}, mp4 {mp4_seconds:.2f})")
+        print(f"  frame cache       {cached_seconds:7.2f} s  (render {render_seconds:.2f}, "
+            + ", ".join(f"{fmt} {seconds:.2f}" for fmt, _, seconds in encodes) + " in parallel)")
+        print(f"  {(gif_seconds + mp4_seconds) / cached_seconds:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
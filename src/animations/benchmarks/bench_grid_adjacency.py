@@ -0,0 +1,111 @@
+"""
+Build time, memory and traversal speed of the CSR neighbor index.
+The vectorized breadth-first search runs on the full grid; the
+per-node loops (tuple arithmetic with bounds checks against walking
+the CSR arrays) run on a smaller one.
+
+Run from src/animations:
+    python -m benchmarks.bench_grid_adjacency [--size 4096] [--loop-size 512]
+"""
+import argparse
+import time
+from collections import deque
+import numpy as np
+
+from grid_adjacency import GridAdjacency, ORTHOGONAL, DIAGONAL
+
+
+def bfs_tuples(blocked, start, offsets):
+    """Flood fill the way the scenes walk the grid: tuples and bounds checks."""
+    rows, cols = len(blocked), len(blocked[0])
+    distance = {start: 0}
+    queue = deque([start])
+    while queue:
+        r, c = queue.popleft()
+        d = distance[(r, c)] + 1
+        for dr, dc in offsets:
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < rows and 0 <= nc < cols and not blocked[nr][nc] and (nr, nc) not in distance:
+                distance[(nr, nc)] = d
+                queue.append((nr, nc))
+    return distance
+
+
+def bfs_csr_loop(indptr, indices, start, count):
+    """Same loop over the flat arrays of the index."""
+    distance = [-1] * count
+    distance[start] = 0
+    queue = deque([start])
+    while queue:
+        node = queue.popleft()
+        d = distance[node] + 1
+        for e in range(indptr[node], indptr[node + 1]):
+            n = indices[e]
+            if distance[n] < 0:
+                distance[n] = d
+                queue.append(n)
+    return distance
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=4096)
+    parser.add_argument("--loop-size", type=int, default=512)
+    parser.add_argument("--density", type=float, default=0.2)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    for diagonal in (False, True):
+        name = "8-neighborhood" if diagonal else "4-neighborhood"
+        n = args.size
+        blocked = rng.random((n, n)) < args.density
+        adjacency = GridAdjacency(n, n, diagonal=diagonal)
+        full_edges = adjacency.edge_count
+        full_bytes = adjacency.nbytes
+
+        start = time.perf_counter()
+        removed = adjacency.remove_blocked(blocked)
+        remove = time.perf_counter() - start
+        start = time.perf_counter()
+        adjacency.weights
+        weights = time.perf_counter() - start
+
+        source = int(np.flatnonzero(~blocked.ravel())[0])
+        start = time.perf_counter()
+        distance = adjacency.bfs(source)
+        bfs = time.perf_counter() - start
+
+        print(f"{name}, grid {n}x{n}, obstacle density {args.density}")
+        print(f"  build {adjacency.build_seconds:6.2f} s, {full_edges} edges, {full_bytes / 2**20:7.1f} MiB")
+        print(f"  remove blocked {remove:6.2f} s ({removed} edges), weights {weights:5.2f} s, "
+            f"now {adjacency.nbytes / 2**20:7.1f} MiB with weights")
+        print(f"  vectorized bfs {bfs:6.2f} s, {int((distance >= 0).sum())} cells reached, "
+            f"{int(distance.max())} steps deep")
+        del adjacency, distance
+
+        m = args.loop_size
+        small = rng.random((m, m)) < args.density
+        small[0, 0] = False
+        grid = small.tolist()
+        offsets = ORTHOGONAL + (DIAGONAL if diagonal else [])
+        start = time.perf_counter()
+        bfs_tuples(grid, (0, 0), offsets)
+        tuples = time.perf_counter() - start
+
+        adjacency = GridAdjacency(m, m, diagonal=diagonal)
+        adjacency.remove_blocked(small, corner_cutting=True)
+        start = time.perf_counter()
+        bfs_csr_loop(adjacency.indptr.tolist(), adjacency.indices.tolist(), 0, m * m)
+        csr_loop = time.perf_counter() - start
+        start = time.perf_counter()
+        adjacency.bfs(0)
+        vectorized = time.perf_counter() - start
+        start = time.perf_counter()
+        adjacency.dijkstra(0)
+        dijkstra = time.perf_counter() - start
+        print(f"  {m}x{m} flood fill: tuples {tuples * 1e3:7.1f} ms, csr loop {csr_loop * 1e3:7.1f} ms, "
+            f"vectorized {vectorized * 1e3:7.1f} ms; dijkstra {dijkstra * 1e3:7.1f} ms\n")
+
+
+if __name__ == "__main__":
+    main()
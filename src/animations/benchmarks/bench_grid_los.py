@@ -0,0 +1,62 @@
+"""
+Build time, memory and lookup speed of the line-of-sight cache.
+
+Run from src/animations:
+    python -m benchmarks.bench_grid_los [--size 512] [--radii 8 16 32]
+"""
+import argparse
+import time
+import numpy as np
+
+from grid_los import LineOfSightCache
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=512)
+    parser.add_argument("--radii", type=int, nargs="+", default=[8, 16, 32])
+    parser.add_argument("--density", type=float, default=0.15)
+    parser.add_argument("--lookups", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    n = args.size
+    blocked = rng.random((n, n)) < args.density
+
+    print(f"grid {n}x{n}, obstacle density {args.density}")
+    for radius in args.radii:
+        estimate = LineOfSightCache.estimate_nbytes(n, n, radius)
+        cache = LineOfSightCache(blocked, max_radius=radius)
+
+        src_r = rng.integers(0, n, args.lookups)
+        src_c = rng.integers(0, n, args.lookups)
+        dst_r = np.clip(src_r + rng.integers(-radius, radius + 1, args.lookups), 0, n - 1)
+        dst_c = np.clip(src_c + rng.integers(-radius, radius + 1, args.lookups), 0, n - 1)
+        start = time.perf_counter()
+        cache.sees_many(src_r, src_c, dst_r, dst_c)
+        batched = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i in range(10_000):
+            cache.sees((src_r[i], src_c[i]), (dst_r[i], dst_c[i]))
+        single = (time.perf_counter() - start) / 10_000
+
+        edits = 16
+        cells_r = rng.integers(0, n, edits)
+        cells_c = rng.integers(0, n, edits)
+        start = time.perf_counter()
+        recomputed = 0
+        for r, c in zip(cells_r, cells_c):
+            recomputed += cache.set_blocked(r, c, not cache.blocked[r, c])
+        edit = (time.perf_counter() - start) / edits
+
+        print(f"radius {radius:3d}: "
+            f"build {cache.build_seconds:7.2f} s, "
+            f"bits {estimate / 2**20:7.1f} MiB, total {cache.nbytes / 2**20:7.1f} MiB, "
+            f"batched lookup {batched / args.lookups * 1e9:6.1f} ns, "
+            f"single lookup {single * 1e6:5.2f} us, "
+            f"toggle {edit * 1e3:6.2f} ms ({recomputed // edits} entries)")
+
+
+if __name__ == "__main__":
+    main()
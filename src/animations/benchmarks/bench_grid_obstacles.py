@@ -0,0 +1,121 @@
+"""
+Obstacle queries on large maps: the packed `ObstacleLayer` against a
+set of (row, col) tuples like `object_cells` in the raycast scenes.
+Reports build time, memory, and the time per point, box and circle
+query. The set side is timed on fewer queries and scaled.
+
+Run from src/animations:
+    python -m benchmarks.bench_grid_obstacles [--size 4096] [--density 0.1]
+"""
+import argparse
+import sys
+import time
+import numpy as np
+
+from grid_obstacles import ObstacleLayer
+
+
+def set_nbytes(cells: set) -> int:
+    """Size of the set and of the tuples and ints it holds."""
+    ret = sys.getsizeof(cells)
+    for cell in cells:
+        ret += sys.getsizeof(cell) + sys.getsizeof(cell[0]) + sys.getsizeof(cell[1])
+    return ret
+
+
+def set_box(cells, r0, c0, r1, c1):
+    return any((r, c) in cells for r in range(r0, r1) for c in range(c0, c1))
+
+
+def set_circle(cells, x, y, radius):
+    for r in range(int(np.floor(y - radius)), int(np.floor(y + radius)) + 1):
+        for c in range(int(np.floor(x - radius)), int(np.floor(x + radius)) + 1):
+            nx = min(max(x, c), c + 1) - x
+            ny = min(max(y, r), r + 1) - y
+            if nx * nx + ny * ny < radius * radius and (r, c) in cells:
+                return True
+    return False
+
+
+def per_query(seconds, count):
+    return f"{seconds / count * 1e9:10.1f} ns"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=4096)
+    parser.add_argument("--density", type=float, default=0.1)
+    parser.add_argument("--queries", type=int, default=1_000_000)
+    parser.add_argument("--set-queries", type=int, default=20_000)
+    parser.add_argument("--box", type=int, default=16, help="Largest box side, in cells")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    n = args.size
+    mask = rng.random((n, n)) < args.density
+    rows, cols = np.nonzero(mask)
+
+    start = time.perf_counter()
+    cells = set(zip(rows.tolist(), cols.tolist()))
+    set_build = time.perf_counter() - start
+    start = time.perf_counter()
+    layer = ObstacleLayer.from_cells(n, n, np.stack([rows, cols], axis=1))
+    layer_build = time.perf_counter() - start
+    start = time.perf_counter()
+    layer.summed_area
+    sat_build = time.perf_counter() - start
+
+    print(f"grid {n}x{n}, {len(cells)} obstacles")
+    print(f"  set of tuples  build {set_build:6.2f} s, {set_nbytes(cells) / 2**20:8.1f} MiB")
+    print(f"  bit layer      build {layer_build:6.2f} s, {layer.bits.nbytes / 2**20:8.1f} MiB bits, "
+        f"summed-area table {sat_build:.2f} s, {layer.nbytes / 2**20:8.1f} MiB total")
+
+    q, s = args.queries, args.set_queries
+    qr = rng.integers(0, n, q)
+    qc = rng.integers(0, n, q)
+    side_r = rng.integers(1, args.box + 1, q)
+    side_c = rng.integers(1, args.box + 1, q)
+    centers = rng.uniform(0, n, (q, 2))
+    radii = rng.uniform(0.5, args.box / 2, q)
+
+    print(f"\n{'query':8s} {'set':>13s} {'layer':>13s}")
+    start = time.perf_counter()
+    for i in range(s):
+        (qr[i], qc[i]) in cells
+    by_set = time.perf_counter() - start
+    start = time.perf_counter()
+    layer.is_blocked(qr, qc)
+    by_layer = time.perf_counter() - start
+    print(f"{'point':8s} {per_query(by_set, s)} {per_query(by_layer, q)}")
+
+    start = time.perf_counter()
+    for i in range(s):
+        set_box(cells, qr[i], qc[i], qr[i] + side_r[i], qc[i] + side_c[i])
+    by_set = time.perf_counter() - start
+    start = time.perf_counter()
+    layer.count_rect(qr, qc, qr + side_r, qc + side_c)
+    by_layer = time.perf_counter() - start
+    print(f"{'box':8s} {per_query(by_set, s)} {per_query(by_layer, q)}")
+
+    start = time.perf_counter()
+    for i in range(s):
+        set_circle(cells, centers[i, 0], centers[i, 1], radii[i])
+    by_set = time.perf_counter() - start
+    start = time.perf_counter()
+    layer.overlaps_circle(centers, radii)
+    by_layer = time.perf_counter() - start
+    print(f"{'circle':8s} {per_query(by_set, s)} {per_query(by_layer, q)}")
+
+    start = time.perf_counter()
+    layer.fill_rect(n // 4, n // 4, n // 2, n // 2)
+    layer.set_cells(qr[:10_000], qc[:10_000], False)
+    edit = time.perf_counter() - start
+    start = time.perf_counter()
+    layer.summed_area
+    rebuild = time.perf_counter() - start
+    print(f"\nbulk edit (a {n // 4}x{n // 4} rect and 10000 cells) {edit * 1e3:.1f} ms, "
+        f"summed-area table rebuild {rebuild * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Building the shapes of a raycast iteration (highlight squares, a tick
+and an arrow) anew every time, like the raycast scenes do, against
+taking them from `helper.MobjectPool`s and releasing them after each
+iteration. Reports the time per iteration, the mobjects built, and the
+memory blocks allocated (tracemalloc) once the pools are warm. This is
+only the shapes: labels and animations are built every time either way.
+The raycast scenes play their whole loop at once, where no shape can
+come back, so they do not use the pools. Needs manim.
+
+Run from src/animations:
+    python -m benchmarks.bench_mobject_pool [--iterations 200] [--cells 4]
+"""
+import argparse
+import time
+import tracemalloc
+import numpy as np
+from manim import GREEN, ORIGIN, RIGHT, UP, Arrow, Line, Square, VGroup
+
+from helper import MobjectPool
+
+
+def make_tick(center, size=0.25):
+    # Same as in the raycast scenes.
+    p1 = center + np.array([-size, 0, 0])
+    p2 = center + np.array([-size * 0.2, -size * 0.6, 0])
+    p3 = center + np.array([size, size * 0.6, 0])
+    return VGroup(Line(p1, p2, color=GREEN, stroke_width=5), Line(p2, p3, color=GREEN, stroke_width=5))
+
+
+def make_square():
+    return Square(side_length=1.0, color=GREEN, fill_color=GREEN, fill_opacity=0.3)
+
+
+def make_arrow(start=ORIGIN, end=RIGHT * 0.8):
+    return Arrow(start=start, end=end, buff=0, color=GREEN, stroke_width=6)
+
+
+def positions(i, cells):
+    direction = [RIGHT, UP, -RIGHT, -UP][i % 4]
+    return [direction * (k + 1) for k in range(cells)], direction * 0.8
+
+
+def fresh(i, cells):
+    centers, arrow_end = positions(i, cells)
+    squares = [make_square().move_to(c) for c in centers]
+    return squares, make_tick(centers[-1]), make_arrow(ORIGIN, arrow_end)
+
+
+class Pools:
+    def __init__(self, cells):
+        self.squares = MobjectPool(make_square, size=cells)
+        self.ticks = MobjectPool(lambda: make_tick(ORIGIN), size=1)
+        self.arrows = MobjectPool(make_arrow, size=1,
+            place=lambda arrow, start, end: arrow.put_start_and_end_on(start, end))
+
+    @property
+    def created(self):
+        return self.squares.created + self.ticks.created + self.arrows.created
+
+    def iteration(self, i, cells):
+        centers, arrow_end = positions(i, cells)
+        squares = [self.squares.acquire(c) for c in centers]
+        tick = self.ticks.acquire(centers[-1])
+        arrow = self.arrows.acquire(ORIGIN, arrow_end)
+        for s in squares:
+            s.set_fill(opacity=0.1)  # What a fade would leave behind
+        self.squares.release(*squares)
+        self.ticks.release(tick)
+        self.arrows.release(arrow)
+
+
+def measure(step, iterations):
+    """Seconds per iteration and memory blocks allocated per iteration."""
+    step(0)  # Warm up
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for i in range(1, 11):
+        step(i)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    blocks = sum(s.count_diff for s in after.compare_to(before, "filename") if s.count_diff > 0) / 10
+    start = time.perf_counter()
+    for i in range(iterations):
+        step(i)
+    return (time.perf_counter() - start) / iterations, blocks
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--cells", type=int, default=4, help="Highlight squares per iteration")
+    args = parser.parse_args()
+
+    fresh_seconds, fresh_blocks = measure(lambda i: fresh(i, args.cells), args.iterations)
+    pools = Pools(args.cells)
+    pool_seconds, pool_blocks = measure(lambda i: pools.iteration(i, args.cells), args.iterations)
+
+    built_fresh = (args.cells + 2) * (args.iterations + 11)
+    print(f"{'':8s} {'ms/iter':>8s} {'mobjects built':>15s} {'blocks/iter':>12s}")
+    print(f"{'fresh':8s} {fresh_seconds * 1e3:8.3f} {built_fresh:15d} {fresh_blocks:12.0f}")
+    print(f"{'pooled':8s} {pool_seconds * 1e3:8.3f} {pools.created:15d} {pool_blocks:12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+The 3 second enemy turn of the sight scenes at 60 fps, played with
+`scene.play` against `render_frames.play_parallel` on 1 to `--workers`
+processes. Reports the render time of the play, encoding included,
+and checks that every frame matches the serial ones. Needs manim.
+
+Run from src/animations:
+    python -m benchmarks.bench_render_frames [--workers 4] [--fps 60]
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+from manim import DEGREES, Scene, smooth, tempconfig
+
+import enemy_sight
+from render_frames import play_parallel
+
+
+class EnemyTurn(Scene):
+    workers = 0  # 0 plays with scene.play
+
+    def construct(self):
+        ctx = enemy_sight.Context()
+        ctx.add_to(self)
+        turn = ctx.enemy.angle.animate.set_value(180 * DEGREES)
+        start = time.perf_counter()
+        if self.workers:
+            play_parallel(self, turn, run_time=3, rate_func=smooth, workers=self.workers)
+        else:
+            self.play(turn, run_time=3, rate_func=smooth)
+        self.play_seconds = time.perf_counter() - start
+
+
+def render(workers: int, fps: int, media_dir: Path) -> tuple[float, list]:
+    """Seconds spent in the play, and the frames written."""
+    with tempconfig({"frame_rate": fps, "pixel_height": 400, "pixel_width": 400, "frame_height": 8,
+            "frame_width": 8, "format": "mp4", "media_dir": str(media_dir),
+            "output_file": str(media_dir / f"turn_{workers}"), "disable_caching": True}):
+        EnemyTurn.workers = workers
+        scene = EnemyTurn()
+        frames = []
+        writer = scene.renderer.file_writer
+        write_frame = writer.write_frame
+
+        def keeping(frame, *args, **kwargs):
+            frames.append(frame)
+            return write_frame(frame, *args, **kwargs)
+        writer.write_frame = keeping
+        scene.render()
+    return scene.play_seconds, frames
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--fps", type=int, default=60)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as media_dir:
+        media_dir = Path(media_dir)
+        serial_seconds, serial_frames = render(0, args.fps, media_dir)
+        print(f"enemy turn, 3 s at {args.fps} fps: {len(serial_frames)} frames")
+        print(f"  {'scene.play':>14s} {serial_seconds:7.2f} s")
+        workers = 1
+        while workers <= args.workers:
+            seconds, frames = render(workers, args.fps, media_dir)
+            same = len(frames) == len(serial_frames) and all(
+                np.array_equal(a, b) for a, b in zip(frames, serial_frames))
+            print(f"  {f'{workers} workers':>14s} {seconds:7.2f} s  {serial_seconds / seconds:5.2f}x  "
+                f"{'same frames' if same else 'FRAMES DIFFER'}")
+            workers *= 2
+
+
+if __name__ == "__main__":
+    main()
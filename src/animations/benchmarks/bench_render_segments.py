@@ -0,0 +1,50 @@
+"""
+Wall time of a looping scene rendered serially against split at its
+`clear()` calls and rendered by `render_segments` on several processes.
+Both write the scene's GIF (01_vector_decomposition.gif by default).
+Caching is disabled in both, so neither reuses the partial movie files
+of the other. Needs manim.
+
+Run from src/animations:
+    python -m benchmarks.bench_render_segments [--workers 4] [--profile low]
+"""
+import argparse
+import os
+import time
+
+import render_segments
+import render_server
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--module", default="01_lab_velocity_decompose")
+    parser.add_argument("--scene", default="VelocityDecomposition")
+    parser.add_argument("--profile", default="low", choices=sorted(render_server.PROFILES))
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    preloaded = render_server.preload()
+    start = time.perf_counter()
+    serial = render_server.run_job({"module": args.module, "scene": args.scene, "profile": args.profile,
+        "config": {"disable_caching": True}}, lambda event: None, preloaded)
+    serial_seconds = time.perf_counter() - start
+    serial_size = os.path.getsize(serial["output"])
+
+    start = time.perf_counter()
+    parallel = render_segments.render_parallel(args.module, args.scene, args.profile, workers=args.workers)
+    parallel_seconds = time.perf_counter() - start
+
+    print(f"{args.module}.{args.scene}, profile {args.profile}, {os.cpu_count()} cores")
+    print(f"  serial     {serial_seconds:7.2f} s  {serial['plays']} plays, {serial_size} bytes")
+    print(f"  segmented  {parallel_seconds:7.2f} s  {len(parallel['segments'])} segments on {args.workers} "
+        f"workers, {os.path.getsize(parallel['output'])} bytes")
+    print(f"    plan {parallel['plan_seconds']:.2f} s, render {parallel['render_seconds']:.2f} s, "
+        f"combine {parallel['combine_seconds']:.2f} s")
+    for segment in parallel["segments"]:
+        print(f"    plays {segment['first']:3d}-{segment['end'] - 1:<3d} {segment['seconds']:6.2f} s")
+    print(f"  speedup {serial_seconds / parallel_seconds:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Latency of a render job, from the command to the finished scene: a cold
+process that imports manim for the job against a job sent to a warm
+`render_server`. Frames are rendered but no file is written. Needs manim.
+
+Run from src/animations:
+    python -m benchmarks.bench_render_server [--module 02_grid --scene Grid] [--jobs 3]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import render_server
+
+NO_OUTPUT = {"write_to_movie": False, "save_last_frame": False}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--module", default="02_grid")
+    parser.add_argument("--scene", default="Grid")
+    parser.add_argument("--profile", default="low", choices=sorted(render_server.PROFILES))
+    parser.add_argument("--jobs", type=int, default=3)
+    args = parser.parse_args()
+    here = os.path.dirname(os.path.abspath(render_server.__file__))
+
+    cold = []
+    for _ in range(args.jobs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "render_server.py", "once", args.module, args.scene,
+            "--profile", args.profile, "--no-output"], cwd=here, check=True, capture_output=True)
+        cold.append(time.perf_counter() - start)
+
+    socket_path = os.path.join(tempfile.mkdtemp(), "render.sock")
+    start = time.perf_counter()
+    server = subprocess.Popen([sys.executable, "render_server.py", "--socket", socket_path, "serve",
+        "--workers", "1"], cwd=here, stdout=subprocess.DEVNULL)
+    try:
+        while not os.path.exists(socket_path):
+            time.sleep(0.05)
+        startup = time.perf_counter() - start
+        warm = []
+        for _ in range(args.jobs):
+            start = time.perf_counter()
+            result = render_server.submit(args.module, args.scene, args.profile, NO_OUTPUT, socket_path)
+            if result["event"] != "done":
+                raise RuntimeError(result["message"])
+            warm.append(time.perf_counter() - start)
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"{args.module}.{args.scene}, profile {args.profile}, {args.jobs} jobs each")
+    print(f"  cold process  {' '.join(f'{t:6.2f}' for t in cold)} s")
+    print(f"  warm server   {' '.join(f'{t:6.2f}' for t in warm)} s (server start {startup:.2f} s, once)")
+    print(f"  best cold / best warm {min(cold) / min(warm):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Per-frame rasterization time of the grid and raycast scenes, drawn as
+manim does and with `static_layer`: the time spent in the renderer's
+`update_frame` (moving mobjects every frame, static ones once per play)
+divided by the frames drawn. Also checks that the frames written match.
+Both renders write the scene's GIF. A small scene animating only the
+submobjects of static parents (an arrow tip, the label of a dot) is
+checked first, drawn without writing a file. Needs manim.
+
+Run from src/animations:
+    python -m benchmarks.bench_static_layer [--profile preview] [--scenes 02_grid_coords.GridCoords]
+"""
+import argparse
+import tempfile
+import time
+import numpy as np
+from manim import (BLUE, DOWN, GREEN, LEFT, ORANGE, RIGHT, UP, Arrow, Dot, Line, MathTex, Scene, Text, VGroup,
+                   tempconfig)
+from manim.renderer.cairo_renderer import CairoRenderer
+from manim.scene.scene_file_writer import SceneFileWriter
+
+import render_server
+import static_layer
+
+SCENES = ["02_grid_world_space.GridMapping", "02_grid_coords.GridCoords",
+    "02_raycast_orthogonal.RaycastOrthogonal", "02_raycast_diagonal.RaycastDiagonal"]
+
+
+class AnimatedSubmobjects(Scene):
+    """Static parents with points whose children move, under a static grid and label."""
+
+    def construct(self):
+        grid = VGroup(*[Line(LEFT * 4 + UP * y, RIGHT * 4 + UP * y, stroke_width=1) for y in range(-3, 4)])
+        arrow = Arrow(LEFT * 3, RIGHT * 1, buff=0, color=GREEN)
+        dot = Dot(LEFT * 2 + DOWN * 2, color=BLUE)
+        dot.add(MathTex("p").next_to(dot, UP))
+        title = Text("static", font_size=30).to_edge(UP)
+        self.add(grid, arrow, dot, title)
+        self.play(arrow.tip.animate.set_color(ORANGE).shift(UP * 0.5), dot[0].animate.shift(RIGHT * 2), run_time=1)
+        self.play(dot[0].animate.shift(DOWN), run_time=0.5)
+        self.wait(0.5)
+
+
+class Probe:
+    """Times the rasterization of a render and keeps the frames written."""
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.frames = 0
+        self.written = []
+        self.depth = 0
+
+    def install(self):
+        update_frame = CairoRenderer.update_frame
+        write_frame = SceneFileWriter.write_frame
+        probe = self
+
+        def timed_update_frame(self, scene, mobjects=None, *args, **kwargs):
+            # Outermost call only: the static image is drawn through update_frame too.
+            probe.depth += 1
+            start = time.perf_counter()
+            try:
+                return update_frame(self, scene, mobjects, *args, **kwargs)
+            finally:
+                probe.depth -= 1
+                if not probe.depth:
+                    probe.seconds += time.perf_counter() - start
+                if mobjects is not None and mobjects is scene.moving_mobjects:
+                    probe.frames += 1
+
+        def keeping_write_frame(self, pixels, *args, **kwargs):
+            probe.written.append(pixels)
+            return write_frame(self, pixels, *args, **kwargs)
+
+        CairoRenderer.update_frame = timed_update_frame
+        SceneFileWriter.write_frame = keeping_write_frame
+        return update_frame, write_frame
+
+
+def render(name: str, profile: str, layered: bool, preloaded) -> Probe:
+    if layered:
+        static_layer.enable()
+    probe = Probe()
+    update_frame, write_frame = probe.install()
+    try:
+        if name == AnimatedSubmobjects.__name__:
+            with tempfile.TemporaryDirectory() as media_dir, tempconfig({"media_dir": media_dir,
+                    "write_to_movie": False, "save_last_frame": False, "disable_caching": True,
+                    "pixel_height": 400, "pixel_width": 400, "frame_height": 8, "frame_width": 8}):
+                AnimatedSubmobjects().render()
+        else:
+            module, scene = name.split(".")
+            render_server.run_job({"module": module, "scene": scene, "profile": profile,
+                "config": {"disable_caching": True}}, lambda event: None, preloaded)
+    finally:
+        CairoRenderer.update_frame = update_frame
+        SceneFileWriter.write_frame = write_frame
+        static_layer.disable()
+    return probe
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profile", default="preview", choices=sorted(render_server.PROFILES))
+    parser.add_argument("--scenes", nargs="+", default=SCENES, metavar="MODULE.SCENE")
+    args = parser.parse_args()
+
+    preloaded = render_server.preload()
+    print(f"rasterization per drawn frame, profile {args.profile}")
+    for name in [AnimatedSubmobjects.__name__] + args.scenes:
+        before = render(name, args.profile, False, preloaded)
+        after = render(name, args.profile, True, preloaded)
+        if len(before.written) != len(after.written):
+            check = f"FRAME COUNTS DIFFER ({len(before.written)} and {len(after.written)})"
+        else:
+            worst = max((int(np.abs(a.astype(np.int16) - b).max()) for a, b in zip(before.written, after.written)),
+                default=0)
+            check = "same frames" if worst == 0 else f"frames within {worst} levels"
+        before_ms = 1000 * before.seconds / max(before.frames, 1)
+        after_ms = 1000 * after.seconds / max(after.frames, 1)
+        print(f"  {name:40s} {before.frames:5d} frames  {before_ms:6.2f} ms -> {after_ms:6.2f} ms  "
+            f"{before_ms / max(after_ms, 1e-9):5.2f}x  {check}")
+
+
+if __name__ == "__main__":
+    main()
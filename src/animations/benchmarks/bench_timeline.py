@@ -0,0 +1,55 @@
+"""
+Render time and number of plays (partial movie segments) of the raycast
+scenes with every small step as its own `Scene.play`, against the steps
+coalesced by `helper.Timeline` into one play. Frames are rendered but
+no movie is written. Needs manim.
+
+Run from src/animations:
+    python -m benchmarks.bench_timeline [--repeat 3]
+"""
+import argparse
+import importlib
+import tempfile
+import time
+from manim import tempconfig
+
+import helper
+
+SCENES = [
+    ("02_raycast_orthogonal", "RaycastOrthogonal"),
+    ("02_raycast_diagonal", "RaycastDiagonal"),
+]
+
+
+def render(module_name, class_name, coalesce, media_dir):
+    """Seconds to render the scene, and how many plays it made."""
+    helper.COALESCE_PLAYS = coalesce
+    scene_class = getattr(importlib.import_module(module_name), class_name)
+    with tempconfig({"write_to_movie": False, "save_last_frame": False,
+            "disable_caching": True, "media_dir": media_dir}):
+        start = time.perf_counter()
+        scene = scene_class()
+        scene.render()
+        return time.perf_counter() - start, scene.renderer.num_plays
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    coalesce_plays = helper.COALESCE_PLAYS
+    try:
+        with tempfile.TemporaryDirectory() as media_dir:
+            print(f"{'scene':24s} {'mode':>10s} {'plays':>6s} {'render s':>9s}")
+            for module_name, class_name in SCENES:
+                for coalesce, mode in ((False, "per step"), (True, "timeline")):
+                    runs = [render(module_name, class_name, coalesce, media_dir) for _ in range(args.repeat)]
+                    seconds = min(r[0] for r in runs)
+                    print(f"{module_name:24s} {mode:>10s} {runs[0][1]:6d} {seconds:9.2f}")
+    finally:
+        helper.COALESCE_PLAYS = coalesce_plays
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,15 @@
 from manim import *
 import helper
+from grid_sight import GridSight
 
 class Context:
-    def __init__(self, angle_deg=40):
+    def __init__(self, angle_deg=40, sight: GridSight | None = None):
+        # With a GridSight, obstacle cells block the view
+        self.sight = sight
         self.enemy = Enemy(direction=UP)
         self.detection = FOV(angle_deg=angle_deg, radius=10)
         self.player = Player(position=LEFT * 3 + DOWN * 1)
-        self.enemy.attach_fov(self.detection)
+        self.enemy.attach_fov(self.detection, sight)
         self.player.set_detection_fov(self.detection, self)
 
     # DETECTION LOGIC using dot product
@@ -27,7 +30,9 @@ class Context:
         half_angle_rad = self.detection.angle.get_value() / 2
         threshold = np.cos(half_angle_rad)
         
-        return dot >= threshold
+        if dot < threshold:
+            return False
+        return self.sight is None or bool(self.sight.line_of_sight(enemy_pos, player_pos)[0])
 
     def add_to(self, scene):
         scene.add(self.detection.cone)
@@ -59,14 +64,18 @@ class Player:
     def set_detection_fov(self, detection: FOV, context: 'Context'):
         # Player updater for detection
         def update_player_detection(p):
-            if context.is_player_detected():
-                p.set_color(ORANGE)
-                detection.cone.set_fill(opacity=0.6)
-            else:
-                p.set_color(GREEN)
-                detection.cone.set_fill(opacity=0.3)
+            self.show_detection(context.is_player_detected(), detection)
+        self.detection_updater = update_player_detection
         self.obj.add_updater(update_player_detection)
 
+    def show_detection(self, detected: bool, detection: FOV):
+        if detected:
+            self.obj.set_color(ORANGE)
+            detection.cone.set_fill(opacity=0.6)
+        else:
+            self.obj.set_color(GREEN)
+            detection.cone.set_fill(opacity=0.3)
+
 
 class Enemy:
     def __init__(self, direction: np.ndarray):
@@ -84,13 +93,24 @@ class Enemy:
         dir_2d = self.direction_2d()
         return np.array([dir_2d[0], dir_2d[1], 0])
 
-    def attach_fov(self, fov: FOV):
+    def attach_fov(self, fov: FOV, sight: GridSight | None = None):
         # Update detection cone based on enemy angle and detection angle
         def update_detection_cone(cone):
             angle_rad = fov.angle.get_value()
             enemy_dir_rad = self.angle.get_value()
             # Preserve current fill opacity
             current_opacity = cone.fill_opacity
+            if sight is not None:
+                # Cone clipped to what the enemy can see past the obstacles
+                outline = sight.visible_polygon(
+                    self.obj.get_center(), enemy_dir_rad, angle_rad, fov.radius)
+                sect = Polygon(
+                    *[np.array([x, y, 0]) for x, y in outline],
+                    color=YELLOW,
+                    fill_opacity=current_opacity,
+                    stroke_width=0)
+                cone.become(sect)
+                return
             # Everything is in radians
             sect = Sector(
                 radius=fov.radius,
@@ -101,3 +121,172 @@ class Enemy:
                 stroke_width=0)
             cone.become(sect)
         fov.cone.add_updater(update_detection_cone)
+        if sight is not None:
+            update_detection_cone(fov.cone)
+
+
+# EVENT TIMELINE: detection changes solved ahead of time
+def detection_margin(player_xy: np.ndarray, enemy_xy: np.ndarray, look_angle: np.ndarray, fov_angle: float) -> np.ndarray:
+    """
+    Vectorized form of `Context.is_player_detected`: the dot product of
+    the direction to the player and the look direction, minus cos(fov / 2).
+    The player is detected where the result is >= 0.
+
+    Args:
+        player_xy: Player positions, shape (k, 2)
+        enemy_xy: Enemy position, shape (2,)
+        look_angle: Enemy look angles in radians, shape (k,)
+        fov_angle: Detection cone angle in radians
+
+    Returns:
+        Margin for every sample, shape (k,)
+    """
+    to_player = player_xy - enemy_xy
+    distance = np.hypot(to_player[:, 0], to_player[:, 1])
+    dot = to_player[:, 0] * np.cos(look_angle) + to_player[:, 1] * np.sin(look_angle)
+    ret = dot / np.maximum(distance, 0.01) - np.cos(fov_angle / 2)
+    # Same rule as is_player_detected: not detected on top of the enemy.
+    ret[distance < 0.01] = -1.0
+    return ret
+
+
+def find_crossings(margin, duration: float, samples: int = 256, iterations: int = 40):
+    """
+    Times in [0, duration] where `margin(t) >= 0` changes value.
+
+    The interval is sampled once to bracket the changes, then all brackets
+    are bisected together, so `margin` is only ever called on arrays.
+    A change in and out again within one sample step is missed.
+
+    Args:
+        margin: Function of an array of times returning an array of margins
+        duration: Length of the interval
+        samples: Number of sample steps used to bracket the changes
+        iterations: Bisection steps, each halves the error
+
+    Returns:
+        (times, states, inside): the first time of every new state, the
+        state (detected or not) from there on, and the state at time 0
+    """
+    t = np.linspace(0.0, duration, samples + 1)
+    inside = margin(t) >= 0
+    change = np.flatnonzero(inside[1:] != inside[:-1])
+    lo, hi = t[change], t[change + 1]
+    before = inside[change]
+    for _ in range(iterations):
+        mid = (lo + hi) / 2
+        same = (margin(mid) >= 0) == before
+        lo = np.where(same, mid, lo)
+        hi = np.where(same, hi, mid)
+    return hi, ~before, bool(inside[0])
+
+
+class DetectionTimeline:
+    """
+    Player moves, enemy turns and waits scheduled ahead of time, so the
+    moments the player is detected or lost are solved once instead of
+    testing detection at every frame. While playing, the player color and
+    cone opacity only change at those moments, and the cone is only
+    rebuilt every frame while the enemy turns.
+
+    Usage:
+        timeline = enemy_sight.DetectionTimeline(ctx)
+        timeline.move_player(UP * 2, run_time=2)
+        timeline.wait(0.8)
+        timeline.turn_enemy(270 * DEGREES, run_time=3)
+        timeline.play(self)
+    """
+
+    def __init__(self, ctx: Context):
+        self.ctx = ctx
+        # (run_time, rate_func, player start, player end, angle start, angle end)
+        self.segments = []
+        self.player_xy = ctx.player.obj.get_center()[:2].copy()
+        self.angle = ctx.enemy.angle.get_value()
+
+    def move_player(self, target: np.ndarray, run_time: float = 1.0, rate_func=smooth):
+        target = np.asarray(target, dtype=np.float64)[:2]
+        self.segments.append((run_time, rate_func, self.player_xy, target, self.angle, self.angle))
+        self.player_xy = target
+        return self
+
+    def turn_enemy(self, angle: float, run_time: float = 1.0, rate_func=smooth):
+        self.segments.append((run_time, rate_func, self.player_xy, self.player_xy, self.angle, angle))
+        self.angle = angle
+        return self
+
+    def wait(self, duration: float = 1.0):
+        self.segments.append((duration, linear, self.player_xy, self.player_xy, self.angle, self.angle))
+        return self
+
+    def segment_events(self, segment, samples: int = 256):
+        """Local event times, states after them and the starting state of one segment."""
+        run_time, rate_func, p0, p1, a0, a1 = segment
+        enemy_xy = self.ctx.enemy.obj.get_center()[:2]
+        fov_angle = self.ctx.detection.angle.get_value()
+        rate = np.vectorize(rate_func, otypes=[np.float64])
+
+        def margin(t):
+            alpha = rate(np.clip(t / run_time, 0.0, 1.0))
+            player_xy = p0 + (p1 - p0) * alpha[:, None]
+            ret = detection_margin(player_xy, enemy_xy, a0 + (a1 - a0) * alpha, fov_angle)
+            if self.ctx.sight is not None:
+                # Hidden behind an obstacle counts as outside of the cone.
+                ret[~self.ctx.sight.line_of_sight(enemy_xy, player_xy)] = -1.0
+            return ret
+
+        if run_time <= 0 or (np.array_equal(p0, p1) and a0 == a1):
+            inside = bool(margin(np.zeros(1))[0] >= 0)
+            return np.zeros(0), np.zeros(0, dtype=bool), inside
+        return find_crossings(margin, run_time, samples)
+
+    def events(self) -> list[tuple[float, bool]]:
+        """(time from the start of the timeline, detected) for every change."""
+        ret = []
+        start = 0.0
+        for segment in self.segments:
+            times, states, _ = self.segment_events(segment)
+            ret.extend((start + float(t), bool(s)) for t, s in zip(times, states))
+            start += segment[0]
+        return ret
+
+    def play(self, scene: Scene):
+        player, cone = self.ctx.player, self.ctx.detection.cone
+        player.obj.remove_updater(player.detection_updater)
+        for segment in self.segments:
+            run_time, rate_func, p0, p1, a0, a1 = segment
+            times, states, inside = self.segment_events(segment)
+            player.show_detection(inside, self.ctx.detection)
+            if a0 != a1:
+                cone.resume_updating()
+            else:
+                cone.suspend_updating()
+
+            # The clock is a bare mobject: animations suspend the updaters
+            # of the mobjects they animate, so it can't be the player.
+            clock = None
+            if len(times):
+                elapsed = {"t": 0.0, "next": 0}
+
+                def follow_events(m, dt, times=times, states=states, elapsed=elapsed):
+                    elapsed["t"] += dt
+                    while elapsed["next"] < len(times) and times[elapsed["next"]] <= elapsed["t"]:
+                        player.show_detection(bool(states[elapsed["next"]]), self.ctx.detection)
+                        elapsed["next"] += 1
+                clock = Mobject().add_updater(follow_events)
+                scene.add(clock)
+
+            if not np.array_equal(p0, p1):
+                # Only the position: a transform would also bring back the starting color every frame.
+                path = Line([*p0, 0], [*p1, 0])
+                scene.play(MoveAlongPath(player.obj, path), run_time=run_time, rate_func=rate_func)
+            elif a0 != a1:
+                scene.play(self.ctx.enemy.angle.animate.set_value(a1), run_time=run_time, rate_func=rate_func)
+            else:
+                scene.wait(run_time)
+
+            if clock is not None:
+                scene.remove(clock)
+                player.show_detection(bool(states[-1]), self.ctx.detection)
+        cone.resume_updating()
+        player.obj.add_updater(player.detection_updater)
@@ -0,0 +1,346 @@
+"""
+Raw frame cache: a scene is rendered once into a file of RGBA frames,
+and every published format (GIF for the docs, MP4/WebM for the
+playlists, PNG sequences) is encoded from that file instead of
+rendering the scene again.
+
+An entry is a directory holding `frames.rgba`, the frames back to back
+as drawn (height x width x 4 bytes each), and `meta.json` with the size,
+frame rate, how many times each frame is shown (a wait is stored once),
+and the modification time of the scene sources. The encoders map the
+frames file read-only and run in parallel processes, so they all read
+the same pages without copying the frames between them. An entry is
+stale once a source file is edited, and entries are evicted by age and
+total size.
+
+Run from src/animations:
+    python frame_cache.py export 02_grid Grid --formats gif mp4 [--profile low]
+    python frame_cache.py list
+    python frame_cache.py evict [--max-gib 4] [--max-days 7]
+"""
+import argparse
+import hashlib
+import importlib
+import json
+import multiprocessing
+import os
+import shutil
+import time
+from fractions import Fraction
+from pathlib import Path
+import numpy as np
+
+import render_server
+from render_watch import SceneGraph
+
+HERE = Path(__file__).resolve().parent
+DEFAULT_ROOT = HERE / "media" / "frame_cache"
+FORMATS = ["gif", "mp4", "webm", "png"]
+
+
+class CachedFrames:
+    """One entry of the cache. `frames` is a read-only memory map of the whole file."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        with open(path / "meta.json") as f:
+            self.meta = json.load(f)
+        self.width = self.meta["width"]
+        self.height = self.meta["height"]
+        self.frame_rate = self.meta["frame_rate"]
+        self.repeats = np.asarray(self.meta["repeats"], dtype=np.int64)
+        self.frames = np.memmap(path / "frames.rgba", dtype=np.uint8, mode="r",
+            shape=(len(self.repeats), self.height, self.width, 4))
+
+    @property
+    def frame_count(self) -> int:
+        """Frames of the video, counting every repeat."""
+        return int(self.repeats.sum())
+
+    @property
+    def nbytes(self) -> int:
+        return self.frames.nbytes
+
+    def duration(self) -> float:
+        return self.frame_count / self.frame_rate
+
+
+class FrameCache:
+    """
+    Entries keyed by module, scene, profile and config.
+
+    Args:
+        root: Directory of the entries
+        max_bytes: Total size kept by `evict`, least recently used first
+        max_age: Seconds an entry is kept after it was last used
+    """
+
+    def __init__(self, root: Path = DEFAULT_ROOT, max_bytes: int = 4 << 30, max_age: float = 7 * 86400):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+    @staticmethod
+    def key(module: str, scene: str, profile: str, config: dict | None = None) -> str:
+        text = json.dumps([module, scene, profile, config or {}], sort_keys=True)
+        return f"{module}.{scene}.{hashlib.sha1(text.encode()).hexdigest()[:10]}"
+
+    @staticmethod
+    def source_mtime(module: str) -> float:
+        """Latest modification of the scene file and the local modules it imports."""
+        graph = SceneGraph(HERE)
+        seen, stack = set(), [module]
+        while stack:
+            name = stack.pop()
+            if name not in seen:
+                seen.add(name)
+                stack.extend(graph.imports.get(name, ()))
+        return max(os.path.getmtime(HERE / f"{name}.py") for name in seen)
+
+    def get(self, module: str, scene: str, profile: str = "low", config: dict | None = None) \
+            -> CachedFrames | None:
+        """The entry if it exists and no source changed since, marking it used."""
+        path = self.root / self.key(module, scene, profile, config)
+        try:
+            entry = CachedFrames(path)
+        except (OSError, ValueError):
+            return None
+        if entry.meta["source_mtime"] < self.source_mtime(module):
+            return None
+        os.utime(path / "meta.json")
+        return entry
+
+    def render(self, module: str, scene: str, profile: str = "low", config: dict | None = None) -> CachedFrames:
+        """Render the scene into a new entry, replacing any previous one."""
+        from manim import config as manim_config
+        render_server.preload()
+        source_mtime = self.source_mtime(module)
+        path = self.root / self.key(module, scene, profile, config)
+        partial = path.with_name(path.name + ".partial")
+        shutil.rmtree(partial, ignore_errors=True)
+        partial.mkdir(parents=True)
+        repeats = []
+
+        overrides = dict(render_server.PROFILES[profile])
+        overrides.update(config or {})
+        # Every play has to be drawn, none taken from manim's segment cache.
+        overrides["disable_caching"] = True
+        scene_class = getattr(importlib.import_module(module), scene)
+        with render_server.profile_config(overrides), open(partial / "frames.rgba", "wb") as out:
+            instance = scene_class()
+            output = Path(manim_config.output_file or scene).with_suffix("")
+            writer = instance.renderer.file_writer
+
+            # The frames land here instead of in the segment encoders.
+            def write_frame(pixels, *, repeat=1):
+                out.write(np.ascontiguousarray(pixels).data)
+                repeats.append(int(repeat))
+            writer.write_frame = write_frame
+            writer.begin_animation = lambda *args, **kwargs: None
+            writer.end_animation = lambda *args, **kwargs: None
+            writer.finish = lambda: None
+            instance.render()
+            height, width = instance.renderer.camera.pixel_array.shape[:2]
+            meta = {"module": module, "scene": scene, "profile": profile, "config": config or {},
+                "width": width, "height": height, "frame_rate": manim_config.frame_rate,
+                "repeats": repeats, "output": str(output), "source_mtime": source_mtime,
+                "created": time.time()}
+        with open(partial / "meta.json", "w") as f:
+            json.dump(meta, f)
+        shutil.rmtree(path, ignore_errors=True)
+        partial.rename(path)
+        self.evict(keep=path)
+        return CachedFrames(path)
+
+    def entries(self) -> list[CachedFrames]:
+        ret = []
+        for path in sorted(self.root.glob("*")):
+            if path.is_dir() and not path.name.endswith(".partial"):
+                try:
+                    ret.append(CachedFrames(path))
+                except (OSError, ValueError):
+                    pass
+        return ret
+
+    def evict(self, keep: Path | None = None) -> list[Path]:
+        """
+        Remove entries unused for longer than `max_age`, then the least
+        recently used ones until the cache fits in `max_bytes`.
+
+        Args:
+            keep: An entry never removed, e.g. the one just written
+
+        Returns:
+            The removed entries
+        """
+        now = time.time()
+        used = sorted(((os.path.getmtime(e.path / "meta.json"), e.nbytes, e.path) for e in self.entries()),
+            reverse=True)
+        removed = []
+        total = 0
+        for last_used, nbytes, path in used:
+            if path != keep and (now - last_used > self.max_age or total + nbytes > self.max_bytes):
+                shutil.rmtree(path, ignore_errors=True)
+                removed.append(path)
+            else:
+                total += nbytes
+        return removed
+
+
+# ENCODERS
+def _frames(entry: CachedFrames):
+    """(pts, frame) of every shown frame, views into the map."""
+    pts = 0
+    for frame, repeat in zip(entry.frames, entry.repeats):
+        for _ in range(repeat):
+            yield pts, frame
+            pts += 1
+
+
+def _encode_video(entry: CachedFrames, path: Path, codec: str):
+    import av
+    with av.open(str(path), mode="w") as container:
+        stream = container.add_stream(codec, rate=Fraction(entry.frame_rate).limit_denominator(1000))
+        stream.width, stream.height = entry.width, entry.height
+        stream.pix_fmt = "yuv420p"
+        for pts, frame in _frames(entry):
+            video_frame = av.VideoFrame.from_ndarray(frame, format="rgba")
+            video_frame.pts = pts
+            container.mux(stream.encode(video_frame))
+        container.mux(stream.encode())
+
+
+def _encode_gif(entry: CachedFrames, path: Path):
+    # Same palette filters as manim's own GIF output.
+    import av
+    rate = Fraction(entry.frame_rate).limit_denominator(1000)
+    with av.open(str(path), mode="w") as container:
+        stream = container.add_stream("gif", rate=rate)
+        stream.width, stream.height = entry.width, entry.height
+        stream.pix_fmt = "rgb8"
+        graph = av.filter.Graph()
+        source = graph.add_buffer(width=entry.width, height=entry.height, format="rgba", time_base=1 / rate)
+        split = graph.add("split")
+        palettegen = graph.add("palettegen", "stats_mode=diff")
+        paletteuse = graph.add("paletteuse", "dither=bayer:bayer_scale=5:diff_mode=rectangle")
+        sink = graph.add("buffersink")
+        source.link_to(split)
+        split.link_to(palettegen, 0, 0)
+        split.link_to(paletteuse, 1, 0)
+        palettegen.link_to(paletteuse, 0, 1)
+        paletteuse.link_to(sink)
+        graph.configure()
+        for pts, frame in _frames(entry):
+            video_frame = av.VideoFrame.from_ndarray(frame, format="rgba")
+            video_frame.pts = pts
+            video_frame.time_base = 1 / rate
+            graph.push(video_frame)
+        graph.push(None)
+        written = 0
+        while True:
+            try:
+                video_frame = graph.pull()
+            except av.error.EOFError:
+                break
+            video_frame.pts = written
+            written += 1
+            container.mux(stream.encode(video_frame))
+        container.mux(stream.encode())
+
+
+def _encode_png(entry: CachedFrames, directory: Path):
+    from PIL import Image
+    shutil.rmtree(directory, ignore_errors=True)
+    directory.mkdir(parents=True)
+    index = 0
+    for frame, repeat in zip(entry.frames, entry.repeats):
+        first = directory / f"{index:05d}.png"
+        Image.fromarray(np.asarray(frame), "RGBA").save(first)
+        # Repeats of a frame are links to its file.
+        for k in range(1, repeat):
+            os.link(first, directory / f"{index + k:05d}.png")
+        index += repeat
+
+
+def encode(job: tuple[str, str, str]) -> tuple[str, str, float]:
+    """Encode one format from an entry. `job` is (entry path, format, output stem)."""
+    entry_path, fmt, stem = job
+    start = time.perf_counter()
+    entry = CachedFrames(Path(entry_path))
+    stem = Path(stem)
+    if fmt == "gif":
+        path = stem.with_suffix(".gif")
+        _encode_gif(entry, path)
+    elif fmt == "mp4":
+        path = stem.with_suffix(".mp4")
+        _encode_video(entry, path, "libx264")
+    elif fmt == "webm":
+        path = stem.with_suffix(".webm")
+        _encode_video(entry, path, "libvpx-vp9")
+    elif fmt == "png":
+        path = stem.parent / f"{stem.name}_frames"
+        _encode_png(entry, path)
+    else:
+        raise ValueError(f"unknown format {fmt}, use one of {FORMATS}")
+    return fmt, str(path), time.perf_counter() - start
+
+
+def export(entry: CachedFrames, formats: list[str], stem: str | Path | None = None) -> list[tuple[str, str, float]]:
+    """
+    Encode several formats at once, one process each.
+
+    Args:
+        stem: Output path without extension, by default the scene's own output
+
+    Returns:
+        (format, path, seconds) of every output
+    """
+    stem = Path(stem or entry.meta["output"])
+    stem.parent.mkdir(parents=True, exist_ok=True)
+    jobs = [(str(entry.path), fmt, str(stem)) for fmt in formats]
+    if len(jobs) == 1:
+        return [encode(jobs[0])]
+    with multiprocessing.get_context("fork").Pool(len(jobs)) as pool:
+        return pool.map(encode, jobs)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--root", default=str(DEFAULT_ROOT))
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_command = commands.add_parser("export", help="Render into the cache if needed, then encode")
+    export_command.add_argument("module", help="Scene file without .py, e.g. 02_grid")
+    export_command.add_argument("scene", help="Scene class, e.g. Grid")
+    export_command.add_argument("--profile", default="low", choices=sorted(render_server.PROFILES))
+    export_command.add_argument("--formats", nargs="+", default=["gif", "mp4"], choices=FORMATS)
+    export_command.add_argument("--out", help="Output path without extension")
+    commands.add_parser("list")
+    evict_command = commands.add_parser("evict")
+    evict_command.add_argument("--max-gib", type=float, default=4)
+    evict_command.add_argument("--max-days", type=float, default=7)
+    args = parser.parse_args()
+
+    if args.command == "evict":
+        cache = FrameCache(args.root, int(args.max_gib * (1 << 30)), args.max_days * 86400)
+        for path in cache.evict():
+            print(f"removed {path.name}")
+        return
+    cache = FrameCache(args.root)
+    if args.command == "list":
+        for entry in cache.entries():
+            print(f"{entry.path.name:48s} {entry.frame_count:6d} frames {entry.duration():7.2f} s "
+                f"{entry.nbytes / (1 << 20):9.1f} MiB")
+        return
+
+    start = time.perf_counter()
+    entry = cache.get(args.module, args.scene, args.profile)
+    if entry is None:
+        entry = cache.render(args.module, args.scene, args.profile)
+        print(f"rendered {len(entry.repeats)} frames into the cache in {time.perf_counter() - start:.2f} s")
+    for fmt, path, seconds in export(entry, args.formats, args.out):
+        print(f"  {fmt:5s} {seconds:6.2f} s  {path}")
+    print(f"total {time.perf_counter() - start:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+import heapq
+import time
+import numpy as np
+from numpy.typing import NDArray
+
+# (row, col) offsets, orthogonal first so the 4-neighborhood is a prefix.
+ORTHOGONAL = [(-1, 0), (0, 1), (1, 0), (0, -1)]
+DIAGONAL = [(-1, 1), (1, 1), (1, -1), (-1, -1)]
+
+
+class GridAdjacency:
+    """
+    Cells adjacent to every cell of a grid, precomputed in CSR form.
+
+    Cell (row, col) is node `row * cols + col`. Its neighbors are
+    `indices[indptr[node]:indptr[node + 1]]`, so pathfinding, flood fill
+    and move generation walk flat int arrays, with the bounds checks done
+    once when the index is built. Edges into and out of obstacles can be
+    removed (`remove_blocked`), and every edge has a weight, by default
+    its length (1, or sqrt(2) for a diagonal).
+
+    Grid convention matches the raycast scenes: row 0 at the top.
+
+    Usage:
+        adjacency = GridAdjacency(GRID_ROWS, GRID_COLS, diagonal=True)
+        adjacency.remove_blocked(layer.to_mask())
+        for n in adjacency.neighbors(adjacency.node(r, c)): ...
+    """
+
+    def __init__(self, rows: int, cols: int, diagonal: bool = False, block_rows: int = 256):
+        if rows <= 0 or cols <= 0:
+            raise ValueError("the grid must have at least one cell")
+        start = time.perf_counter()
+        self.rows = rows
+        self.cols = cols
+        self.diagonal = diagonal
+        self.offsets = np.array(ORTHOGONAL + (DIAGONAL if diagonal else []), dtype=np.int64)
+        self.block_rows = block_rows
+
+        # Degree of every cell, from how many offsets stay on the grid.
+        r = np.arange(rows)[:, None]
+        c = np.arange(cols)[None, :]
+        degree = np.zeros((rows, cols), dtype=np.int64)
+        for dr, dc in self.offsets:
+            degree += ((r + dr >= 0) & (r + dr < rows)) & ((c + dc >= 0) & (c + dc < cols))
+        self.indptr = np.zeros(rows * cols + 1, dtype=np.int64)
+        np.cumsum(degree.ravel(), out=self.indptr[1:])
+        self.indices = np.empty(self.indptr[-1], dtype=np.int32)
+
+        # Edges are written direction by direction, a band of rows at a
+        # time to bound the size of the temporaries.
+        for row0 in range(0, rows, block_rows):
+            row1 = min(row0 + block_rows, rows)
+            r = np.arange(row0, row1)[:, None]
+            slot = self.indptr[row0 * cols:row1 * cols].reshape(row1 - row0, cols).copy()
+            for dr, dc in self.offsets:
+                valid = ((r + dr >= 0) & (r + dr < rows)) & ((c + dc >= 0) & (c + dc < cols))
+                target = (r + dr) * cols + (c + dc)
+                self.indices[slot[valid]] = target[valid]
+                slot += valid
+        self._weights: NDArray | None = None
+        self.build_seconds = time.perf_counter() - start
+
+    @property
+    def node_count(self) -> int:
+        return self.rows * self.cols
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.indices)
+
+    @property
+    def nbytes(self) -> int:
+        ret = self.indptr.nbytes + self.indices.nbytes
+        if self._weights is not None:
+            ret += self._weights.nbytes
+        return ret
+
+    def node(self, row, col):
+        return row * self.cols + col
+
+    def cell(self, node):
+        """(row, col) of a node, or of an array of nodes."""
+        return np.divmod(node, self.cols)
+
+    def degree(self) -> NDArray:
+        return np.diff(self.indptr)
+
+    def neighbors(self, node: int) -> NDArray:
+        return self.indices[self.indptr[node]:self.indptr[node + 1]]
+
+    def _edge_blocks(self):
+        """(first edge, sources) for bands of rows, without a source array for the whole grid."""
+        for row0 in range(0, self.rows, self.block_rows):
+            a = row0 * self.cols
+            b = min(row0 + self.block_rows, self.rows) * self.cols
+            sources = np.repeat(np.arange(a, b, dtype=np.int32), np.diff(self.indptr[a:b + 1]))
+            yield self.indptr[a], sources
+
+    def edge_sources(self) -> NDArray:
+        """Source node of every edge (the row of the CSR entry)."""
+        return np.repeat(np.arange(self.node_count, dtype=np.int32), self.degree())
+
+    # WEIGHTS
+    def edge_lengths(self) -> NDArray:
+        """Length of every edge: 1 for orthogonal steps, sqrt(2) for diagonal ones."""
+        ret = np.ones(self.edge_count, dtype=np.float32)
+        if not self.diagonal:
+            return ret
+        for first, sources in self._edge_blocks():
+            part = slice(first, first + len(sources))
+            targets = self.indices[part]
+            diagonal = (sources % self.cols != targets % self.cols) & \
+                (sources // self.cols != targets // self.cols)
+            ret[part][diagonal] = np.float32(np.sqrt(2))
+        return ret
+
+    @property
+    def weights(self) -> NDArray:
+        """Weight of every edge, aligned with `indices`. Made from the lengths on first use."""
+        if self._weights is None:
+            self._weights = self.edge_lengths()
+        return self._weights
+
+    @weights.setter
+    def weights(self, value: NDArray):
+        value = np.asarray(value, dtype=np.float32)
+        if value.shape != self.indices.shape:
+            raise ValueError("there must be one weight per edge")
+        self._weights = value
+
+    def set_cell_costs(self, costs: NDArray):
+        """Weights from a (rows, cols) cost per cell: the length of a step times the cost of the cell entered."""
+        costs = np.asarray(costs, dtype=np.float32).ravel()
+        if len(costs) != self.node_count:
+            raise ValueError("there must be one cost per cell")
+        self._weights = self.edge_lengths() * costs[self.indices]
+
+    # EDITS
+    def remove_edges(self, keep: NDArray) -> int:
+        """
+        Drop the edges where `keep` is False, compacting the arrays.
+
+        Returns:
+            Number of edges removed
+        """
+        removed = len(keep) - int(np.count_nonzero(keep))
+        if removed == 0:
+            return 0
+        kept_before = np.zeros(self.edge_count + 1, dtype=np.int64)
+        np.cumsum(keep, out=kept_before[1:])
+        self.indptr = kept_before[self.indptr]
+        self.indices = self.indices[keep]
+        if self._weights is not None:
+            self._weights = self._weights[keep]
+        return removed
+
+    def remove_blocked(self, blocked: NDArray, corner_cutting: bool = False) -> int:
+        """
+        Remove the edges into and out of obstacle cells.
+
+        Args:
+            blocked: Boolean (rows, cols) obstacles, e.g. `ObstacleLayer.to_mask()`
+            corner_cutting: Whether a diagonal step may pass between two
+                obstacles or along the corner of one. If not, a diagonal
+                is removed when either cell it cuts through is blocked
+
+        Returns:
+            Number of edges removed
+        """
+        blocked = np.asarray(blocked, dtype=bool)
+        if blocked.shape != (self.rows, self.cols):
+            raise ValueError("blocked must have one entry per cell")
+        flat = blocked.ravel()
+        keep = np.empty(self.edge_count, dtype=bool)
+        for first, sources in self._edge_blocks():
+            part = slice(first, first + len(sources))
+            targets = self.indices[part]
+            ok = ~flat[sources] & ~flat[targets]
+            if self.diagonal and not corner_cutting:
+                sr, sc = np.divmod(sources, self.cols)
+                tr, tc = np.divmod(targets, self.cols)
+                ok &= ~blocked[sr, tc] & ~blocked[tr, sc]
+            keep[part] = ok
+        return self.remove_edges(keep)
+
+    # TRAVERSALS
+    def gather(self, nodes: NDArray) -> tuple[NDArray, NDArray]:
+        """
+        All edges out of `nodes` at once.
+
+        Returns:
+            (edges, owner): positions of the edges in `indices`, and for
+            each the index in `nodes` of its source
+        """
+        starts = self.indptr[nodes]
+        counts = self.indptr[nodes + 1] - starts
+        owner = np.repeat(np.arange(len(nodes)), counts)
+        first = np.cumsum(counts) - counts
+        edges = starts[owner] + np.arange(len(owner)) - first[owner]
+        return edges, owner
+
+    def bfs(self, sources) -> NDArray:
+        """
+        Steps from the nearest source to every node (-1 when unreachable),
+        expanding a whole frontier per numpy pass.
+        """
+        distance = np.full(self.node_count, -1, dtype=np.int32)
+        frontier = np.unique(np.atleast_1d(np.asarray(sources, dtype=np.int64)))
+        distance[frontier] = 0
+        step = 0
+        while len(frontier):
+            step += 1
+            edges, _ = self.gather(frontier)
+            targets = self.indices[edges]
+            targets = np.unique(targets[distance[targets] < 0])
+            distance[targets] = step
+            frontier = targets.astype(np.int64)
+        return distance
+
+    def flood_fill(self, source: int) -> NDArray:
+        """Boolean (rows, cols) region reachable from a node."""
+        return (self.bfs(source) >= 0).reshape(self.rows, self.cols)
+
+    def dijkstra(self, source: int, target: int | None = None) -> tuple[NDArray, NDArray]:
+        """
+        Shortest weighted distances from `source`, stopping early once
+        `target` is settled.
+
+        Returns:
+            (distance, previous): inf and -1 for the nodes not reached
+        """
+        indptr, indices, weights = self.indptr, self.indices, self.weights
+        distance = np.full(self.node_count, np.inf)
+        previous = np.full(self.node_count, -1, dtype=np.int64)
+        distance[source] = 0.0
+        heap = [(0.0, source)]
+        while heap:
+            d, node = heapq.heappop(heap)
+            if d > distance[node]:
+                continue
+            if node == target:
+                break
+            for e in range(indptr[node], indptr[node + 1]):
+                n = indices[e]
+                nd = d + weights[e]
+                if nd < distance[n]:
+                    distance[n] = nd
+                    previous[n] = node
+                    heapq.heappush(heap, (nd, int(n)))
+        return distance, previous
+
+    def path(self, previous: NDArray, target: int) -> list[int]:
+        """
+        Nodes from the source to `target` from the `previous` of `dijkstra`.
+        An unreachable target gives just [target], check its distance.
+        """
+        ret = [target]
+        while previous[ret[-1]] >= 0:
+            ret.append(int(previous[ret[-1]]))
+        return ret[::-1]
@@ -0,0 +1,273 @@
+import time
+import numpy as np
+from numpy.typing import NDArray
+
+
+def crossed_cells(dy: int, dx: int) -> NDArray:
+    """
+    Cells whose interior is crossed by the segment between the center
+    of the cell (0, 0) and the center of the cell (dy, dx).
+    The endpoints themselves are excluded.
+    A segment that only touches a corner of a cell does not cross it,
+    so diagonal rays behave like in the raycast scenes.
+
+    Args:
+        dy: Row offset of the target cell
+        dx: Column offset of the target cell
+
+    Returns:
+        Array of shape (n, 2) with (row, col) offsets, ordered from the start
+    """
+    rows = np.arange(min(0, dy), max(0, dy) + 1)
+    cols = np.arange(min(0, dx), max(0, dx) + 1)
+    r, c = np.meshgrid(rows, cols, indexing="ij")
+    r = r.ravel()
+    c = c.ravel()
+
+    # Cell (r, c) spans [r - 1/2, r + 1/2] x [c - 1/2, c + 1/2].
+    # For each axis the segment point d * t is inside that span for
+    # t in (lo / den, hi / den), the denominator being 2|d| (or 1 if d = 0).
+    def axis_interval(d, v):
+        if d == 0:
+            inside = v == 0
+            lo = np.where(inside, 0, 1)
+            hi = np.where(inside, 1, 0)
+            return lo, hi, 1
+        s = 1 if d > 0 else -1
+        return s * 2 * v - 1, s * 2 * v + 1, 2 * abs(d)
+
+    lo_y, hi_y, den_y = axis_interval(dy, r)
+    lo_x, hi_x, den_x = axis_interval(dx, c)
+
+    # The intersection of both intervals with (0, 1) must be non-empty.
+    ok = (hi_y > 0) & (hi_x > 0) & (lo_y < den_y) & (lo_x < den_x)
+    ok &= lo_y * den_x < hi_x * den_y
+    ok &= lo_x * den_y < hi_y * den_x
+    ok &= ~((r == 0) & (c == 0))
+    ok &= ~((r == dy) & (c == dx))
+
+    ret = np.stack([r[ok], c[ok]], axis=1)
+    order = np.argsort(np.abs(ret[:, 0]) + np.abs(ret[:, 1]), kind="stable")
+    return ret[order]
+
+
+def window_offsets(max_radius: int) -> NDArray:
+    """
+    All (row, col) offsets within the euclidean `max_radius` of a cell,
+    including the cell itself.
+    The position of an offset in this array is its bit index in the cache.
+    """
+    k = np.arange(-max_radius, max_radius + 1)
+    dy, dx = np.meshgrid(k, k, indexing="ij")
+    inside = dy * dy + dx * dx <= max_radius * max_radius
+    return np.stack([dy[inside], dx[inside]], axis=1)
+
+
+class LineOfSightCache:
+    """
+    Precomputed cell-to-cell visibility for a static grid of obstacles.
+
+    Every cell stores a packed bitset with one bit per offset within
+    `max_radius`, telling whether the cell at that offset can be seen.
+    A cell is seen if no obstacle cell lies strictly between the two cells
+    (see `crossed_cells`), so obstacles themselves are visible, just like
+    the object that stops a raycast.
+    Cells further than `max_radius` are never visible.
+
+    Grid convention matches the raycast scenes:
+    `blocked[row, col]`, row 0 at the top.
+    """
+
+    def __init__(self, blocked: NDArray, max_radius: int = 16):
+        blocked = np.asarray(blocked, dtype=bool)
+        if blocked.ndim != 2:
+            raise ValueError("blocked must be a 2D array of cells")
+        if max_radius < 0:
+            raise ValueError("max_radius must not be negative")
+
+        self.rows, self.cols = blocked.shape
+        self.max_radius = max_radius
+
+        self.offsets = window_offsets(max_radius)
+        self.bytes_per_cell = (len(self.offsets) + 7) // 8
+
+        # Offset -> bit index, -1 outside of the radius.
+        side = 2 * max_radius + 1
+        self._bit_index = np.full((side, side), -1, dtype=np.int32)
+        self._bit_index[self.offsets[:, 0] + max_radius, self.offsets[:, 1] + max_radius] = \
+            np.arange(len(self.offsets), dtype=np.int32)
+
+        paths = [crossed_cells(int(dy), int(dx)) for dy, dx in self.offsets]
+        self._paths = paths
+        self._path_len = np.array([len(p) for p in paths], dtype=np.int32)
+
+        # Padded path table for the incremental updates.
+        # Padding entries point at the source cell and are masked out.
+        max_len = max(1, int(self._path_len.max()))
+        self._path_table = np.zeros((len(paths), max_len, 2), dtype=np.int32)
+        self._path_mask = np.zeros((len(paths), max_len), dtype=bool)
+        for i, p in enumerate(paths):
+            self._path_table[i, :len(p)] = p
+            self._path_mask[i, :len(p)] = True
+
+        # Reverse index: the cell at relative offset dep_cell[j] lies on the
+        # path of the offset dep_offset[j].
+        # Changing a cell c affects exactly the sources c - dep_cell.
+        self._dep_offset = np.repeat(np.arange(len(paths), dtype=np.int32), self._path_len)
+        self._dep_cell = np.concatenate(
+            [p for p in paths if len(p) > 0] or [np.zeros((0, 2), dtype=np.int64)]).astype(np.int32)
+
+        self.blocked = blocked.copy()
+        self.bits = np.zeros((self.rows * self.cols, self.bytes_per_cell), dtype=np.uint8)
+        self.build_seconds = 0.0
+        self.rebuild()
+
+    @staticmethod
+    def estimate_nbytes(rows: int, cols: int, max_radius: int) -> int:
+        """Size of the bitsets for a grid, without building anything."""
+        return rows * cols * ((len(window_offsets(max_radius)) + 7) // 8)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the cache, including the path tables."""
+        return (self.bits.nbytes
+            + self.blocked.nbytes
+            + self._bit_index.nbytes
+            + self._path_table.nbytes
+            + self._path_mask.nbytes
+            + self._dep_offset.nbytes
+            + self._dep_cell.nbytes)
+
+    def _padded(self, array, value):
+        r = self.max_radius
+        return np.pad(array, r, mode="constant", constant_values=value)
+
+    def rebuild(self):
+        """Recompute every bitset from the current obstacles."""
+        start = time.perf_counter()
+
+        r = self.max_radius
+        h, w = self.rows, self.cols
+        blocked = self._padded(self.blocked, True)
+        inside = self._padded(np.ones((h, w), dtype=bool), False)
+
+        def shifted(array, dy, dx):
+            return array[r + dy : r + dy + h, r + dx : r + dx + w]
+
+        # Bits are packed 8 offsets at a time into one byte plane,
+        # which is then written into the per-cell rows.
+        byte_plane = np.zeros((h, w), dtype=np.uint8)
+        plane = np.empty((h, w), dtype=bool)
+        for i, (dy, dx) in enumerate(self.offsets):
+            np.copyto(plane, shifted(inside, dy, dx))
+            for py, px in self._paths[i]:
+                plane &= ~shifted(blocked, py, px)
+            byte_plane |= plane.view(np.uint8) << np.uint8(i & 7)
+
+            if (i & 7) == 7 or i == len(self.offsets) - 1:
+                self.bits[:, i >> 3] = byte_plane.ravel()
+                byte_plane[:] = 0
+
+        self.build_seconds = time.perf_counter() - start
+
+    def _bit_of(self, dy, dx):
+        r = self.max_radius
+        dy = np.asarray(dy)
+        dx = np.asarray(dx)
+        in_window = (np.abs(dy) <= r) & (np.abs(dx) <= r)
+        bit = np.full(dy.shape, -1, dtype=np.int32)
+        bit[in_window] = self._bit_index[dy[in_window] + r, dx[in_window] + r]
+        return bit
+
+    def _check_sources(self, rows, cols):
+        outside = (rows < 0) | (rows >= self.rows) | (cols < 0) | (cols >= self.cols)
+        if np.any(outside):
+            raise IndexError("source cell outside the grid")
+
+    def sees(self, a: tuple[int, int], b: tuple[int, int]) -> bool:
+        """
+        Whether cell `b` is visible from cell `a`, both given as (row, col).
+        Raises IndexError if `a` is outside the grid.
+        """
+        self._check_sources(a[0], a[1])
+        dy = b[0] - a[0]
+        dx = b[1] - a[1]
+        r = self.max_radius
+        if abs(dy) > r or abs(dx) > r:
+            return False
+        bit = int(self._bit_index[dy + r, dx + r])
+        if bit < 0:
+            return False
+        cell = a[0] * self.cols + a[1]
+        return bool((self.bits[cell, bit >> 3] >> (bit & 7)) & 1)
+
+    def sees_many(self, src_rows, src_cols, dst_rows, dst_cols) -> NDArray:
+        """Vectorized `sees` over arrays of source and target cells."""
+        src_rows = np.asarray(src_rows)
+        src_cols = np.asarray(src_cols)
+        self._check_sources(src_rows, src_cols)
+        bit = self._bit_of(np.asarray(dst_rows) - src_rows, np.asarray(dst_cols) - src_cols)
+        ret = np.zeros(bit.shape, dtype=bool)
+        ok = bit >= 0
+        cell = src_rows[ok] * self.cols + src_cols[ok]
+        b = bit[ok]
+        ret[ok] = ((self.bits[cell, b >> 3] >> (b & 7)) & 1).astype(bool)
+        return ret
+
+    def visible_mask(self, row: int, col: int) -> NDArray:
+        """Boolean (rows, cols) mask of the cells visible from (row, col)."""
+        packed = self.bits[row * self.cols + col]
+        flags = np.unpackbits(packed, bitorder="little")[:len(self.offsets)].astype(bool)
+        targets = self.offsets[flags] + np.array([row, col])
+        ret = np.zeros((self.rows, self.cols), dtype=bool)
+        ret[targets[:, 0], targets[:, 1]] = True
+        return ret
+
+    def set_blocked(self, rows, cols, value: bool = True) -> int:
+        """
+        Add (`value=True`) or remove obstacle cells, recomputing only the
+        bits whose line of sight passes through one of the changed cells.
+        Raises ValueError for cells outside the grid.
+
+        Returns:
+            Number of (source, offset) entries that were recomputed
+        """
+        rows = np.atleast_1d(np.asarray(rows, dtype=np.int64))
+        cols = np.atleast_1d(np.asarray(cols, dtype=np.int64))
+        if np.any((rows < 0) | (rows >= self.rows) | (cols < 0) | (cols >= self.cols)):
+            raise ValueError("cells to block or unblock must be inside the grid")
+        changed = self.blocked[rows, cols] != value
+        rows = rows[changed]
+        cols = cols[changed]
+        if len(rows) == 0:
+            return 0
+        self.blocked[rows, cols] = value
+
+        # Every (source, offset) pair whose path crosses a changed cell.
+        src_r = (rows[:, None] - self._dep_cell[None, :, 0]).ravel()
+        src_c = (cols[:, None] - self._dep_cell[None, :, 1]).ravel()
+        offset = np.tile(self._dep_offset, len(rows))
+        ok = (src_r >= 0) & (src_r < self.rows) & (src_c >= 0) & (src_c < self.cols)
+        key = (src_r[ok] * self.cols + src_c[ok]) * len(self.offsets) + offset[ok]
+        key = np.unique(key)
+
+        cell, offset = np.divmod(key, len(self.offsets))
+        src_r, src_c = np.divmod(cell, self.cols)
+
+        # Recompute those bits.
+        tgt_r = src_r + self.offsets[offset, 0]
+        tgt_c = src_c + self.offsets[offset, 1]
+        visible = (tgt_r >= 0) & (tgt_r < self.rows) & (tgt_c >= 0) & (tgt_c < self.cols)
+
+        path_r = src_r[:, None] + self._path_table[offset, :, 0]
+        path_c = src_c[:, None] + self._path_table[offset, :, 1]
+        mask = self._path_mask[offset] & visible[:, None]
+        hit = np.zeros(mask.shape, dtype=bool)
+        hit[mask] = self.blocked[path_r[mask], path_c[mask]]
+        visible &= ~hit.any(axis=1)
+
+        byte = offset >> 3
+        flag = (np.uint8(1) << (offset & 7).astype(np.uint8)).astype(np.uint8)
+        np.bitwise_and.at(self.bits, (cell, byte), ~flag)
+        np.bitwise_or.at(self.bits, (cell[visible], byte[visible]), flag[visible])
+        return len(key)
@@ -0,0 +1,231 @@
+import numpy as np
+from numpy.typing import NDArray
+
+TILE = 8  # tiles are 8x8 cells, one uint64 each
+
+
+class ObstacleLayer:
+    """
+    Occupancy of a grid packed one bit per cell.
+
+    The bits are stored row-major, 8 cells per byte (`bits`, shape
+    (rows, bytes_per_row)). `tiles` gives the same bits tile-major, one
+    uint64 per 8x8 tile, so a whole tile is tested with a single compare.
+    Rectangle queries use a summed-area table, so counting the obstacles
+    in any cell range takes 4 lookups whatever its size. The table and
+    the tiles are rebuilt lazily after edits, so edit in bulk
+    (`set_cells`, `fill_rect`) and query afterwards.
+
+    Grid convention matches the raycast scenes: (row, col), row 0 at the
+    top. Continuous positions are in cell units, (x, y) = (col, row).
+
+    Usage:
+        layer = ObstacleLayer.from_cells(GRID_ROWS, GRID_COLS, object_cells)
+        layer.is_blocked(r, c)
+        layer.count_rect(0, 0, 2, 3)
+    """
+
+    def __init__(self, rows: int, cols: int):
+        if rows <= 0 or cols <= 0:
+            raise ValueError("the grid must have at least one cell")
+        self.rows = rows
+        self.cols = cols
+        self.bytes_per_row = (cols + 7) // 8
+        self.bits = np.zeros((rows, self.bytes_per_row), dtype=np.uint8)
+        self._sat: NDArray | None = None
+        self._tiles: NDArray | None = None
+
+    @classmethod
+    def from_mask(cls, blocked: NDArray) -> 'ObstacleLayer':
+        blocked = np.asarray(blocked, dtype=bool)
+        if blocked.ndim != 2:
+            raise ValueError("blocked must be a 2D array of cells")
+        ret = cls(*blocked.shape)
+        ret.bits[:] = np.packbits(blocked, axis=1, bitorder="little")
+        return ret
+
+    @classmethod
+    def from_cells(cls, rows: int, cols: int, cells) -> 'ObstacleLayer':
+        """Layer from (row, col) pairs, e.g. the `object_cells` set of the raycast scenes."""
+        ret = cls(rows, cols)
+        cells = np.asarray(list(cells), dtype=np.int64).reshape(-1, 2)
+        ret.set_cells(cells[:, 0], cells[:, 1])
+        return ret
+
+    def to_mask(self) -> NDArray:
+        """Boolean (rows, cols) array of the obstacles."""
+        return np.unpackbits(self.bits, axis=1, count=self.cols, bitorder="little").astype(bool)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory of the bits and of the tables built so far."""
+        ret = self.bits.nbytes
+        if self._sat is not None:
+            ret += self._sat.nbytes
+        if self._tiles is not None:
+            ret += self._tiles.nbytes
+        return ret
+
+    def _changed(self):
+        self._sat = None
+        self._tiles = None
+
+    # POINTS
+    def on_grid(self, rows, cols) -> NDArray:
+        """Whether each (row, col) cell is inside the grid."""
+        rows = np.asarray(rows)
+        cols = np.asarray(cols)
+        return (rows >= 0) & (rows < self.rows) & (cols >= 0) & (cols < self.cols)
+
+    def is_blocked(self, rows, cols, outside: bool = False) -> NDArray:
+        """
+        Whether each (row, col) cell holds an obstacle.
+
+        Args:
+            rows: Row of every query
+            cols: Column of every query
+            outside: Answer for the cells off the grid
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        inside = self.on_grid(rows, cols)
+        ret = np.full(rows.shape, outside, dtype=bool)
+        r, c = rows[inside], cols[inside]
+        ret[inside] = (self.bits[r, c >> 3] >> (c & 7).astype(np.uint8)) & 1
+        return ret
+
+    def contains_points(self, xy: NDArray, outside: bool = False) -> NDArray:
+        """Whether each continuous position (k, 2), in cell units, lies in an obstacle cell."""
+        cells = np.floor(np.asarray(xy, dtype=np.float64)).astype(np.int64)
+        return self.is_blocked(cells[..., 1], cells[..., 0], outside)
+
+    # EDITS
+    def set_cells(self, rows, cols, value: bool = True):
+        """Add (`value=True`) or remove many cells at once. Cells off the grid are ignored."""
+        rows = np.atleast_1d(np.asarray(rows, dtype=np.int64))
+        cols = np.atleast_1d(np.asarray(cols, dtype=np.int64))
+        inside = self.on_grid(rows, cols)
+        rows, cols = rows[inside], cols[inside]
+        if len(rows) == 0:
+            return
+        # The flags of the cells sharing a byte are merged first, so each
+        # byte is written once.
+        key = rows * self.bytes_per_row + (cols >> 3)
+        order = np.argsort(key, kind="stable")
+        key = key[order]
+        flag = (np.uint8(1) << (cols[order] & 7).astype(np.uint8)).astype(np.uint8)
+        first = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+        flag = np.bitwise_or.reduceat(flag, first)
+        flat = self.bits.reshape(-1)
+        if value:
+            flat[key[first]] |= flag
+        else:
+            flat[key[first]] &= ~flag
+        self._changed()
+
+    def fill_rect(self, row0: int, col0: int, row1: int, col1: int, value: bool = True):
+        """Set the cells of rows [row0, row1) and columns [col0, col1), clipped to the grid."""
+        row0, row1 = max(row0, 0), min(row1, self.rows)
+        col0, col1 = max(col0, 0), min(col1, self.cols)
+        if row0 >= row1 or col0 >= col1:
+            return
+        # One byte mask for the column range, applied to all rows at once.
+        columns = np.zeros(self.bytes_per_row * 8, dtype=bool)
+        columns[col0:col1] = True
+        mask = np.packbits(columns, bitorder="little")
+        if value:
+            self.bits[row0:row1] |= mask
+        else:
+            self.bits[row0:row1] &= ~mask
+        self._changed()
+
+    # TILES
+    @property
+    def tiles(self) -> NDArray:
+        """
+        Tile-major view: uint64 of shape (tile_rows, tile_cols), bit
+        8 * r + c of a tile being its cell (r, c).
+        """
+        if self._tiles is None:
+            tile_rows = (self.rows + TILE - 1) // TILE
+            padded = np.zeros((tile_rows * TILE, self.bytes_per_row), dtype=np.uint8)
+            padded[:self.rows] = self.bits
+            # Byte (row, col // 8) becomes byte row % 8 of tile (row // 8, col // 8).
+            by_tile = padded.reshape(tile_rows, TILE, self.bytes_per_row).transpose(0, 2, 1)
+            self._tiles = np.ascontiguousarray(by_tile).view("<u8")[..., 0]
+        return self._tiles
+
+    def occupied_tiles(self) -> NDArray:
+        """Boolean (tile_rows, tile_cols) map of the tiles with any obstacle."""
+        return self.tiles != 0
+
+    # RECTANGLES
+    @property
+    def summed_area(self) -> NDArray:
+        """Obstacle counts: `summed_area[r, c]` is the number in rows < r and cols < c."""
+        if self._sat is None:
+            counts = np.zeros((self.rows + 1, self.cols + 1), dtype=np.int32)
+            np.cumsum(self.to_mask(), axis=0, dtype=np.int32, out=counts[1:, 1:])
+            np.cumsum(counts[1:, 1:], axis=1, out=counts[1:, 1:])
+            self._sat = counts
+        return self._sat
+
+    def count_rect(self, row0, col0, row1, col1) -> NDArray:
+        """
+        Number of obstacles in rows [row0, row1) and columns [col0, col1),
+        for arrays of rectangles. The parts off the grid are empty.
+        """
+        sat = self.summed_area
+        r0 = np.clip(np.asarray(row0, dtype=np.int64), 0, self.rows)
+        r1 = np.clip(np.asarray(row1, dtype=np.int64), 0, self.rows)
+        c0 = np.clip(np.asarray(col0, dtype=np.int64), 0, self.cols)
+        c1 = np.clip(np.asarray(col1, dtype=np.int64), 0, self.cols)
+        r1 = np.maximum(r0, r1)
+        c1 = np.maximum(c0, c1)
+        return sat[r1, c1] - sat[r0, c1] - sat[r1, c0] + sat[r0, c0]
+
+    def overlaps_aabb(self, lo: NDArray, hi: NDArray) -> NDArray:
+        """
+        Whether each box, given by its corners in cell units (x, y) with
+        shape (k, 2), overlaps an obstacle cell. A box that only touches
+        the edge of a cell does not overlap it.
+        """
+        lo = np.asarray(lo, dtype=np.float64)
+        hi = np.asarray(hi, dtype=np.float64)
+        c0, r0 = np.floor(lo[..., 0]).astype(np.int64), np.floor(lo[..., 1]).astype(np.int64)
+        c1, r1 = np.ceil(hi[..., 0]).astype(np.int64), np.ceil(hi[..., 1]).astype(np.int64)
+        return self.count_rect(r0, c0, r1, c1) > 0
+
+    def overlaps_circle(self, centers: NDArray, radii: NDArray, chunk: int = 1 << 16) -> NDArray:
+        """
+        Whether each circle, center in cell units (x, y), overlaps an
+        obstacle cell. The bounding boxes are tested first with the
+        summed-area table, and only circles whose box holds an obstacle
+        are tested cell by cell against their exact shape.
+        """
+        centers = np.atleast_2d(np.asarray(centers, dtype=np.float64))
+        radii = np.broadcast_to(np.asarray(radii, dtype=np.float64), (len(centers),))
+        ret = self.overlaps_aabb(centers - radii[:, None], centers + radii[:, None])
+        candidates = np.flatnonzero(ret)
+        if len(candidates) == 0:
+            return ret
+
+        # Every cell of the bounding boxes, padded to the largest box.
+        c0 = np.floor(centers[candidates, 0] - radii[candidates]).astype(np.int64)
+        r0 = np.floor(centers[candidates, 1] - radii[candidates]).astype(np.int64)
+        side = int(np.ceil(2 * radii[candidates].max())) + 1
+        dr, dc = np.divmod(np.arange(side * side), side)
+        per_chunk = max(1, chunk // (side * side))
+        for start in range(0, len(candidates), per_chunk):
+            part = slice(start, start + per_chunk)
+            index = candidates[part]
+            r = r0[part, None] + dr
+            c = c0[part, None] + dc
+            # Distance from the center to the closest point of each cell.
+            x = centers[index, 0, None]
+            y = centers[index, 1, None]
+            nx = np.clip(x, c, c + 1) - x
+            ny = np.clip(y, r, r + 1) - y
+            touching = nx * nx + ny * ny < radii[index, None] ** 2
+            ret[index] = (touching & self.is_blocked(r, c)).any(axis=1)
+        return ret
@@ -19,13 +19,25 @@ def _get_git_root():
         # Fallback to current directory if not in a git repo
         return Path.cwd()
 
+# Format of the scenes' output; the GIFs are what the docs embed.
+DEFAULT_FORMAT = "gif"
+
+# Config values chosen by whoever runs the render (e.g. a render_server
+# profile), kept by set_default_output instead of the scene's defaults.
+OUTPUT_OVERRIDES: dict = {}
+
 def set_default_output(name):
-    config.output_file = get_output_path(name)
-    config.format = "gif"
-    config.frame_height = 8
-    config.frame_width = 8
-    config.pixel_height = 400
-    config.pixel_width = 400
+    defaults = {
+        "output_file": get_output_path(name),
+        "format": DEFAULT_FORMAT,
+        "frame_height": 8,
+        "frame_width": 8,
+        "pixel_height": 400,
+        "pixel_width": 400,
+    }
+    defaults.update((key, value) for key, value in OUTPUT_OVERRIDES.items() if key in defaults)
+    for key, value in defaults.items():
+        setattr(config, key, value)
 
 def get_output_path(name):
     git_root = _get_git_root()
@@ -203,3 +215,214 @@ def get_vector_from_angle_2d(radians: float) -> np.ndarray:
     ret = np.array([np.cos(radians), np.sin(radians)])
     return ret
 
+
+
+from manim.animation.animation import prepare_animation
+
+# Set to False to play every Timeline step as its own Scene.play,
+# e.g. to compare render times.
+COALESCE_PLAYS = True
+
+
+class ScheduledAnimations(AnimationGroup):
+    """
+    Animations with explicit start times, played as a single animation.
+
+    Animations that bring a mobject in (FadeIn, Create, GrowArrow...) are
+    begun right away, so their mobject is part of the scene from the start
+    in its initial, invisible state. All others are begun when their start
+    time comes, so they start from whatever the earlier ones left.
+
+    The schedule is kept in attributes of its own: only the hooks of
+    AnimationGroup are overridden, not its timing state.
+    """
+
+    def __init__(self, animations: list[Animation], starts: list[float], duration: float, **kwargs):
+        self.starts = np.asarray(starts, dtype=np.float64)
+        self.duration = duration
+        super().__init__(*animations, **kwargs)
+
+    def init_run_time(self, run_time: float | None) -> float:
+        super().init_run_time(run_time)
+        self.ends = self.starts + np.array([a.run_time for a in self.animations], dtype=np.float64)
+        self.total_time = max(self.ends.max(initial=0.0), self.duration)
+        self.begun = np.zeros(len(self.animations), dtype=bool)
+        self.finished = np.zeros(len(self.animations), dtype=bool)
+        return self.total_time if run_time is None else run_time
+
+    def _setup_scene(self, scene: Scene) -> None:
+        # The animations are set up as they begin, not all at once.
+        self.scene = scene
+
+    def begin(self) -> None:
+        if not self.animations:
+            raise ValueError("Trying to play a Timeline without animations")
+        self.begun[:] = False
+        self.finished[:] = False
+        for k, anim in enumerate(self.animations):
+            if anim.is_introducer():
+                self._begin(k)
+                anim.interpolate(0)
+
+    def _begin(self, k: int) -> None:
+        anim = self.animations[k]
+        anim._setup_scene(self.scene)
+        anim.begin()
+        self.begun[k] = True
+
+    def interpolate(self, alpha: float) -> None:
+        t = self.rate_func(alpha) * self.total_time
+        # In start order, so that an animation begins after the earlier
+        # ones on the same mobject finished.
+        for k in np.flatnonzero((self.starts <= t) & ~self.finished):
+            anim = self.animations[k]
+            if not self.begun[k]:
+                self._begin(k)
+            if t >= self.ends[k]:
+                anim.interpolate(1)
+                anim.finish()
+                self.finished[k] = True
+            else:
+                anim.interpolate((t - self.starts[k]) / (self.ends[k] - self.starts[k]))
+
+    def finish(self) -> None:
+        self.interpolate(1)
+        self.begun[:] = True
+        self.finished[:] = True
+
+    def update_mobjects(self, dt: float) -> None:
+        for k in np.flatnonzero(self.begun & ~self.finished):
+            self.animations[k].update_mobjects(dt)
+
+
+class Timeline:
+    """
+    Records many small `play` and `wait` steps and plays them as a
+    single `Scene.play`, each animation starting at the time it would
+    have had with its own `play`. One play means one partial movie
+    file and one pass of updates per frame, instead of one per step.
+
+    The steps are ordinary Python, so loops and early `break`s decide
+    what gets recorded, exactly like with `scene.play`.
+
+    Usage:
+        timeline = helper.Timeline(self)
+        for cell in cells:
+            timeline.play(FadeIn(h), run_time=0.3)
+            if hit:
+                break
+        timeline.wait(0.6)
+        timeline.flush()
+    """
+
+    def __init__(self, scene: Scene, coalesce: bool | None = None):
+        self.scene = scene
+        self.coalesce = COALESCE_PLAYS if coalesce is None else coalesce
+        self.animations: list[Animation] = []
+        self.starts: list[float] = []
+        self.time = 0.0
+
+    def play(self, *animations, **kwargs) -> 'Timeline':
+        """Like `Scene.play`: the animations start together after the previous step."""
+        if not self.coalesce:
+            self.scene.play(*animations, **kwargs)
+            return self
+        compiled = [prepare_animation(a) for a in animations]
+        for anim in compiled:
+            for key, value in kwargs.items():
+                setattr(anim, key, value)
+        self.animations.extend(compiled)
+        self.starts.extend([self.time] * len(compiled))
+        self.time += max((a.get_run_time() for a in compiled), default=0.0)
+        return self
+
+    def wait(self, duration: float = 1.0) -> 'Timeline':
+        if not self.coalesce:
+            self.scene.wait(duration)
+            return self
+        self.time += duration
+        return self
+
+    def compile(self) -> ScheduledAnimations:
+        return ScheduledAnimations(self.animations, self.starts, self.time)
+
+    def flush(self) -> 'Timeline':
+        """Play everything recorded so far, and start recording again."""
+        if self.animations:
+            self.scene.play(self.compile())
+        elif self.time > 0:
+            self.scene.wait(self.time)
+        self.animations, self.starts, self.time = [], [], 0.0
+        return self
+
+
+class MobjectPool:
+    """
+    Pre-built mobjects of one kind (highlight squares, ticks, arrows...)
+    handed out and taken back, so a scene that shows and removes the
+    same kind of shape again and again builds each one once.
+
+    `acquire` moves a free mobject into place, by default shifting the
+    point that was at ORIGIN when it was built to the given position;
+    `place` replaces that, e.g. to set the ends of an arrow. `release`
+    clears its updaters and gives it back the style of a fresh one, so a
+    fade or a color change does not carry over to the next use. Only
+    release a mobject once the animations that use it have been played:
+    with a `Timeline`, after `flush`. A mobject can appear only once in
+    the single play of a flush (the animations that bring mobjects in all
+    begin at its start), so a pool only saves something for shapes that
+    come back between flushes; a scene flushing once is better off
+    building its shapes. The style of a fresh one is built on the first
+    `release`.
+
+    Usage:
+        highlights = helper.MobjectPool(lambda: Square(color=GREEN), size=4)
+        h = highlights.acquire(pos)
+        timeline.play(FadeIn(h)) ... timeline.play(FadeOut(h)).flush()
+        highlights.release(h)
+    """
+
+    def __init__(self, factory, size: int = 0, place=None):
+        self.factory = factory
+        self.place = place
+        self.template: VMobject | None = None
+        self.free: list[VMobject] = []
+        # Where the ORIGIN of each mobject, as built, has been moved to.
+        self.positions: dict[int, np.ndarray] = {}
+        self.created = 0
+        self.acquired = 0
+        for _ in range(size):
+            self.free.append(self._build())
+
+    def _build(self) -> VMobject:
+        mob = self.factory()
+        self.created += 1
+        self.positions[id(mob)] = np.zeros(3)
+        return mob
+
+    @property
+    def in_use(self) -> int:
+        return self.created - len(self.free)
+
+    def acquire(self, *where) -> VMobject:
+        """A free mobject (built if there is none), placed at `where`."""
+        mob = self.free.pop() if self.free else self._build()
+        self.acquired += 1
+        if self.place is not None:
+            self.place(mob, *where)
+        elif where:
+            position = np.asarray(where[0], dtype=np.float64)
+            mob.shift(position - self.positions[id(mob)])
+            self.positions[id(mob)] = position
+        return mob
+
+    def release(self, *mobjects: VMobject) -> None:
+        if not mobjects:
+            return
+        template = self.template
+        if template is None:
+            template = self.template = self.factory()
+        for mob in mobjects:
+            mob.clear_updaters()
+            mob.match_style(template)
+            self.free.append(mob)
@@ -0,0 +1,252 @@
+"""
+Census of the live mobjects of a render, to find what leaks across the
+iterations of scenes that loop and `clear()`.
+
+After every play (and wait) and every `clear()`, the census counts the
+mobjects alive in the process by class, with the bytes of their arrays
+(points, and pixels for images) and their updaters. Each `clear()` ends
+an iteration: the mobjects it removed should be gone by the end of the
+next one, and those still alive are reported as leaks, with what still
+holds them (e.g. an updater closure). Growth is reported per iteration.
+
+Counting walks every object of the garbage collector, so it is only
+done when the census is enabled.
+
+Run from src/animations:
+    python render_census.py 01_lab_velocity_decompose VelocityDecomposition [--every-play]
+    python render_census.py 01_lab_normalized_times_length VelocityDirectionSpeed --json media/census.json
+"""
+import argparse
+import functools
+import gc
+import json
+import sys
+import types
+import weakref
+from collections import Counter
+
+
+class Snapshot:
+    """Live mobjects at one point of the render, by class."""
+
+    def __init__(self, label: str, iteration: int, mobjects: list):
+        self.label = label
+        self.iteration = iteration
+        self.count = Counter()
+        self.nbytes = Counter()
+        self.updaters = Counter()
+        for mob in mobjects:
+            name = type(mob).__name__
+            self.count[name] += 1
+            self.nbytes[name] += mob.points.nbytes
+            pixels = getattr(mob, "pixel_array", None)
+            if pixels is not None:
+                self.nbytes[name] += pixels.nbytes
+            self.updaters[name] += len(mob.updaters)
+
+    def totals(self) -> tuple[int, int, int]:
+        return sum(self.count.values()), sum(self.nbytes.values()), sum(self.updaters.values())
+
+    def to_dict(self) -> dict:
+        return {"label": self.label, "iteration": self.iteration,
+            "classes": {name: {"count": self.count[name], "bytes": self.nbytes[name],
+                "updaters": self.updaters[name]} for name in sorted(self.count)}}
+
+
+def _held_by(obj, ignore: list) -> list[str]:
+    """Short description of what references `obj`, ignoring the census' own lists and frames."""
+    ret = []
+    for referrer in gc.get_referrers(obj):
+        if any(referrer is i for i in ignore) or isinstance(referrer, types.FrameType):
+            continue
+        if type(referrer).__name__ == "cell":
+            # Closure variable: name the functions closing over it.
+            closures = [t for t in gc.get_referrers(referrer) if isinstance(t, tuple)]
+            functions = [f for t in closures for f in gc.get_referrers(t)
+                if isinstance(f, types.FunctionType) and f.__closure__ is t]
+            ret.extend(f"closure of {f.__qualname__}" for f in functions)
+        elif isinstance(referrer, dict):
+            owners = [o for o in gc.get_referrers(referrer) if getattr(o, "__dict__", None) is referrer]
+            keys = [k for k, v in referrer.items() if v is obj]
+            ret.extend(f"{type(o).__name__}.{k}" for o in owners for k in keys)
+            if not owners:
+                ret.append(f"dict[{', '.join(map(repr, keys))}]")
+        else:
+            ret.append(type(referrer).__name__)
+    return ret
+
+
+class Census:
+    """
+    Snapshots and leaks of one render. Use through `enable`, which calls
+    `after_play` and `after_clear` from the patched scene methods.
+    """
+
+    def __init__(self, every_play: bool = False):
+        self.every_play = every_play
+        self.iteration = 0
+        self.snapshots: list[Snapshot] = []
+        self.leaks: dict[int, list[tuple[str, list[str]]]] = {}
+        self._cleared: list[weakref.ref] = []
+
+    @staticmethod
+    def live_mobjects() -> list:
+        from manim import Mobject
+        gc.collect()
+        return [o for o in gc.get_objects() if isinstance(o, Mobject)]
+
+    def snapshot(self, label: str) -> Snapshot:
+        ret = Snapshot(label, self.iteration, self.live_mobjects())
+        self.snapshots.append(ret)
+        if self.every_play:
+            count, nbytes, updaters = ret.totals()
+            print(f"  [{self.iteration}] {label:<12} {count:6d} mobjects {nbytes / 1024:10.1f} KiB "
+                f"{updaters:4d} updaters")
+        return ret
+
+    def after_play(self, scene):
+        self.snapshot(f"play {scene.renderer.num_plays}")
+
+    def before_clear(self, scene) -> list:
+        """The mobjects `clear` is about to remove, with their submobjects."""
+        return [m for top in scene.mobjects + scene.foreground_mobjects for m in top.get_family()]
+
+    def check_cleared(self):
+        """Report the mobjects of the previous `clear` that are still alive."""
+        gc.collect()
+        survivors = [m for m in (ref() for ref in self._cleared) if m is not None]
+        if survivors:
+            ignore = [survivors]
+            self.leaks[self.iteration - 1] = [(type(m).__name__, _held_by(m, ignore)) for m in survivors]
+        self._cleared = []
+
+    def after_clear(self, removed: list):
+        self.check_cleared()
+        refs = []
+        for mob in removed:
+            try:
+                refs.append(weakref.ref(mob))
+            except TypeError:
+                pass
+        self._cleared = refs
+        self.snapshot("clear")
+        self.iteration += 1
+
+    def report(self) -> str:
+        lines = []
+        ends = [s for s in self.snapshots if s.label == "clear"]
+        if self.snapshots and self.snapshots[-1].label != "clear":
+            ends.append(self.snapshots[-1])
+        previous = None
+        for end in ends:
+            count, nbytes, updaters = end.totals()
+            name = f"iteration {end.iteration}" if end.label == "clear" else end.label
+            line = f"{name}: {count} mobjects, {nbytes / 1024:.1f} KiB, {updaters} updaters"
+            if previous is not None:
+                p_count, p_nbytes, p_updaters = previous.totals()
+                line += (f" ({count - p_count:+d} mobjects, {(nbytes - p_nbytes) / 1024:+.1f} KiB, "
+                    f"{updaters - p_updaters:+d} updaters)")
+                growth = end.count.copy()
+                growth.subtract(previous.count)
+                grown = [(n, d) for n, d in growth.most_common(5) if d > 0]
+                if grown:
+                    line += "\n    grew: " + ", ".join(f"{n} {d:+d}" for n, d in grown)
+            lines.append(line)
+            previous = end
+        for iteration, survivors in sorted(self.leaks.items()):
+            by_class = Counter(name for name, _ in survivors)
+            lines.append(f"survived the clear of iteration {iteration}: "
+                + ", ".join(f"{n} x{c}" for n, c in by_class.most_common()))
+            holders = Counter(h for _, held in survivors for h in held)
+            for holder, c in holders.most_common(5):
+                lines.append(f"    held by {holder} ({c})")
+        return "\n".join(lines)
+
+    def to_dict(self) -> dict:
+        return {"snapshots": [s.to_dict() for s in self.snapshots],
+            "leaks": {str(i): [{"class": n, "held_by": h} for n, h in survivors]
+                for i, survivors in self.leaks.items()}}
+
+
+_census: Census | None = None
+_originals: list[tuple[object, str, object]] = []
+
+
+def enable(every_play: bool = False) -> Census:
+    """Patch `Scene.play`, `Scene.clear` and `Scene.render` to take the census."""
+    global _census
+    if _census is not None:
+        return _census
+    _census = census = Census(every_play)
+    from manim import Scene
+
+    def patch(name, make_wrapper):
+        original = getattr(Scene, name)
+        setattr(Scene, name, functools.wraps(original)(make_wrapper(original)))
+        _originals.append((Scene, name, original))
+
+    def play(original):
+        def wrapper(self, *args, **kwargs):
+            ret = original(self, *args, **kwargs)
+            census.after_play(self)
+            return ret
+        return wrapper
+
+    def clear(original):
+        def wrapper(self):
+            removed = census.before_clear(self)
+            ret = original(self)
+            census.after_clear(removed)
+            return ret
+        return wrapper
+
+    def render(original):
+        def wrapper(self, *args, **kwargs):
+            ret = original(self, *args, **kwargs)
+            # construct has returned, so its locals no longer hold anything.
+            census.check_cleared()
+            census.snapshot("end")
+            return ret
+        return wrapper
+
+    patch("play", play)
+    patch("clear", clear)
+    patch("render", render)
+    return census
+
+
+def disable() -> Census | None:
+    """Restore the scene methods. Returns the census that was active."""
+    global _census
+    while _originals:
+        owner, name, original = _originals.pop()
+        setattr(owner, name, original)
+    ret, _census = _census, None
+    return ret
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("module", help="Scene file without .py, e.g. 01_lab_velocity_decompose")
+    parser.add_argument("scene", help="Scene class, e.g. VelocityDecomposition")
+    parser.add_argument("--profile", default="preview")
+    parser.add_argument("--every-play", action="store_true", help="Print a line after every play")
+    parser.add_argument("--json", help="Also write the snapshots and leaks there")
+    args = parser.parse_args()
+
+    import render_server
+    preloaded = render_server.preload()
+    enable(args.every_play)
+    result = render_server.run_job({"module": args.module, "scene": args.scene, "profile": args.profile,
+        "config": {"write_to_movie": False, "save_last_frame": False}}, lambda event: None, preloaded)
+    census = disable()
+    print(f"{args.module}.{args.scene}: {result['plays']} plays")
+    print(census.report())
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(census.to_dict(), f, indent=1)
+    sys.exit(1 if census.leaks else 0)
+
+
+if __name__ == "__main__":
+    main()
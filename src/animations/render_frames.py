@@ -0,0 +1,152 @@
+"""
+Frame-parallel plays: when every frame of a play is a pure function of
+its time, the frames are drawn by forked workers, each jumping straight
+to its own range of times, and handed to the file writer in order.
+
+A play is time-pure when
+  - its animations interpolate from their starting state: transforms
+    (including `.animate`), fades, Create, Write/DrawBorderThenFill,
+    Rotating, Homotopy, MoveAlongPath, waits, and plain groups of those;
+  - no mobject on screen and no scene updater uses `dt`: updaters that
+    only read other mobjects (e.g. a cone following an angle tracker)
+    give the same result however the time is reached.
+Anything else, e.g. an `UpdateFromAlphaFunc`, can be declared pure with
+`animation.time_pure = True` or `play_parallel(..., pure=True)`. Plays
+that are not pure are played as usual, with the reason logged.
+
+Frames go through a shared anonymous memory map, a window at a time:
+while the workers draw one window, the parent feeds the previous one
+to the encoder.
+
+Usage, in a scene:
+    from render_frames import play_parallel
+    play_parallel(self, ctx.enemy.angle.animate.set_value(PI), run_time=3, workers=4)
+
+Run from src/animations:
+    python -m benchmarks.bench_render_frames [--workers 4]
+"""
+import mmap
+import multiprocessing
+import os
+import numpy as np
+from manim import (AnimationGroup, DrawBorderThenFill, Homotopy, LaggedStart, MoveAlongPath, Rotating, Scene,
+                   ShowPartial, Transform, Wait, config, logger)
+from manim.renderer.cairo_renderer import CairoRenderer
+
+PURE_ANIMATIONS = (Transform, ShowPartial, DrawBorderThenFill, Rotating, Homotopy, MoveAlongPath, Wait)
+# Frames held at once per window buffer (there are two).
+BUFFER_BYTES = 128 << 20
+
+
+def impurity(scene: Scene, animations) -> str | None:
+    """Why the frames of a play may depend on the frames before them, or None if they do not."""
+    pending = list(animations)
+    mobjects = list(scene.mobjects) + list(scene.foreground_mobjects)
+    while pending:
+        anim = pending.pop()
+        if getattr(anim, "time_pure", False):
+            continue
+        # Not subclasses: Succession and helper.ScheduledAnimations begin their parts as time goes.
+        if type(anim) in (AnimationGroup, LaggedStart):
+            pending.extend(anim.animations)
+            continue
+        if not isinstance(anim, PURE_ANIMATIONS):
+            return f"{type(anim).__name__} is not known to be time-pure"
+        mobjects.append(anim.mobject)
+    if scene.updaters:
+        return "the scene has updaters"
+    for mob in mobjects:
+        for sub in mob.get_family():
+            if sub.get_time_based_updaters():
+                return f"a {type(sub).__name__} has an updater using dt"
+    return None
+
+
+def _draw(scene: Scene, renderer: CairoRenderer, times, frames, first: int):
+    """Worker: the frames at `times`, written from index `first` of the shared buffer."""
+    for k, t in enumerate(times):
+        scene.update_to_time(t)
+        renderer.update_frame(scene, scene.moving_mobjects)
+        frames[first + k] = renderer.camera.pixel_array
+
+
+class FramePlay:
+    """
+    Replacement of `Scene.play_internal` for one play. Forks `workers`
+    processes per window of frames.
+    """
+
+    def __init__(self, scene: Scene, workers: int | None = None, pure: bool | None = None):
+        self.scene = scene
+        self.workers = workers or os.cpu_count() or 1
+        self.pure = pure
+        self.original = scene.play_internal
+        self.context = multiprocessing.get_context("fork")
+
+    def __call__(self, skip_rendering: bool = False):
+        scene = self.scene
+        renderer = scene.renderer
+        assert isinstance(renderer, CairoRenderer), "frames are drawn in parallel with the Cairo renderer only"
+        animations = scene.animations or []
+        if skip_rendering or renderer.skip_animations or scene.stop_condition is not None:
+            return self.original(skip_rendering)
+        reason = None if self.pure else impurity(scene, animations)
+        if reason is not None:
+            logger.info(f"Play {renderer.num_plays} drawn frame by frame: {reason}")
+            return self.original(skip_rendering)
+
+        scene.duration = scene.get_run_time(animations)
+        times = np.arange(0, scene.duration, 1 / config["frame_rate"])
+        shape = renderer.camera.pixel_array.shape
+        frame_bytes = int(np.prod(shape))
+        window = max(self.workers, min(len(times), BUFFER_BYTES // frame_bytes))
+        # Unmapped once the last view of them is gone (close() refuses while numpy holds one).
+        buffers = [mmap.mmap(-1, window * frame_bytes) for _ in range(2)]
+        pending = None
+        for w, start in enumerate(range(0, len(times), window)):
+            part = times[start:start + window]
+            frames = np.frombuffer(buffers[w % 2], dtype=np.uint8).reshape(window, *shape)
+            bounds = np.linspace(0, len(part), min(self.workers, len(part)) + 1).astype(int)
+            processes = [self.context.Process(target=_draw, args=(scene, renderer, part[a:b], frames, a))
+                for a, b in zip(bounds[:-1], bounds[1:])]
+            for p in processes:
+                p.start()
+            if pending is not None:
+                self._write(renderer, *pending)
+            for p in processes:
+                p.join()
+            if any(p.exitcode != 0 for p in processes):
+                raise RuntimeError(f"a frame worker of play {renderer.num_plays} failed")
+            pending = (frames, len(part))
+        if pending is not None:
+            self._write(renderer, *pending)
+
+        # The parent itself only jumps to the last frame, then ends the play as usual.
+        if len(times):
+            scene.update_to_time(times[-1])
+        for animation in animations:
+            animation.finish()
+            animation.clean_up_from_scene(scene)
+        scene.update_mobjects(0)
+        renderer.static_image = None
+
+    def _write(self, renderer: CairoRenderer, frames, count: int):
+        for k in range(count):
+            # Copied like `get_frame` does: the encoder may hold it after the buffer is reused.
+            renderer.add_frame(frames[k].copy())
+
+
+def play_parallel(scene: Scene, *animations, workers: int | None = None, pure: bool | None = None, **kwargs):
+    """
+    `scene.play(*animations, **kwargs)`, with the frames drawn in
+    parallel if the play is time-pure.
+
+    Args:
+        workers: Processes drawing frames, by default one per core
+        pure: True to declare the play time-pure without checking it
+    """
+    scene.play_internal = FramePlay(scene, workers, pure)
+    try:
+        scene.play(*animations, **kwargs)
+    finally:
+        del scene.play_internal
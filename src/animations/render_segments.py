@@ -0,0 +1,153 @@
+"""
+Render a long scene as independent segments in parallel processes, and
+join their partial movie files into the usual output.
+
+Segments are cut where the scene calls `self.clear()` (the iterations of
+`VelocityDecomposition` and `VelocityDirectionSpeed`) or
+`self.next_section()`, found by a planning pass that runs `construct`
+with every play skipped. Each worker renders the plays of one segment
+with manim's `from_animation_number`/`upto_animation_number`: the plays
+before it are skipped (run to their end state without drawing), so a
+segment starts from exactly the state the serial render would have.
+The partial movie files, one per play, are then joined in play order
+by manim's own combine step, which copies the movie streams as they
+are (or builds the GIF palette over all frames at once).
+
+Run from src/animations:
+    python render_segments.py 01_lab_velocity_decompose VelocityDecomposition [--workers 4]
+    python -m benchmarks.bench_render_segments   # serial against segmented
+"""
+import argparse
+import importlib
+import multiprocessing
+import os
+import time
+
+import render_server
+
+
+def _overrides(profile: str, config: dict | None) -> dict:
+    ret = dict(render_server.PROFILES[profile])
+    ret.update(config or {})
+    return ret
+
+
+def plan_segments(module: str, scene: str, profile: str = "low", config: dict | None = None) \
+        -> list[tuple[int, int]]:
+    """
+    Play ranges [first, end) of the segments of a scene, from a pass
+    that runs `construct` without drawing anything.
+    """
+    scene_class = getattr(importlib.import_module(module), scene)
+    overrides = _overrides(profile, config)
+    overrides.update({"from_animation_number": 1 << 30, "write_to_movie": False,
+        "save_last_frame": False, "disable_caching": True})
+    cuts = [0]
+    with render_server.profile_config(overrides):
+        instance = scene_class()
+        for name in ("clear", "next_section"):
+            method = getattr(instance, name)
+
+            def cutting(*args, _method=method, **kwargs):
+                cuts.append(instance.renderer.num_plays)
+                return _method(*args, **kwargs)
+            setattr(instance, name, cutting)
+        instance.render()
+        cuts.append(instance.renderer.num_plays)
+    cuts = sorted(set(cuts))
+    return list(zip(cuts[:-1], cuts[1:]))
+
+
+def render_segment(job: dict) -> dict:
+    """
+    Render the plays [first, end) of a scene, without combining them.
+
+    Returns:
+        The partial movie files of the segment in play order, and the time it took
+    """
+    start = time.perf_counter()
+    scene_class = getattr(importlib.import_module(job["module"]), job["scene"])
+    overrides = _overrides(job["profile"], job.get("config"))
+    # Segment files are named by play index, and no worker prunes the
+    # cache while the others are still writing to it.
+    overrides.update({"from_animation_number": job["first"], "upto_animation_number": job["end"] - 1,
+        "disable_caching": True, "max_files_cached": -1})
+    with render_server.profile_config(overrides):
+        instance = scene_class()
+        writer = instance.renderer.file_writer
+        writer.combine_to_movie = lambda: None  # Joined once all segments are done
+        instance.render()
+        files = [f for f in writer.partial_movie_files[job["first"]:job["end"]] if f is not None]
+    return {"first": job["first"], "end": job["end"], "files": files,
+        "seconds": time.perf_counter() - start, "worker": os.getpid()}
+
+
+def combine(module: str, scene: str, files: list[str], profile: str = "low", config: dict | None = None) -> str:
+    """Join partial movie files into the output the scene would write. Returns its path."""
+    scene_class = getattr(importlib.import_module(module), scene)
+    with render_server.profile_config(_overrides(profile, config)):
+        # Only for its file writer, which knows the output path and encoder.
+        writer = scene_class().renderer.file_writer
+        gif = writer.output_spec.is_gif
+        path = writer.gif_file_path if gif else writer.movie_file_path
+        writer.combine_files(files, path, create_gif=gif)
+    return str(path)
+
+
+def render_parallel(module: str, scene: str, profile: str = "low", config: dict | None = None,
+                    workers: int | None = None, on_segment=None) -> dict:
+    """
+    Plan, render the segments on `workers` forked processes, and combine.
+
+    Args:
+        on_segment: Called with the result of every segment as it finishes
+
+    Returns:
+        Output path, segments, and the seconds spent planning, rendering and combining
+    """
+    start = time.perf_counter()
+    render_server.preload()
+    segments = plan_segments(module, scene, profile, config)
+    planned = time.perf_counter()
+    jobs = [{"module": module, "scene": scene, "profile": profile, "config": config,
+        "first": first, "end": end} for first, end in segments]
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    results = []
+    # Forked after the preload, so every worker starts warm.
+    with multiprocessing.get_context("fork").Pool(workers) as pool:
+        for result in pool.imap_unordered(render_segment, jobs):
+            results.append(result)
+            if on_segment is not None:
+                on_segment(result)
+    rendered = time.perf_counter()
+    results.sort(key=lambda r: r["first"])
+    output = combine(module, scene, [f for r in results for f in r["files"]], profile, config)
+    return {"output": output, "segments": results, "plan_seconds": planned - start,
+        "render_seconds": rendered - planned, "combine_seconds": time.perf_counter() - rendered}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("module", help="Scene file without .py, e.g. 01_lab_velocity_decompose")
+    parser.add_argument("scene", help="Scene class, e.g. VelocityDecomposition")
+    parser.add_argument("--profile", default="low", choices=sorted(render_server.PROFILES))
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--plan", action="store_true", help="Only print the segments")
+    args = parser.parse_args()
+
+    if args.plan:
+        render_server.preload()
+        for first, end in plan_segments(args.module, args.scene, args.profile):
+            print(f"plays {first}-{end - 1}")
+        return
+
+    def show(result):
+        print(f"  plays {result['first']:3d}-{result['end'] - 1:<3d} {result['seconds']:6.2f} s "
+            f"(worker {result['worker']})")
+    result = render_parallel(args.module, args.scene, args.profile, workers=args.workers, on_segment=show)
+    print(f"{result['output']}: {len(result['segments'])} segments, plan {result['plan_seconds']:.2f} s, "
+        f"render {result['render_seconds']:.2f} s, combine {result['combine_seconds']:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
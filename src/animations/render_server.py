@@ -0,0 +1,421 @@
+"""
+Warm render server: manim, `helper` and the tex/text setup are loaded
+once, and every job runs in a worker forked from that warm process, so
+it starts drawing right away. Each worker renders one job with a fresh
+config and exits; a replacement is forked as soon as it is gone.
+
+Jobs and replies are JSON lines over a Unix socket. A job is
+    {"module": "02_grid", "scene": "Grid", "profile": "low", "config": {...}}
+and the server replies with "progress" events (one per play) and a final
+"done" (with the output file) or "error". Closing the connection cancels
+the job.
+
+Run from src/animations:
+    python render_server.py serve [--workers 2]
+    python render_server.py submit 02_grid Grid [--profile low]
+    python render_server.py once 02_grid Grid      # no server, for comparison
+    python render_server.py serve --trace media/traces   # see render_trace
+"""
+import argparse
+import contextlib
+import importlib
+import json
+import multiprocessing
+import os
+import selectors
+import socket
+import sys
+import tempfile
+import time
+import traceback
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+DEFAULT_SOCKET = os.path.join(tempfile.gettempdir(), "manim-render.sock")
+
+# Config overrides for each profile, applied on top of what the scene sets.
+PROFILES = {
+    "preview": {"frame_rate": 10, "pixel_height": 240, "pixel_width": 240},
+    "low": {"quality": "low_quality"},
+    "medium": {"quality": "medium_quality"},
+    "high": {"quality": "high_quality"},
+}
+
+# Seconds a client has to send its job line after connecting.
+REQUEST_TIMEOUT = 5.0
+
+# Local modules loaded by the server. A worker reloads the ones edited
+# since, so a warm server does not render with stale code.
+PRELOADED = ["helper"]
+
+
+def preload() -> dict[str, float]:
+    """
+    Import manim and the shared modules, and build a formula and a text
+    once so the tex template and the fonts are ready.
+
+    Returns:
+        Modification time of every preloaded module file
+    """
+    if str(HERE) not in sys.path:
+        sys.path.insert(0, str(HERE))
+    from manim import MathTex, Text
+    for name in PRELOADED:
+        importlib.import_module(name)
+    try:
+        MathTex("x")
+    except Exception:
+        pass  # No LaTeX installed, scenes with formulas will fail anyway
+    Text("x")
+    return {name: os.path.getmtime(sys.modules[name].__file__) for name in PRELOADED}
+
+
+@contextlib.contextmanager
+def profile_config(overrides: dict):
+    """
+    `tempconfig(overrides)`, where the overrides also win over the output
+    size and format scenes set in `helper.set_default_output`.
+    """
+    from manim import tempconfig
+    import helper
+    previous = helper.OUTPUT_OVERRIDES
+    helper.OUTPUT_OVERRIDES = overrides
+    try:
+        with tempconfig(overrides):
+            yield
+    finally:
+        helper.OUTPUT_OVERRIDES = previous
+
+
+def run_job(job: dict, send, preloaded: dict[str, float]) -> dict:
+    """
+    Render one job in the current process.
+
+    Args:
+        job: Module, scene class, profile and extra config of the job
+        send: Called with every progress event
+        preloaded: Modification times from `preload`
+
+    Returns:
+        The "done" event
+    """
+    for name, mtime in preloaded.items():
+        if os.path.getmtime(sys.modules[name].__file__) != mtime:
+            importlib.reload(sys.modules[name])
+    sys.modules.pop(job["module"], None)
+    module = importlib.import_module(job["module"])
+    scene_class = getattr(module, job["scene"])
+
+    overrides = dict(PROFILES[job.get("profile", "low")])
+    overrides.update(job.get("config", {}))
+    start = time.perf_counter()
+    with profile_config(overrides):
+        scene = scene_class()
+        play = scene.play
+
+        # Scene.wait goes through play too, so this sees every segment.
+        def reporting_play(*args, **kwargs):
+            play(*args, **kwargs)
+            send({"event": "progress", "plays": scene.renderer.num_plays,
+                "scene_time": scene.renderer.time, "seconds": time.perf_counter() - start})
+        scene.play = reporting_play
+        scene.render()
+        # Either property raises when the config does not write that kind of file.
+        writer = scene.renderer.file_writer
+        output = getattr(writer, "gif_file_path", None) or getattr(writer, "movie_file_path", None)
+    return {"event": "done", "output": str(output) if output else None, "plays": scene.renderer.num_plays,
+        "seconds": time.perf_counter() - start}
+
+
+def _worker(connection, preloaded, trace_dir):
+    import render_trace
+    try:
+        job = connection.recv()
+    except EOFError:
+        return
+    tracer = None
+    if trace_dir is not None:
+        tracer = render_trace.enable(process_name=f"{job['module']}.{job['scene']} (worker {os.getpid()})")
+    try:
+        connection.send(run_job(job, connection.send, preloaded))
+    except BaseException:
+        connection.send({"event": "error", "message": traceback.format_exc()})
+    finally:
+        if tracer is not None and trace_dir is not None:
+            # Saved before the reply is closed, so the server merges a complete file.
+            render_trace.disable()
+            tracer.save(Path(trace_dir) / f"worker_{os.getpid()}.json")
+        connection.close()
+
+
+class RenderServer:
+    """
+    Single-threaded event loop over the listening socket, the clients and
+    the worker pipes. Workers are only forked from this loop, never from
+    another thread.
+    """
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET, workers: int | None = None,
+                 trace_dir: str | None = None):
+        self.socket_path = socket_path
+        # Workers write one trace per job there, merged into trace.json after each job.
+        self.trace_dir = trace_dir
+        self.worker_count = workers or os.cpu_count() or 1
+        self.context = multiprocessing.get_context("fork")
+        self.selector = selectors.DefaultSelector()
+        self.ready = []      # (process, connection) waiting for a job
+        self.pending = []    # (client, job) waiting for a worker
+        self.running = {}    # worker connection -> (process, client)
+        self.requests = {}   # client -> [bytes of its job line so far, time it connected]
+        self.preloaded: dict[str, float] = {}
+
+    def _spawn(self):
+        parent, child = self.context.Pipe()
+        process = self.context.Process(target=_worker, args=(child, self.preloaded, self.trace_dir),
+            daemon=True)
+        process.start()
+        child.close()
+        self.ready.append((process, parent))
+
+    def _dispatch(self):
+        while self.pending and self.ready:
+            client, job = self.pending.pop(0)
+            process, connection = self.ready.pop(0)
+            connection.send(job)
+            self.running[connection] = (process, client)
+            self.selector.register(connection, selectors.EVENT_READ, "worker")
+            self.selector.register(client, selectors.EVENT_READ, "client")
+
+    @staticmethod
+    def _reply(client, event: dict) -> bool:
+        try:
+            client.sendall((json.dumps(event) + "\n").encode())
+            return True
+        except OSError:
+            return False
+
+    def _end(self, connection, kill: bool = False):
+        process, client = self.running.pop(connection)
+        self.selector.unregister(connection)
+        self.selector.unregister(client)
+        if kill:
+            process.kill()
+        process.join()
+        connection.close()
+        client.close()
+        if self.trace_dir is not None:
+            import render_trace
+            parts = sorted(Path(self.trace_dir).glob("worker_*.json"))
+            try:
+                if parts:
+                    render_trace.merge(parts, Path(self.trace_dir) / "trace.json")
+            except (OSError, ValueError):
+                pass  # A worker killed while saving; its trace is merged with the next job
+        self._spawn()
+        self._dispatch()
+
+    def _accept(self, listener):
+        client, _ = listener.accept()
+        # The job line is read as it arrives, so a slow client holds up no one.
+        client.setblocking(False)
+        self.requests[client] = [b"", time.monotonic()]
+        self.selector.register(client, selectors.EVENT_READ, "request")
+
+    def _drop_request(self, client, message: str | None = None):
+        del self.requests[client]
+        self.selector.unregister(client)
+        client.setblocking(True)
+        if message is not None:
+            self._reply(client, {"event": "error", "message": message})
+        client.close()
+
+    def _from_request(self, client):
+        try:
+            chunk = client.recv(65536)
+        except BlockingIOError:
+            return
+        except OSError:
+            chunk = b""
+        if not chunk:
+            self._drop_request(client)
+            return
+        self.requests[client][0] += chunk
+        line = self.requests[client][0]
+        if b"\n" not in line:
+            return
+        del self.requests[client]
+        self.selector.unregister(client)
+        client.setblocking(True)
+        try:
+            job = json.loads(line.split(b"\n", 1)[0])
+            if "module" not in job or "scene" not in job:
+                raise ValueError("a job needs a module and a scene")
+            if job.get("profile", "low") not in PROFILES:
+                raise ValueError(f"unknown profile, use one of {sorted(PROFILES)}")
+        except ValueError as e:
+            self._reply(client, {"event": "error", "message": str(e)})
+            client.close()
+            return
+        self._reply(client, {"event": "queued", "waiting": len(self.pending)})
+        self.pending.append((client, job))
+        self._dispatch()
+
+    def _from_worker(self, connection):
+        try:
+            event = connection.recv()
+        except EOFError:
+            event = {"event": "error", "message": "the worker died"}
+        _, client = self.running[connection]
+        self._reply(client, event)
+        if event["event"] in ("done", "error"):
+            self._end(connection)
+
+    def _from_client(self, client):
+        # Clients send nothing after the job, so this is a disconnect: cancel.
+        try:
+            if client.recv(1):
+                return
+        except OSError:
+            pass
+        for connection, (_, owner) in list(self.running.items()):
+            if owner is client:
+                self._end(connection, kill=True)
+
+    def serve(self):
+        start = time.perf_counter()
+        self.preloaded = preload()
+        print(f"preloaded in {time.perf_counter() - start:.2f} s")
+        for _ in range(self.worker_count):
+            self._spawn()
+
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(self.socket_path)
+        listener.listen()
+        self.selector.register(listener, selectors.EVENT_READ, "listener")
+        print(f"serving on {self.socket_path} with {self.worker_count} workers")
+        try:
+            while True:
+                for key, _ in self.selector.select(timeout=1.0 if self.requests else None):
+                    if key.data == "listener":
+                        self._accept(key.fileobj)
+                    elif key.data == "request" and key.fileobj in self.requests:
+                        self._from_request(key.fileobj)
+                    elif key.data == "worker" and key.fileobj in self.running:
+                        self._from_worker(key.fileobj)
+                    elif key.fileobj in [c for _, c in self.running.values()]:
+                        self._from_client(key.fileobj)
+                now = time.monotonic()
+                for client, (_, since) in list(self.requests.items()):
+                    if now - since > REQUEST_TIMEOUT:
+                        self._drop_request(client, "no job received")
+        except KeyboardInterrupt:
+            pass
+        finally:
+            listener.close()
+            os.unlink(self.socket_path)
+            for process, _ in self.ready + [(p, None) for p, _ in self.running.values()]:
+                process.kill()
+
+
+class RenderJob:
+    """
+    A job sent to the server. `wait` reads its events until it ends;
+    `cancel`, e.g. from another thread, closes the connection, which
+    makes the server kill the worker.
+    """
+
+    def __init__(self, module: str, scene: str, profile: str = "low", config: dict | None = None,
+                 socket_path: str = DEFAULT_SOCKET):
+        self.job = {"module": module, "scene": scene, "profile": profile, "config": config or {}}
+        self.cancelled = False
+        self.client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.client.connect(socket_path)
+        self.client.sendall((json.dumps(self.job) + "\n").encode())
+
+    def wait(self, on_event=None) -> dict:
+        """
+        Args:
+            on_event: Called with every event as it arrives
+
+        Returns:
+            The final "done" or "error" event, or a "cancelled" one
+        """
+        try:
+            for line in self.client.makefile("rb"):
+                event = json.loads(line)
+                if on_event is not None:
+                    on_event(event)
+                if event["event"] in ("done", "error"):
+                    return event
+        except (OSError, ValueError):
+            pass
+        finally:
+            self.client.close()
+        if self.cancelled:
+            return {"event": "cancelled"}
+        return {"event": "error", "message": "the server closed the connection"}
+
+    def cancel(self):
+        self.cancelled = True
+        try:
+            self.client.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+def submit(module: str, scene: str, profile: str = "low", config: dict | None = None,
+           socket_path: str = DEFAULT_SOCKET, on_event=None) -> dict:
+    """
+    Send a job to the server and wait for it.
+
+    Args:
+        on_event: Called with every event as it arrives
+        (the other arguments make up the job)
+
+    Returns:
+        The final "done" or "error" event
+    """
+    return RenderJob(module, scene, profile, config, socket_path).wait(on_event)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--socket", default=DEFAULT_SOCKET)
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve")
+    serve.add_argument("--workers", type=int, default=None)
+    serve.add_argument("--trace", metavar="DIR", help="Trace every job, merged into DIR/trace.json")
+    for name in ("submit", "once"):
+        command = commands.add_parser(name)
+        command.add_argument("module", help="Scene file without .py, e.g. 02_grid")
+        command.add_argument("scene", help="Scene class, e.g. Grid")
+        command.add_argument("--profile", default="low", choices=sorted(PROFILES))
+        command.add_argument("--no-output", action="store_true",
+            help="Render the frames without writing the file, e.g. for timing")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        RenderServer(args.socket, args.workers, args.trace).serve()
+        return
+    config = {"write_to_movie": False, "save_last_frame": False} if args.no_output else {}
+    start = time.perf_counter()
+    if args.command == "once":
+        preloaded = preload()
+        result = run_job({"module": args.module, "scene": args.scene, "profile": args.profile,
+            "config": config}, lambda event: None, preloaded)
+    else:
+        def show(event):
+            if event["event"] == "progress":
+                print(f"  play {event['plays']:3d}  scene time {event['scene_time']:6.2f} s")
+        result = submit(args.module, args.scene, args.profile, config, args.socket, on_event=show)
+    if result["event"] == "error":
+        print(result["message"], file=sys.stderr)
+        sys.exit(1)
+    print(f"{result['output']} ({result['plays']} plays, "
+        f"{time.perf_counter() - start:.2f} s from submit to file)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""
+Tracing of renders as Chrome trace / Perfetto JSON (open the file in
+https://ui.perfetto.dev or chrome://tracing).
+
+`enable()` wraps the manim methods where a render spends its time:
+construct, every play and wait, every updater, tex compilation,
+rasterization, frame writes, segment encoding (on the encoder threads)
+and the final movie/GIF. Spans nest by time and carry the scene name
+and animation index. Nothing is wrapped until `enable()` is called, so
+a render that is not traced runs the original methods.
+
+Run from src/animations:
+    python render_trace.py run 02_grid Grid [--out media/trace.json]
+    python render_trace.py merge media/trace.json worker_1.json worker_2.json
+    python render_server.py serve --trace media/traces   # one merged trace for all jobs
+"""
+import argparse
+import atexit
+import contextlib
+import functools
+import importlib
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Sequence
+
+
+class Tracer:
+    """
+    Collects complete ("X") events. Timestamps are wall clock
+    microseconds, so the traces of different processes line up when
+    merged.
+    """
+
+    def __init__(self, process_name: str | None = None):
+        self.pid = os.getpid()
+        self.process_name = process_name or f"manim {self.pid}"
+        self.events: list[dict] = []
+        self.threads: dict[int, str] = {}
+        # Scene name and animation index, added to every span.
+        self.context: dict = {}
+
+    @contextlib.contextmanager
+    def span(self, name: str, category: str, **args):
+        start = time.time_ns() // 1000
+        try:
+            yield
+        finally:
+            tid = threading.get_native_id()
+            if tid not in self.threads:
+                self.threads[tid] = threading.current_thread().name
+            self.events.append({
+                "name": name, "cat": category, "ph": "X", "ts": start,
+                "dur": time.time_ns() // 1000 - start, "pid": self.pid, "tid": tid,
+                "args": {**self.context, **args}})
+
+    def trace(self) -> dict:
+        metadata = [{"name": "process_name", "ph": "M", "pid": self.pid, "tid": 0,
+            "args": {"name": self.process_name}}]
+        metadata += [{"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid,
+            "args": {"name": name}} for tid, name in self.threads.items()]
+        return {"traceEvents": metadata + self.events, "displayTimeUnit": "ms"}
+
+    def save(self, path: str | Path):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.trace(), f)
+
+
+_tracer: Tracer | None = None
+_originals: list[tuple[object, str, object]] = []
+
+
+def tracer() -> Tracer | None:
+    """The active tracer, None when tracing is off."""
+    return _tracer
+
+
+def _patch(owner, name: str, make_wrapper):
+    original = getattr(owner, name, None)
+    if original is None:
+        return  # Not in this manim version
+    wrapper = functools.wraps(original)(make_wrapper(original))
+    setattr(owner, name, wrapper)
+    _originals.append((owner, name, original))
+    if inspect.ismodule(owner):
+        # Modules that did `from ... import name` hold the original too.
+        for module in list(sys.modules.values()):
+            if module is not owner and getattr(module, name, None) is original:
+                setattr(module, name, wrapper)
+                _originals.append((module, name, original))
+
+
+def _spanning(tracer: Tracer, name: str, category: str):
+    def make_wrapper(original):
+        def wrapper(*args, **kwargs):
+            with tracer.span(name, category):
+                return original(*args, **kwargs)
+        return wrapper
+    return make_wrapper
+
+
+def _traced_render(tracer: Tracer):
+    def make_wrapper(original):
+        def render(self, *args, **kwargs):
+            scene = type(self).__name__
+            tracer.context = {"scene": scene}
+            for step in ("setup", "construct", "tear_down"):
+                method = getattr(self, step)
+                setattr(self, step, _spanning(tracer, step, "scene")(method))
+            try:
+                with tracer.span(f"render {scene}", "scene"):
+                    return original(self, *args, **kwargs)
+            finally:
+                tracer.context = {}
+        return render
+    return make_wrapper
+
+
+def _traced_play(tracer: Tracer):
+    def make_wrapper(original):
+        def play(self, *args, **kwargs):
+            index = self.renderer.num_plays
+            names = [type(a).__name__ for a in args]
+            kind = "wait" if names == ["Wait"] else "play"
+            tracer.context = {"scene": type(self).__name__, "animation_index": index}
+            with tracer.span(f"{kind} {index}", "scene", animations=names):
+                return original(self, *args, **kwargs)
+        return play
+    return make_wrapper
+
+
+def _traced_update(tracer: Tracer):
+    # Same as Mobject.update, with a span around every updater call.
+    def make_wrapper(original):
+        def update(self, dt=0, recursive=True):
+            if self.updating_suspended:
+                return self
+            for updater in self.updaters:
+                name = getattr(updater, "__qualname__", "updater")
+                with tracer.span(name, "updater", mobject=type(self).__name__):
+                    if "dt" in inspect.signature(updater).parameters:
+                        updater(self, dt)
+                    else:
+                        updater(self)
+            if recursive:
+                for submob in self.submobjects:
+                    submob.update(dt, recursive=recursive)
+            return self
+        return update
+    return make_wrapper
+
+
+def enable(path: str | Path | None = None, process_name: str | None = None) -> Tracer:
+    """
+    Start tracing renders in this process.
+
+    Args:
+        path: If given, the trace is written there when the process exits
+        process_name: Label of this process in the trace viewer
+    """
+    global _tracer
+    if _tracer is not None:
+        return _tracer
+    _tracer = tracer = Tracer(process_name)
+    from manim import Mobject, Scene
+    from manim.renderer.cairo_renderer import CairoRenderer
+    from manim.scene.scene_file_writer import SceneFileWriter
+    from manim.utils import tex_file_writing
+    try:
+        from manim.scene.video_segment_encoder import VideoSegmentEncoder
+    except ImportError:
+        VideoSegmentEncoder = None
+
+    _patch(Scene, "render", _traced_render(tracer))
+    _patch(Scene, "play", _traced_play(tracer))
+    _patch(Mobject, "update", _traced_update(tracer))
+    _patch(tex_file_writing, "tex_to_svg_file", _spanning(tracer, "tex to svg", "tex"))
+    _patch(tex_file_writing, "compile_tex", _spanning(tracer, "compile tex", "tex"))
+    _patch(tex_file_writing, "convert_to_svg", _spanning(tracer, "dvi to svg", "tex"))
+    _patch(CairoRenderer, "update_frame", _spanning(tracer, "rasterize", "render"))
+    _patch(CairoRenderer, "get_frame", _spanning(tracer, "get frame", "render"))
+    _patch(SceneFileWriter, "write_frame", _spanning(tracer, "write frame", "encode"))
+    _patch(SceneFileWriter, "open_partial_movie_stream", _spanning(tracer, "open segment", "encode"))
+    _patch(SceneFileWriter, "close_partial_movie_stream", _spanning(tracer, "close segment", "encode"))
+    _patch(SceneFileWriter, "combine_to_movie", _spanning(tracer, "combine movie / gif", "encode"))
+    _patch(SceneFileWriter, "combine_files", _spanning(tracer, "combine files", "encode"))
+    if VideoSegmentEncoder is not None:
+        _patch(VideoSegmentEncoder, "write_frame", _spanning(tracer, "encode frame", "encode"))
+        _patch(VideoSegmentEncoder, "finish", _spanning(tracer, "finish segment", "encode"))
+
+    if path is not None:
+        atexit.register(tracer.save, path)
+    return tracer
+
+
+def disable() -> Tracer | None:
+    """Stop tracing and restore the original methods. Returns the tracer that was active."""
+    global _tracer
+    while _originals:
+        owner, name, original = _originals.pop()
+        setattr(owner, name, original)
+    ret, _tracer = _tracer, None
+    return ret
+
+
+def merge(paths: Sequence[str | Path], out: str | Path) -> int:
+    """
+    Merge trace files, e.g. one per worker, into one. Each process keeps
+    its own track.
+
+    Returns:
+        Number of events written
+    """
+    events = []
+    for path in paths:
+        with open(path) as f:
+            events.extend(json.load(f)["traceEvents"])
+    Path(out).parent.mkdir(parents=True, exist_ok=True)
+    with open(out, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+    return len(events)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="Render one scene in this process, traced")
+    run.add_argument("module")
+    run.add_argument("scene")
+    run.add_argument("--profile", default="low")
+    run.add_argument("--out", default="media/trace.json")
+    merge_command = commands.add_parser("merge", help="Merge trace files into one")
+    merge_command.add_argument("out")
+    merge_command.add_argument("inputs", nargs="+")
+    args = parser.parse_args()
+
+    if args.command == "merge":
+        print(f"{merge(args.inputs, args.out)} events written to {args.out}")
+        return
+    import render_server
+    preloaded = render_server.preload()
+    tracer = enable(process_name=f"{args.module}.{args.scene}")
+    importlib.invalidate_caches()
+    render_server.run_job({"module": args.module, "scene": args.scene, "profile": args.profile},
+        lambda event: None, preloaded)
+    disable()
+    tracer.save(args.out)
+    print(f"trace written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Watch mode: re-render the scenes an edit affects, at preview quality,
+through a running `render_server`.
+
+Changed files are mapped to scenes through the imports of the scene
+files, followed transitively: an edit to `helper.py` re-renders every
+scene that imports it, an edit to `enemy_sight.py` only the sight
+scenes. A newer edit cancels the jobs it makes stale. For every
+finished preview, the time from the edit to the file is printed.
+
+Run from src/animations, with the server running:
+    python render_server.py serve &
+    python render_watch.py [--profile preview] [--only 02_grid_world_space]
+"""
+import argparse
+import ast
+import os
+import threading
+import time
+from pathlib import Path
+
+import render_server
+
+HERE = Path(__file__).resolve().parent
+
+
+def local_imports(path: Path, local: set[str]) -> set[str]:
+    """Names of the modules of `local` that a file imports."""
+    tree = ast.parse(path.read_text(), filename=str(path))
+    ret = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            ret.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            ret.add(node.module.split(".")[0])
+    return ret & local
+
+
+def scene_classes(path: Path) -> list[str]:
+    """Classes of a file that derive from something named like a scene (Scene, MovingCameraScene...)."""
+    tree = ast.parse(path.read_text(), filename=str(path))
+    ret = []
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef):
+            bases = [b.id if isinstance(b, ast.Name) else getattr(b, "attr", "") for b in node.bases]
+            if any(name.endswith("Scene") for name in bases):
+                ret.append(node.name)
+    return ret
+
+
+class SceneGraph:
+    """
+    Modules of a directory, which ones hold scenes, and which scene
+    modules depend (directly or not) on each module.
+    """
+
+    def __init__(self, directory: Path = HERE):
+        self.directory = directory
+        self.rebuild()
+
+    def rebuild(self):
+        files = {p.stem: p for p in self.directory.glob("*.py") if p.stem != "__init__"}
+        local = set(files)
+        self.imports: dict[str, set[str]] = {}
+        self.scenes: dict[str, list[str]] = {}
+        for name, path in files.items():
+            try:
+                self.imports[name] = local_imports(path, local)
+                classes = scene_classes(path)
+            except SyntaxError:
+                # Mid-edit; keep the file with no known imports until it parses.
+                self.imports[name], classes = set(), []
+            if classes:
+                self.scenes[name] = classes
+
+    def affected(self, module: str) -> list[str]:
+        """Scene modules to re-render when `module` changes, in a stable order."""
+        ret = set()
+        for scene_module in self.scenes:
+            seen = set()
+            stack = [scene_module]
+            while stack:
+                name = stack.pop()
+                if name == module:
+                    ret.add(scene_module)
+                    break
+                if name in seen:
+                    continue
+                seen.add(name)
+                stack.extend(self.imports.get(name, ()))
+        return sorted(ret)
+
+
+class Watcher:
+    """
+    Polls the modification times of the directory, and keeps at most one
+    job per scene: an edit cancels the running job of every scene it
+    affects and starts a new one.
+    """
+
+    def __init__(self, graph: SceneGraph, profile: str = "preview", only: list[str] | None = None,
+                 socket_path: str = render_server.DEFAULT_SOCKET, interval: float = 0.2):
+        self.graph = graph
+        self.profile = profile
+        self.only = set(only) if only else None
+        self.socket_path = socket_path
+        self.interval = interval
+        self.jobs: dict[tuple[str, str], render_server.RenderJob] = {}
+        self.lock = threading.Lock()
+        self.mtimes = self._scan()
+
+    def _scan(self) -> dict[str, float]:
+        return {p.stem: p.stat().st_mtime for p in self.graph.directory.glob("*.py")}
+
+    def _run(self, key, job, edited_at):
+        result = job.wait()
+        with self.lock:
+            if self.jobs.get(key) is job:
+                del self.jobs[key]
+        module, scene = key
+        if result["event"] == "done":
+            print(f"{module}.{scene}: {result['output']} ready "
+                f"{time.time() - edited_at:.2f} s after the edit (render {result['seconds']:.2f} s)")
+        elif result["event"] == "error":
+            print(f"{module}.{scene} failed:\n{result['message']}")
+
+    def submit(self, module: str, edited_at: float):
+        for scene in self.graph.scenes.get(module, []):
+            key = (module, scene)
+            with self.lock:
+                stale = self.jobs.pop(key, None)
+                if stale is not None:
+                    stale.cancel()
+                    print(f"{module}.{scene}: cancelled the stale render")
+                job = render_server.RenderJob(module, scene, self.profile, socket_path=self.socket_path)
+                self.jobs[key] = job
+            threading.Thread(target=self._run, args=(key, job, edited_at), daemon=True).start()
+
+    def poll(self):
+        mtimes = self._scan()
+        changed = [name for name, mtime in mtimes.items() if self.mtimes.get(name) != mtime]
+        self.mtimes = mtimes
+        if not changed:
+            return
+        edited_at = max(mtimes[name] for name in changed)
+        self.graph.rebuild()
+        scenes = set()
+        for name in changed:
+            scenes.update(self.graph.affected(name))
+        if self.only is not None:
+            scenes &= self.only
+        if scenes:
+            print(f"{', '.join(sorted(changed))} changed: rendering {', '.join(sorted(scenes))}")
+        for module in sorted(scenes):
+            self.submit(module, edited_at)
+
+    def run(self):
+        print(f"watching {self.graph.directory} ({len(self.graph.scenes)} scene files)")
+        try:
+            while True:
+                time.sleep(self.interval)
+                self.poll()
+        except KeyboardInterrupt:
+            with self.lock:
+                for job in self.jobs.values():
+                    job.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--socket", default=render_server.DEFAULT_SOCKET)
+    parser.add_argument("--profile", default="preview", choices=sorted(render_server.PROFILES))
+    parser.add_argument("--only", nargs="+", help="Scene modules to keep rendering, e.g. 02_grid_world_space")
+    parser.add_argument("--show", help="Print the scenes affected by a module and exit, e.g. helper")
+    args = parser.parse_args()
+
+    graph = SceneGraph()
+    if args.show:
+        print("\n".join(graph.affected(args.show)))
+        return
+    if not os.path.exists(args.socket):
+        parser.error(f"no render server on {args.socket}, start one with: python render_server.py serve")
+    Watcher(graph, args.profile, args.only, args.socket).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+"""
+Static layers for the Cairo renderer: what does not move during a play
+is rasterized once and reused, and only the moving mobjects are drawn
+every frame.
+
+Manim already paints the static mobjects of a play into a background
+image, but
+  - it paints it again at every play and wait, even when nothing static
+    changed since the previous one (the grids of 02_grid_world_space,
+    02_grid_coords and the raycast scenes stay for dozens of plays);
+  - everything drawn after the first moving mobject counts as moving,
+    so static mobjects above it (labels, arrows added later) are
+    rasterized every frame.
+
+With the layers enabled, a play splits the mobjects in z-order into
+  - the background: static mobjects below every moving one. Reused from
+    the previous play when it is unchanged;
+  - the moving layer: from the first to the last moving mobject, drawn
+    every frame as before;
+  - the overlay: static mobjects above every moving one, rasterized
+    once onto a transparent layer and composited over each frame.
+A mobject is moving when it (or its family) is animated, has updaters,
+or is in the foreground, as for manim. Both static layers are keyed on
+a fingerprint of their mobjects (points, colors, stroke widths, pixels
+of images) and of the camera, so a static mobject changed between two
+plays is painted again. Plays of a scene with scene updaters keep
+manim's split.
+
+Limitation: manim draws everything from the first moving mobject up
+every frame, so an updater or animation may change another mobject
+above it. Here the overlay is not drawn again during a play, and such
+a change leaves stale pixels until the next play. Give that mobject an
+updater of its own (an empty one will do) so that it counts as moving.
+
+The overlay is composited in premultiplied alpha like Cairo does, but
+once for the whole layer rather than once per mobject, so a pixel
+under a semi-transparent overlay may be off by one level.
+
+Usage, in a scene file:
+    import static_layer
+    static_layer.enable()
+
+Run from src/animations:
+    python static_layer.py 02_grid_world_space GridMapping [--profile low]
+    python -m benchmarks.bench_static_layer
+"""
+import argparse
+import importlib
+import time
+import weakref
+import zlib
+import numpy as np
+from manim import Scene, config
+from manim.constants import RendererType
+from manim.renderer.cairo_renderer import CairoRenderer
+from manim.utils.family import extract_mobject_family_members
+from manim.utils.iterables import list_update
+
+# Array attributes that decide how a mobject is drawn.
+DRAWN_ARRAYS = ("points", "fill_rgbas", "stroke_rgbas", "background_stroke_rgbas", "pixel_array")
+DRAWN_VALUES = ("stroke_width", "background_stroke_width", "z_index")
+
+_originals: dict = {}
+# The static layers of each renderer, dropped with it.
+_caches: weakref.WeakKeyDictionary[CairoRenderer, "LayerCache"] = weakref.WeakKeyDictionary()
+
+
+def fingerprint(mobjects) -> tuple:
+    """What decides the pixels of `mobjects`, drawn in this order."""
+    key = []
+    for mob in mobjects:
+        crc = 0
+        for name in DRAWN_ARRAYS:
+            array = getattr(mob, name, None)
+            if array is not None:
+                crc = zlib.crc32(np.ascontiguousarray(array).data, crc)
+        key.append((id(mob), crc) + tuple(np.asarray(getattr(mob, name, None)).tolist() for name in DRAWN_VALUES))
+    return tuple(key)
+
+
+def camera_key(camera) -> tuple:
+    """What decides where the camera draws, and on what."""
+    return (camera.pixel_array.shape, tuple(np.asarray(camera.frame_center, dtype=float).round(9)),
+        round(float(camera.frame_width), 9), round(float(camera.frame_height), 9),
+        zlib.crc32(np.ascontiguousarray(camera.background).data))
+
+
+class LayerCache:
+    """The static layers of one renderer, with what they were drawn from."""
+
+    def __init__(self):
+        self.background_key: tuple | None = None
+        self.background: np.ndarray | None = None
+        self.overlay_key: tuple | None = None
+        self.overlay: np.ndarray | None = None
+        # Rows and columns of the overlay that are not fully transparent.
+        self.box: tuple[slice, slice] | None = None
+        # Whether the current play is drawn from the layers of `_split`, its
+        # overlay (None when it has none) and the moving layer as split.
+        self.split = False
+        # Set when the moving mobjects changed during the play, which is then drawn whole.
+        self.whole = False
+        self.above: list | None = None
+        self.moving: list | None = None
+        self.moving_count = 0
+        self.hits = 0
+        self.misses = 0
+        self.composited = 0
+
+    def draw_overlay(self, renderer: CairoRenderer, above: list):
+        key = (camera_key(renderer.camera), fingerprint(above))
+        if key == self.overlay_key:
+            self.hits += 1
+            return
+        self.misses += 1
+        camera = renderer.camera
+        camera.set_pixel_array(np.zeros_like(camera.pixel_array))
+        camera.capture_mobjects(above, include_submobjects=False)
+        self.overlay = camera.pixel_array.copy()
+        rows = np.flatnonzero(self.overlay[..., 3].any(axis=1))
+        cols = np.flatnonzero(self.overlay[..., 3].any(axis=0))
+        self.box = (slice(rows[0], rows[-1] + 1), slice(cols[0], cols[-1] + 1)) if len(rows) else None
+        self.overlay_key = key
+
+    def composite(self, pixels: np.ndarray):
+        """Draws the overlay over `pixels`, in place."""
+        self.composited += 1
+        if self.box is None or self.overlay is None:
+            return
+        under = pixels[self.box]
+        over = self.overlay[self.box]
+        keep = 255 - over[..., 3:4].astype(np.uint16)
+        under[...] = over + (under * keep + 127) // 255
+
+
+def _cache(renderer: CairoRenderer) -> LayerCache:
+    if renderer not in _caches:
+        _caches[renderer] = LayerCache()
+    return _caches[renderer]
+
+
+def _split(scene: Scene) -> tuple[list, list, list] | None:
+    """
+    Background, moving layer and overlay of the current play, or None to
+    keep manim's split. The layers are flat lists of family members, to be
+    drawn without their submobjects: a static parent (an arrow whose tip
+    moves) is drawn on its own, and its moving children with the moving layer.
+    """
+    if scene.updaters:
+        return None
+    all_families = extract_mobject_family_members(
+        list_update(scene.mobjects, scene.foreground_mobjects),
+        use_z_index=scene.renderer.camera.use_z_index,
+        only_those_with_points=True,
+    )
+    roots = [anim.mobject for anim in scene.animations or []]
+    roots += [m for m in scene.get_mobject_family_members() if m.updaters]
+    roots += scene.foreground_mobjects
+    moving = {id(m) for m in extract_mobject_family_members(roots)}
+    indices = [i for i, m in enumerate(all_families) if id(m) in moving]
+    if not indices:
+        return None
+    first, last = indices[0], indices[-1] + 1
+    return all_families[:first], all_families[first:last], all_families[last:]
+
+
+def _begin_animations(self):
+    _originals["begin_animations"](self)
+    cache = _cache(self.renderer)
+    cache.split = False
+    cache.whole = False
+    cache.above = None
+    if config.renderer != RendererType.CAIRO:
+        return
+    split = _split(self)
+    if split is None:
+        return
+    below, self.moving_mobjects, above = split
+    self.static_mobjects = below
+    cache.split = True
+    cache.above = above or None
+    cache.moving = self.moving_mobjects
+    cache.moving_count = len(self.moving_mobjects)
+
+
+def _save_static_frame_data(self, scene, static_mobjects):
+    cache = _cache(self)
+    if cache.above:
+        cache.draw_overlay(self, cache.above)
+    if not static_mobjects:
+        self.static_image = None
+        return None
+    key = (cache.split, camera_key(self.camera), fingerprint(static_mobjects))
+    if key == cache.background_key:
+        cache.hits += 1
+        self.static_image = cache.background
+        return self.static_image
+    cache.misses += 1
+    self.static_image = None
+    if cache.split:
+        _originals["update_frame"](self, scene, static_mobjects, include_submobjects=False)
+        image = self.get_frame()
+    else:
+        image = _originals["save_static_frame_data"](self, scene, static_mobjects)
+    cache.background_key, cache.background = key, image
+    self.static_image = image
+    return image
+
+
+def _update_frame(self, scene, mobjects=None, include_submobjects=True, ignore_skipping=True, **kwargs):
+    cache = _caches.get(self)
+    # Only the frames of the play: the static image and the final frame are drawn whole.
+    if cache is None or not cache.split or mobjects is None or mobjects is not scene.moving_mobjects:
+        return _originals["update_frame"](self, scene, mobjects, include_submobjects, ignore_skipping, **kwargs)
+    if self.skip_animations and not ignore_skipping:
+        return
+    if cache.whole or mobjects is not cache.moving or len(mobjects) != cache.moving_count:
+        # `scene.add` during the play changed the moving mobjects: the
+        # layers no longer hold, the rest of the play is drawn whole.
+        cache.whole = True
+        cache.above = None
+        self.static_image = None
+        return _originals["update_frame"](self, scene, None, include_submobjects, **kwargs)
+    _originals["update_frame"](self, scene, mobjects, include_submobjects=False, **kwargs)
+    if cache.above:
+        cache.composite(self.camera.pixel_array)
+
+
+def enable():
+    """Draws the plays of every scene with static layers, until `disable`."""
+    if _originals:
+        return
+    _originals["begin_animations"] = Scene.begin_animations
+    _originals["save_static_frame_data"] = CairoRenderer.save_static_frame_data
+    _originals["update_frame"] = CairoRenderer.update_frame
+    Scene.begin_animations = _begin_animations
+    CairoRenderer.save_static_frame_data = _save_static_frame_data
+    CairoRenderer.update_frame = _update_frame
+
+
+def disable():
+    if not _originals:
+        return
+    Scene.begin_animations = _originals.pop("begin_animations")
+    CairoRenderer.save_static_frame_data = _originals.pop("save_static_frame_data")
+    CairoRenderer.update_frame = _originals.pop("update_frame")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a scene with static layers.")
+    parser.add_argument("module", help="Scene file without .py, e.g. 02_grid_coords")
+    parser.add_argument("scene", help="Scene class, e.g. GridCoords")
+    parser.add_argument("--profile", default="low")
+    args = parser.parse_args()
+
+    import render_server
+    render_server.preload()
+    module = importlib.import_module(args.module)
+    enable()
+    start = time.perf_counter()
+    with render_server.profile_config(render_server.PROFILES[args.profile]):
+        scene = getattr(module, args.scene)()
+        scene.render()
+    cache = _cache(scene.renderer)
+    print(f"{args.module}.{args.scene}: {time.perf_counter() - start:.2f} s, static layers reused "
+        f"{cache.hits}, drawn {cache.misses}, overlay composited on {cache.composited} frames")
+
+
+if __name__ == "__main__":
+    main()